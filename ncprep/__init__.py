@@ -22,7 +22,11 @@ __email__ = 'dalwar.hossain@protonmail.com'
 from ncp_txtfilter import filter_columns
 from ncp_txtclipper import clip_text
 from ncp_txtmapper import numeric_mapper
+from ncp_txtsorter import sort_by_time
+from ncp_txtprofiler import profile
+from _cache import clear_cache
+from ncp_txtwindows import iter_windows
 
 
 # Version
-__version__ = 1.1
+__version__ = 1.2
@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import io
+import sys
+import time
+import threading
+from pyrainbowterm import *
+
+# Import file_operations
+import _operations
+import _streams
+
+# Import queue [Python 2 uses Queue]
+if sys.version_info[0] == 2:
+    import Queue as queue
+    string_types = (basestring,)
+else:
+    import queue
+    string_types = (str,)
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Seconds between checks for a stop request while a queue is full
+QUEUE_POLL_INTERVAL = 0.1
+
+# Block size of read-ahead file objects (pandas readers) and of files copied behind
+READ_AHEAD_BLOCK_SIZE = 8 * 1024 ** 2
+
+# Rows per text chunk of data frames written behind
+DATA_FRAME_CHUNK_ROWS = 100000
+
+# Marker for the end of a queue
+_END_OF_QUEUE = object()
+
+
+# Print I/O statistics
+def print_io_statistics(name, n_bytes, elapsed_time, stall_time):
+    """
+    This function prints throughput and stall time of a buffered reader or writer
+    :param name: Name of the I/O stage
+    :param n_bytes: Number of bytes transferred
+    :param elapsed_time: Total time in seconds
+    :param stall_time: Time in seconds the caller waited for the I/O thread
+    :return: NULL
+    """
+    throughput = n_bytes / (1024.0 ** 2) / elapsed_time if elapsed_time > 0 else 0.0
+    print('{}: {:.1f} MB in {:.2f}s ({:.1f} MB/s), stalled {:.2f}s'.format(
+        name, n_bytes / (1024.0 ** 2), elapsed_time, throughput, stall_time), log_type='info')
+
+
+# Put an item into a bounded queue unless a stop is requested
+def __put(block_queue, item, stop_event):
+    """
+    This function blocks until there is space in the queue or a stop is requested
+    :param block_queue: Bounded queue
+    :param item: Item to put
+    :param stop_event: threading.Event to give up waiting
+    :return: True if the item was put
+    """
+    while not stop_event.is_set():
+        try:
+            block_queue.put(item, timeout=QUEUE_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+
+    # Return
+    return False
+
+
+# Read blocks in a background thread
+def __read_blocks(blocks, block_queue, stop_event):
+    """
+    This function (background thread) puts blocks into the queue until the input is exhausted
+    :param blocks: Iterable of blocks (bytes)
+    :param block_queue: Bounded queue
+    :param stop_event: threading.Event to stop reading
+    :return: NULL
+    """
+    try:
+        for block in blocks:
+            if not __put(block_queue, block, stop_event):
+                return
+        __put(block_queue, _END_OF_QUEUE, stop_event)
+    except Exception as e:
+        __put(block_queue, e, stop_event)
+    finally:
+        if hasattr(blocks, 'close'):
+            blocks.close()
+
+
+# Read ahead blocks of a file
+def read_ahead(input_file=None, block_size=None, depth=2, name='Read-ahead'):
+    """
+    This function yields blocks (ending on line boundaries) of the input file. A background thread reads the next
+    blocks while the current one is processed, at most depth blocks are waiting in memory.
+    :param input_file: Input file path, binary stream or an iterable of blocks (bytes)
+    :param block_size: Approximate block size in bytes (used with file path or stream)
+    :param depth: Maximum number of blocks read ahead
+    :param name: Name of the I/O stage for the statistics
+    :return: Generator of blocks (bytes)
+    """
+    if isinstance(input_file, string_types) or hasattr(input_file, 'read'):
+        blocks = _operations.iter_blocks(input_file, block_size)
+    else:
+        blocks = input_file
+    block_queue = queue.Queue(maxsize=max(1, int(depth)))
+    stop_event = threading.Event()
+    reader = threading.Thread(target=__read_blocks, args=(blocks, block_queue, stop_event))
+    reader.daemon = True
+    start_time = time.time()
+    stall_time, n_bytes = 0.0, 0
+    reader.start()
+    try:
+        while True:
+            wait_start = time.time()
+            block = block_queue.get()
+            stall_time += time.time() - wait_start
+            if block is _END_OF_QUEUE:
+                break
+            if isinstance(block, Exception):
+                raise block
+            n_bytes += len(block)
+            yield block
+    finally:
+        # Also runs if the consumer stops early
+        stop_event.set()
+        reader.join()
+        print_io_statistics(name, n_bytes, time.time() - start_time, stall_time)
+
+
+# Raw file object over read-ahead blocks
+class _BlockReader(io.RawIOBase):
+    """
+    Raw binary reader that returns the blocks of a read-ahead generator, lets parsers that need a file object (pandas)
+    read while the next blocks are read in the background
+    """
+    def __init__(self, blocks=None):
+        """
+        :param blocks: Generator of blocks (bytes), closed with the reader
+        """
+        self.blocks = blocks
+        self.block = memoryview(b'')
+        self.offset = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        """
+        This function fills the buffer from the current block, the next block is taken when it is used up
+        :param buffer: Writable buffer
+        :return: Number of bytes read (0 at the end of the input)
+        """
+        while self.offset >= len(self.block):
+            block = next(self.blocks, None)
+            if block is None:
+                return 0
+            self.block, self.offset = memoryview(block), 0
+        data = self.block[self.offset:self.offset + len(buffer)]
+        buffer[:len(data)] = data
+        self.offset += len(data)
+
+        # Return
+        return len(data)
+
+    def close(self):
+        """
+        This function stops the read-ahead thread (also if the input is not read to the end)
+        :return: NULL
+        """
+        if not self.closed:
+            self.blocks.close()
+        super(_BlockReader, self).close()
+
+
+# Open a file with read-ahead
+def open_read_ahead(input_file=None, block_size=READ_AHEAD_BLOCK_SIZE, depth=2, name='Read-ahead'):
+    """
+    This function opens the input file as a text file object whose blocks are read ahead in a background thread
+    Use as a context manager: with open_read_ahead(path) as f: pd.read_csv(f, ...)
+    :param input_file: Input file path or binary stream
+    :param block_size: Approximate block size in bytes
+    :param depth: Maximum number of blocks read ahead
+    :param name: Name of the I/O stage for the statistics
+    :return: file object (text)
+    """
+    raw = _BlockReader(read_ahead(input_file, block_size, depth=depth, name=name))
+
+    # Return
+    return io.TextIOWrapper(io.BufferedReader(raw), encoding='utf-8')
+
+
+# Write-behind output file
+class WriteBehind(object):
+    """
+    Output file that writes blocks in a background thread, at most depth blocks are waiting in memory.
+    Use as a context manager: with WriteBehind(path) as f: f.write(block)
+    """
+    def __init__(self, output_file=None, depth=2, name='Write-behind'):
+        """
+        :param output_file: Output file path, '-' for standard output or a file object opened in binary mode
+        :param depth: Maximum number of blocks waiting to be written
+        :param name: Name of the I/O stage for the statistics
+        """
+        if output_file == _streams.STREAM_NAME:
+            self.output = _streams.get_stdout(binary=True)
+            self.owns_output = False
+        elif isinstance(output_file, string_types):
+            self.output = open(output_file, 'wb')
+            self.owns_output = True
+        else:
+            self.output = output_file
+            self.owns_output = False
+        self.name = name
+        self.errors = []
+        self.block_queue = queue.Queue(maxsize=max(1, int(depth)))
+        self.writer = threading.Thread(target=self.__write_blocks)
+        self.writer.daemon = True
+        self.start_time = time.time()
+        self.stall_time, self.n_bytes = 0.0, 0
+        self.closed = False
+        self.writer.start()
+
+    def __write_blocks(self):
+        """
+        This function (background thread) writes blocks from the queue into the output
+        :return: NULL
+        """
+        while True:
+            block = self.block_queue.get()
+            if block is _END_OF_QUEUE:
+                break
+            if self.errors:
+                continue
+            try:
+                self.output.write(block)
+            except Exception as e:
+                self.errors.append(e)
+
+    def write(self, block):
+        """
+        This function queues a block for writing, it only blocks if depth blocks are already waiting
+        :param block: Data (bytes)
+        :return: NULL
+        """
+        if self.errors:
+            raise self.errors[0]
+        wait_start = time.time()
+        self.block_queue.put(block)
+        self.stall_time += time.time() - wait_start
+        self.n_bytes += len(block)
+
+    def close(self):
+        """
+        This function waits for the queued blocks to be written and closes the output
+        :return: NULL
+        """
+        if self.closed:
+            return
+        self.closed = True
+        wait_start = time.time()
+        self.block_queue.put(_END_OF_QUEUE)
+        self.writer.join()
+        self.stall_time += time.time() - wait_start
+        if self.owns_output:
+            self.output.close()
+        else:
+            self.output.flush()
+        print_io_statistics(self.name, self.n_bytes, time.time() - self.start_time, self.stall_time)
+        if self.errors:
+            raise self.errors[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# Write a data frame behind
+def write_data_frame(output=None, data_frame=None, chunk_rows=DATA_FRAME_CHUNK_ROWS):
+    """
+    This function formats the data frame as space separated text chunk by chunk and queues every encoded chunk, the
+    next chunk is formatted while the previous one is written
+    :param output: WriteBehind output file
+    :param data_frame: Python pandas data frame
+    :param chunk_rows: Number of rows per chunk
+    :return: NULL
+    """
+    for start in range(0, len(data_frame.index), chunk_rows):
+        text = data_frame.iloc[start:start + chunk_rows].to_csv(index=False, header=False, sep=' ')
+        # [Python 2 pandas returns bytes]
+        if not isinstance(text, bytes):
+            text = text.encode('utf-8')
+        output.write(text)
@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import os
+import shutil
+import hashlib
+import tempfile
+from pyrainbowterm import *
+
+# Import file_operations
+import _operations
+import _streams
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Default cache location and size limit (can be changed with NCPREP_CACHE_DIR / NCPREP_CACHE_SIZE)
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ncprep')
+DEFAULT_CACHE_SIZE = '10G'
+
+# File in every cache entry with the input file path (used for invalidation)
+ENTRY_INFO_FILE = 'input.txt'
+
+# Format of cached results, increase it when an output format changes (cached results of other formats are not reused)
+CACHE_FORMAT = 2
+
+# Hash of the package source code (computed once per process)
+_source_hash = None
+
+
+# Get cache directory
+def get_cache_dir():
+    """
+    This function returns the cache directory
+    :return: Cache directory path
+    """
+    return os.environ.get('NCPREP_CACHE_DIR', DEFAULT_CACHE_DIR)
+
+
+# Get ncprep version
+def __get_version():
+    """
+    This function returns the installed ncprep version, results of other versions are not reused
+    :return: version (str)
+    """
+    try:
+        from ncprep import __version__
+    except ImportError:
+        __version__ = 'unknown'
+
+    # Return
+    return str(__version__)
+
+
+# Get hash of the package source code
+def __get_source_hash():
+    """
+    This function hashes the source code of the package modules, results created by changed code are not reused
+    :return: hex digest (str)
+    """
+    global _source_hash
+    if _source_hash is None:
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        source_hash = hashlib.sha256()
+        for file_name in sorted(os.listdir(package_dir)):
+            if file_name.endswith('.py'):
+                with open(os.path.join(package_dir, file_name), 'rb') as f:
+                    source_hash.update(file_name.encode('utf-8') + b'\n' + f.read())
+        _source_hash = source_hash.hexdigest()
+
+    # Return
+    return _source_hash
+
+
+# Check if a result can be cached
+def is_cacheable(input_file=None, output_files=None, warn=True):
+    """
+    This function checks that the input and outputs are files, streams (standard input/output) are not cached
+    :param input_file: Input file path or stream
+    :param output_files: Python list of output file paths
+    :param warn: Print a warning if the result can not be cached
+    :return: True/False
+    """
+    if _streams.is_stream(input_file) or _streams.STREAM_NAME in output_files:
+        if warn:
+            print('Streamed input/output can not be cached! Cache is not used.....', log_type='warn', color='orange')
+        return False
+
+    # Return
+    return True
+
+
+# Hash the content of a file
+def __hash_content(input_file):
+    """
+    This function computes the sha256 hash of the file content
+    :param input_file: Input file path
+    :return: hex digest (str)
+    """
+    content_hash = hashlib.sha256()
+    with open(input_file, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            content_hash.update(block)
+
+    # Return
+    return content_hash.hexdigest()
+
+
+# Create cache key
+def cache_key(input_file=None, operation=None, parameters=None, content_hash=False):
+    """
+    This function creates the cache key of a result from input file identity, normalized parameters, cache format,
+    version and source code of the package
+    :param input_file: Input file path
+    :param operation: Name of the operation (e.g. clip_text)
+    :param parameters: Python dictionary with the normalized parameters that change the result
+    :param content_hash: True to identify the input file by its content instead of size and modification time
+    :return: Cache key (str)
+    """
+    status = os.stat(input_file)
+    if content_hash:
+        identity = ['content', __hash_content(input_file)]
+    else:
+        identity = [os.path.abspath(input_file), status.st_size, repr(status.st_mtime)]
+    key_parts = identity + [operation, 'format={}'.format(CACHE_FORMAT), __get_version(), __get_source_hash()] + \
+        ['{}={!r}'.format(name, parameters[name]) for name in sorted(parameters)]
+
+    # Return
+    return hashlib.sha256('\n'.join(str(part) for part in key_parts).encode('utf-8')).hexdigest()
+
+
+# Link or copy a file
+def __link_or_copy(source, destination):
+    """
+    This function creates a hard link of the file, or a copy if hard links are not possible
+    :param source: Existing file path
+    :param destination: New file path (removed first if it exists)
+    :return: NULL
+    """
+    if os.path.lexists(destination):
+        os.remove(destination)
+    try:
+        os.link(source, destination)
+    except (OSError, AttributeError):
+        shutil.copy2(source, destination)
+
+
+# Get cached outputs
+def lookup(key=None, output_files=None):
+    """
+    This function links the cached outputs to their locations if the result is in the cache
+    :param key: Cache key
+    :param output_files: Python list of output file paths
+    :return: True on cache hit, False otherwise
+    """
+    entry_dir = os.path.join(get_cache_dir(), key)
+    cached_files = [os.path.join(entry_dir, str(index)) for index in range(len(output_files))]
+    if not all(os.path.isfile(cached_file) for cached_file in cached_files):
+        return False
+    try:
+        for cached_file, output_file in zip(cached_files, output_files):
+            __link_or_copy(cached_file, output_file)
+        # Mark as recently used
+        os.utime(entry_dir, None)
+    except Exception as e:
+        print('Can not use cached result! ERROR: {}'.format(e), log_type='warn', color='orange')
+        return False
+    print('Cached result found! Output file(s) linked: {}'.format(', '.join(output_files)), log_type='info')
+
+    # Return
+    return True
+
+
+# Store outputs in the cache
+def store(key=None, input_file=None, output_files=None):
+    """
+    This function stores the outputs in the cache and evicts least recently used results above the size limit
+    :param key: Cache key
+    :param input_file: Input file path
+    :param output_files: Python list of output file paths
+    :return: NULL
+    """
+    cache_dir = get_cache_dir()
+    entry_dir = os.path.join(cache_dir, key)
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir)
+        temp_dir = tempfile.mkdtemp(prefix='.tmp_', dir=cache_dir)
+        for index, output_file in enumerate(output_files):
+            __link_or_copy(output_file, os.path.join(temp_dir, str(index)))
+        with open(os.path.join(temp_dir, ENTRY_INFO_FILE), 'w') as f:
+            f.write(os.path.abspath(input_file))
+        if os.path.isdir(entry_dir):
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        os.rename(temp_dir, entry_dir)
+        print('Result stored in cache!', log_type='info')
+    except Exception as e:
+        print('Can not store result in cache! ERROR: {}'.format(e), log_type='warn', color='orange')
+        return
+    evict()
+
+
+# Get disk usage of a cache entry
+def __entry_size(entry_dir):
+    """
+    This function sums the file sizes of a cache entry
+    :param entry_dir: Cache entry directory
+    :return: Number of bytes
+    """
+    return sum(os.path.getsize(os.path.join(entry_dir, name)) for name in os.listdir(entry_dir))
+
+
+# Evict least recently used results
+def evict(max_size=None):
+    """
+    This function removes least recently used results until the cache is smaller than max_size
+    :param max_size: Cache size limit (e.g. 10G), default: NCPREP_CACHE_SIZE or 10G
+    :return: Number of removed results
+    """
+    if max_size is None:
+        max_size = os.environ.get('NCPREP_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+    max_size = _operations.parse_memory_size(max_size)
+    cache_dir = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return 0
+    entries = []
+    for name in os.listdir(cache_dir):
+        entry_dir = os.path.join(cache_dir, name)
+        if os.path.isdir(entry_dir) and not name.startswith('.'):
+            entries.append((os.path.getmtime(entry_dir), __entry_size(entry_dir), entry_dir))
+    entries.sort()
+    total_size = sum(size for _, size, _ in entries)
+    n_removed = 0
+    for _, size, entry_dir in entries:
+        if total_size <= max_size:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total_size -= size
+        n_removed += 1
+    if n_removed:
+        print('Removed {} least recently used result(s) from cache!'.format(n_removed), log_type='info')
+
+    # Return
+    return n_removed
+
+
+# Remove results from the cache
+def clear_cache(input_file=None):
+    """
+    This function removes cached results of an input file, or all cached results
+    :param input_file: Input file path (None removes everything)
+    :return: Number of removed results
+    """
+    cache_dir = get_cache_dir()
+    if not os.path.isdir(cache_dir):
+        return 0
+    n_removed = 0
+    for name in os.listdir(cache_dir):
+        entry_dir = os.path.join(cache_dir, name)
+        if not os.path.isdir(entry_dir):
+            continue
+        if input_file is not None:
+            try:
+                with open(os.path.join(entry_dir, ENTRY_INFO_FILE)) as f:
+                    if f.read() != os.path.abspath(input_file):
+                        continue
+            except (IOError, OSError):
+                continue
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        n_removed += 1
+    print('Removed {} cached result(s)!'.format(n_removed), log_type='info')
+
+    # Return
+    return n_removed
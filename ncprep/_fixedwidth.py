@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import numpy as np
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Byte values used by the parser
+NEW_LINE = ord('\n')
+CARRIAGE_RETURN = ord('\r')
+SPACE = ord(' ')
+TAB = ord('\t')
+COMMENT = ord('#')
+MINUS = ord('-')
+DOT = ord('.')
+ZERO = ord('0')
+
+# 64 bit FNV-1a hash parameters
+FNV_OFFSET = np.uint64(14695981039346656037)
+FNV_PRIME = np.uint64(1099511628211)
+
+# Number of fields hashed or copied at once by the column loops (their bytes stay in the CPU cache)
+BATCH_SIZE = 8192
+
+# Segments of at least this many bytes are copied as slices, shorter ones in batches of about SEGMENT_BATCH_BYTES
+LONG_SEGMENT = 4096
+SEGMENT_BATCH_BYTES = 256 * 1024
+
+# Minimum length of source and target addresses, shorter rows are dropped by the cleanup
+MIN_ADDRESS_LENGTH = 34
+
+
+# Find fields of every line in a block of text
+def parse_block(block=None, delimiter=None, n_fields=None, skip_initial_space=True):
+    """
+    This function finds the byte offsets of the first n_fields fields of every line in a block of raw text.
+    Nothing is copied out of the block and no python object is created per line or per field. Offsets are int32 (for
+    blocks below 2 GB) and only a few temporary bytes are used per byte of the block.
+    Commented (#) lines and lines with less than n_fields fields are dropped (same as pandas comment/dropna).
+    :param block: Raw text (bytes) that ends at a line boundary
+    :param delimiter: Column separator (single character) or None for whitespace
+    :param n_fields: Number of fields needed from every line
+    :param skip_initial_space: Skip spaces after delimiter (same as pandas skipinitialspace)
+    :return: buffer (numpy uint8 array), field starts and field ends (numpy arrays of shape lines x n_fields),
+             line starts and line ends (numpy arrays, without new line)
+    """
+    if not block.endswith(b'\n'):
+        block += b'\n'
+    buffer = np.frombuffer(block, dtype=np.uint8)
+    offset_type = np.int32 if len(buffer) < 2 ** 31 else np.int64
+    new_lines = np.flatnonzero(buffer == NEW_LINE).astype(offset_type)
+    line_starts = np.concatenate([np.zeros(1, dtype=offset_type), new_lines[:-1] + 1])
+    line_ends = new_lines
+
+    if delimiter is None:
+        # Runs of whitespace separate fields, fields start and end where a run changes (the block ends with a new line)
+        is_separator = buffer == SPACE
+        for separator in (TAB, CARRIAGE_RETURN, NEW_LINE):
+            is_separator |= buffer == separator
+        changes = np.flatnonzero(is_separator[1:] != is_separator[:-1]).astype(offset_type) + 1
+        del is_separator
+        if buffer[0] not in (SPACE, TAB, CARRIAGE_RETURN, NEW_LINE):
+            changes = np.concatenate([np.zeros(1, dtype=offset_type), changes])
+        starts, ends = changes[0::2], changes[1::2]
+    else:
+        # Every delimiter separates two fields (empty fields are possible)
+        separators = np.flatnonzero(buffer == ord(delimiter)).astype(offset_type)
+        starts = np.sort(np.concatenate([line_starts, separators + 1]))
+        ends = np.sort(np.concatenate([separators, line_ends]))
+        # Skip initial spaces and strip carriage returns
+        while skip_initial_space:
+            leading = (starts < ends) & (buffer[np.minimum(starts, len(buffer) - 1)] == SPACE)
+            if not leading.any():
+                break
+            starts = starts + leading
+        trailing = (ends > starts) & (buffer[np.maximum(ends - 1, 0)] == CARRIAGE_RETURN)
+        ends = ends - trailing
+
+    # Line of every field (number of new lines before the field) and position of every field in its line
+    field_line = np.searchsorted(new_lines, starts)
+    first_field = np.searchsorted(field_line, np.arange(len(line_starts)))
+    fields_per_line = np.bincount(field_line, minlength=len(line_starts))
+
+    # Drop commented lines and lines without enough fields
+    has_fields = fields_per_line > 0
+    is_comment = np.zeros(len(line_starts), dtype=bool)
+    is_comment[has_fields] = buffer[starts[first_field[has_fields]]] == COMMENT
+    valid_lines = np.flatnonzero((fields_per_line >= n_fields) & ~is_comment)
+    field_index = first_field[valid_lines][:, None] + np.arange(n_fields)
+
+    # Return
+    return buffer, starts[field_index], ends[field_index], line_starts[valid_lines], line_ends[valid_lines]
+
+
+# Find commented lines
+def comment_lines(buffer=None, delimiter=None, skip_initial_space=True):
+    """
+    This function finds the commented (#) lines of a parsed block, the lines that parse_block drops as comments.
+    Only the # bytes are checked (a line is commented if there are only leading spaces before its first #).
+    :param buffer: numpy uint8 array returned by parse_block
+    :param delimiter: Column separator (single character) or None for whitespace
+    :param skip_initial_space: Skip spaces before the first field (same as parse_block)
+    :return: line starts and line ends (numpy arrays, without new line)
+    """
+    new_lines = np.flatnonzero(buffer == NEW_LINE)
+    marks = np.flatnonzero(buffer == COMMENT)
+    line_index = np.searchsorted(new_lines, marks)
+    line_starts = np.where(line_index > 0, new_lines[np.maximum(line_index - 1, 0)] + 1, 0)
+    if delimiter is None:
+        leading_bytes = (SPACE, TAB, CARRIAGE_RETURN)
+    elif skip_initial_space:
+        leading_bytes = (SPACE,)
+    else:
+        leading_bytes = ()
+
+    # Every byte before the mark must be a leading byte
+    gaps = marks - line_starts
+    is_comment = np.ones(len(marks), dtype=bool)
+    for column in range(int(gaps.max()) if len(gaps) else 0):
+        in_gap = column < gaps
+        characters = buffer[np.minimum(line_starts + column, len(buffer) - 1)]
+        is_leading = np.zeros(len(marks), dtype=bool)
+        for leading_byte in leading_bytes:
+            is_leading |= characters == leading_byte
+        is_comment &= ~in_gap | is_leading
+
+    # Return
+    return line_starts[is_comment], new_lines[line_index[is_comment]]
+
+
+# Copy fields into a fixed width byte string array
+def gather_strings(buffer=None, starts=None, ends=None, width=None):
+    """
+    This function copies fields into a contiguous numpy S (fixed width byte string) array, column by column in
+    batches of fields (no index array per character)
+    :param buffer: numpy uint8 array
+    :param starts: Field start offsets
+    :param ends: Field end offsets
+    :param width: Width of the array (default: longest field)
+    :return: numpy S array
+    """
+    lengths = ends - starts
+    if width is None:
+        width = max(1, int(lengths.max())) if len(lengths) else 1
+    characters = np.zeros((len(starts), width), dtype=np.uint8)
+    for first in range(0, len(starts), BATCH_SIZE):
+        batch_starts = np.ascontiguousarray(starts[first:first + BATCH_SIZE])
+        batch_lengths = lengths[first:first + BATCH_SIZE]
+        batch = characters[first:first + BATCH_SIZE]
+        shortest = int(batch_lengths.min())
+        for column in range(min(width, int(batch_lengths.max()))):
+            if column < shortest:
+                batch[:, column] = buffer[batch_starts + column]
+            else:
+                in_field = column < batch_lengths
+                batch[in_field, column] = buffer[batch_starts[in_field] + column]
+
+    # Return
+    return characters.view('S{}'.format(width)).ravel()
+
+
+# Convert integer fields into numbers
+def parse_integers(buffer=None, starts=None, ends=None):
+    """
+    This function converts fields with (optionally negative) integers into numbers
+    :param buffer: numpy uint8 array
+    :param starts: Field start offsets
+    :param ends: Field end offsets
+    :return: numpy int64 array, numpy bool array (True if the field is a valid integer)
+    """
+    negative = (ends > starts) & (buffer[np.minimum(starts, len(buffer) - 1)] == MINUS)
+    starts = starts + negative
+    lengths = ends - starts
+    values = np.zeros(len(starts), dtype=np.int64)
+    valid = lengths > 0
+    for column in range(int(lengths.max()) if len(lengths) else 0):
+        in_field = column < lengths
+        digits = buffer[np.minimum(starts + column, len(buffer) - 1)].astype(np.int64) - ZERO
+        valid &= ~in_field | ((digits >= 0) & (digits <= 9))
+        values = np.where(in_field, values * 10 + digits, values)
+    values[negative] *= -1
+
+    # Return
+    return values, valid
+
+
+# Convert decimal fields into numbers
+def parse_numbers(buffer=None, starts=None, ends=None):
+    """
+    This function converts fields with (optionally negative) decimal numbers (no exponent) into numbers
+    :param buffer: numpy uint8 array
+    :param starts: Field start offsets
+    :param ends: Field end offsets
+    :return: numpy float64 array, numpy bool array (True if the field is a valid number)
+    """
+    negative = (ends > starts) & (buffer[np.minimum(starts, len(buffer) - 1)] == MINUS)
+    starts = starts + negative
+    lengths = ends - starts
+    values = np.zeros(len(starts), dtype=np.float64)
+    scale = np.ones(len(starts), dtype=np.float64)
+    seen_dot = np.zeros(len(starts), dtype=bool)
+    n_digits = np.zeros(len(starts), dtype=np.int64)
+    valid = lengths > 0
+    for column in range(int(lengths.max()) if len(lengths) else 0):
+        in_field = column < lengths
+        characters = buffer[np.minimum(starts + column, len(buffer) - 1)]
+        is_dot = in_field & (characters == DOT)
+        digits = characters.astype(np.int64) - ZERO
+        is_digit = in_field & (digits >= 0) & (digits <= 9)
+        valid &= ~in_field | is_digit | (is_dot & ~seen_dot)
+        seen_dot |= is_dot
+        values = np.where(is_digit, values * 10 + digits, values)
+        scale = np.where(is_digit & seen_dot, scale * 10, scale)
+        n_digits += is_digit
+    valid &= n_digits > 0
+    values = values / scale
+    values[negative] *= -1
+
+    # Return
+    return values, valid
+
+
+# Hash fields into 64 bit integers
+def hash_fields(buffer=None, starts=None, ends=None):
+    """
+    This function computes the 64 bit FNV-1a hash of every field without copying the fields. Fields are hashed in
+    batches so that the bytes of a batch stay in the CPU cache while all of their columns are hashed.
+    :param buffer: numpy uint8 array
+    :param starts: Field start offsets
+    :param ends: Field end offsets
+    :return: numpy uint64 array
+    """
+    hashes = np.empty(len(starts), dtype=np.uint64)
+    for first in range(0, len(starts), BATCH_SIZE):
+        batch_starts = np.ascontiguousarray(starts[first:first + BATCH_SIZE])
+        lengths = ends[first:first + BATCH_SIZE] - batch_starts
+        batch_hashes = np.full(len(batch_starts), FNV_OFFSET, dtype=np.uint64)
+        shortest = int(lengths.min())
+        for column in range(int(lengths.max())):
+            if column < shortest:
+                # Every field has this column (e.g. fixed length addresses), no masking needed
+                batch_hashes = (batch_hashes ^ buffer[batch_starts + column]) * FNV_PRIME
+                continue
+            in_field = column < lengths
+            characters = buffer[np.minimum(batch_starts + column, len(buffer) - 1)].astype(np.uint64)
+            batch_hashes = np.where(in_field, (batch_hashes ^ characters) * FNV_PRIME, batch_hashes)
+        hashes[first:first + BATCH_SIZE] = batch_hashes
+
+    # Return
+    return hashes
+
+
+# Copy byte segments into one contiguous buffer
+def gather_segments(buffer=None, starts=None, lengths=None):
+    """
+    This function concatenates byte segments of a buffer (in the given order) without a python loop per segment.
+    Segments that continue each other are joined, long segments are copied as slices and short ones in batches, so
+    the index arrays stay small.
+    :param buffer: numpy array (e.g. uint8)
+    :param starts: Segment start offsets
+    :param lengths: Segment lengths
+    :return: numpy array with the dtype of buffer
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if len(starts) > 1:
+        is_first = np.concatenate([[True], starts[1:] != starts[:-1] + lengths[:-1]])
+        if not is_first.all():
+            lengths = np.add.reduceat(lengths, np.flatnonzero(is_first))
+            starts = starts[is_first]
+    offsets = np.cumsum(lengths) - lengths
+    output = np.empty(int(lengths.sum()), dtype=buffer.dtype)
+
+    # Long segments (e.g. runs of neighbouring lines)
+    is_long = lengths >= LONG_SEGMENT
+    for segment in np.flatnonzero(is_long).tolist():
+        output[offsets[segment]:offsets[segment] + lengths[segment]] = \
+            buffer[starts[segment]:starts[segment] + lengths[segment]]
+
+    # Short segments in batches of about SEGMENT_BATCH_BYTES
+    short = np.flatnonzero(~is_long & (lengths > 0))
+    short_ends = np.cumsum(lengths[short])
+    n_batches = int(short_ends[-1]) // SEGMENT_BATCH_BYTES if len(short) else 0
+    batch_ends = np.searchsorted(short_ends, SEGMENT_BATCH_BYTES * np.arange(1, n_batches + 1), side='right')
+    first = 0
+    for last in batch_ends.tolist() + [len(short)]:
+        batch, first = short[first:last], last
+        if not len(batch):
+            continue
+        batch_lengths = lengths[batch]
+        within = np.arange(int(batch_lengths.sum()), dtype=np.int64) - \
+            np.repeat(np.cumsum(batch_lengths) - batch_lengths, batch_lengths)
+        output[np.repeat(offsets[batch], batch_lengths) + within] = \
+            buffer[np.repeat(starts[batch], batch_lengths) + within]
+
+    # Return
+    return output
+
+
+# Find ids of fixed width labels in order of first appearance
+def encode_labels(labels=None):
+    """
+    This function assigns an id to every unique label in order of first appearance. Labels are grouped by their
+    64 bit hashes, so 8 bytes per label are sorted instead of the labels. Labels with the same hash are compared and
+    a hash collision falls back to sorting the labels.
+    :param labels: numpy S array
+    :return: codes (numpy int64 array, one per label), unique labels (numpy S array, position = id)
+    """
+    labels = np.ascontiguousarray(labels)
+    characters = labels.view(np.uint8)
+    starts = np.arange(len(labels), dtype=np.int64) * labels.dtype.itemsize
+    if len(characters) < 2 ** 31:
+        starts = starts.astype(np.int32)
+    _, first_index, inverse = np.unique(hash_fields(characters, starts, starts + labels.dtype.itemsize),
+                                        return_index=True, return_inverse=True)
+    del starts
+    inverse = inverse.ravel()
+    for first in range(0, len(labels), BATCH_SIZE):
+        batch = slice(first, first + BATCH_SIZE)
+        if (labels[batch] != labels[first_index[inverse[batch]]]).any():
+            _, first_index, inverse = np.unique(labels, return_index=True, return_inverse=True)
+            inverse = inverse.ravel()
+            break
+    order = np.argsort(first_index, kind='mergesort')
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+
+    # Return
+    return rank[inverse], labels[first_index[order]]
+
+
+# Parse and clean the edges of a block
+def parse_edges(block=None, delimiter=None, weighted=True, raw_weights=False):
+    """
+    This function parses a block into edge arrays (source, target, weight, timestamp columns, timestamp is always the
+    4th column) with the numeric_mapper cleanup: rows with a source or target shorter than MIN_ADDRESS_LENGTH or
+    without a valid timestamp are dropped, weights are normalized to round(log(1 + weight), 2)
+    :param block: Raw text (bytes) that ends at a line boundary
+    :param delimiter: Column separator
+    :param weighted: True to parse the weight column
+    :param raw_weights: True to keep the weights as parsed (decimal numbers, no normalization)
+    :return: sources, targets (numpy S arrays), weights (numpy float64 array or None), timestamps (numpy int64 array)
+    """
+    buffer, starts, ends, _, _ = parse_block(block, delimiter, 4)
+    lengths = ends - starts
+    keep = (lengths[:, 0] >= MIN_ADDRESS_LENGTH) & (lengths[:, 1] >= MIN_ADDRESS_LENGTH)
+    timestamps, valid = parse_integers(buffer, starts[:, 3], ends[:, 3])
+    keep &= valid
+    weights = None
+    if weighted:
+        if raw_weights:
+            weights, valid = parse_numbers(buffer, starts[:, 2], ends[:, 2])
+        else:
+            weights, valid = parse_integers(buffer, starts[:, 2], ends[:, 2])
+        if not valid[keep].all():
+            raise ValueError('invalid weight value')
+        weights = weights[keep] if raw_weights else np.round(np.log1p(weights[keep]), 2)
+    sources = gather_strings(buffer, starts[keep, 0], ends[keep, 0])
+    targets = gather_strings(buffer, starts[keep, 1], ends[keep, 1])
+
+    # Return
+    return sources, targets, weights, timestamps[keep]
@@ -6,10 +6,16 @@ from __future__ import print_function
 # Import python libraries
 import os
 import sys
+import numbers
 import datetime
+import multiprocessing
 from itertools import islice
 from pyrainbowterm import *
 
+# Import stream handling and write-behind output [_buffered_io imports this module, only used in functions]
+import _streams
+import _buffered_io
+
 # Import pickle [Python 2 uses cPickle]
 if sys.version_info[0] == 2:
     import cPickle as pickle
@@ -17,6 +23,16 @@ else:
     import pickle
 
 
+# Marker line written at the top of files sorted by ncprep (see ncp_txtsorter)
+SORTED_MARKER = '# ncprep: sorted by timestamp'
+
+# Fraction of max_memory used by the chunk/block being processed (rest: growing state and I/O buffers)
+CHUNK_MEMORY_FRACTION = 0.25
+
+# Memory size units accepted by parse_memory_size
+MEMORY_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+
 # Source code meta data
 __author__ = 'Dalwar Hossain'
 __email__ = 'dalwar.hossain@protonmail.com'
@@ -26,12 +42,14 @@ __email__ = 'dalwar.hossain@protonmail.com'
 def get_output_file(input_file=None, suffix=None, ext=None):
     """
     This function extracts the directory path of input file and creates a new file name for the output file
-    :param input_file: A complete file path for input dataset
+    :param input_file: A complete file path for input dataset (streams: stdin in the current directory)
     :param suffix: Suffix for the output file
     :param ext: File extension
     :return: A full path for output file
     """
     # Create output file name from input file in the same directory
+    if _streams.is_stream(input_file):
+        return os.path.join(os.getcwd(), 'stdin' + suffix + ext)
     output_file_name = input_file.rsplit('.', 1)[0] + suffix + ext
 
     # Return output path
@@ -41,7 +59,7 @@ def get_output_file(input_file=None, suffix=None, ext=None):
 # Create output file
 def create_output_file(data_frame=None, output_file_name=None):
     """
-    This function creates a file from python pandas data frame
+    This function creates a file from python pandas data frame, text chunks are written behind in a background thread
     :param data_frame: Python pandas data frame
     :param output_file_name: Output file's full path with extension
     :return: NULL
@@ -49,7 +67,8 @@ def create_output_file(data_frame=None, output_file_name=None):
     # Create numeric output file
     print('Creating output file.....', log_type='info')
     try:
-        data_frame.to_csv(output_file_name, index=False, header=False, sep=' ')
+        with _buffered_io.WriteBehind(output_file_name) as output:
+            _buffered_io.write_data_frame(output, data_frame)
         print('Output file creation complete!', log_type='info')
     except Exception as e:
         print('Can not write output file. ERROR: {}'.format(e), log_type='error')
@@ -91,6 +110,20 @@ def generate_headers(weighted=None):
     return headers
 
 
+# Read the first lines of a file or stream
+def read_head_lines(input_file=None, n_lines=None):
+    """
+    This function reads the first lines of a file, streams are not consumed (lines of the peeked head)
+    :param input_file: Input file path or InputStream
+    :param n_lines: Number of lines
+    :return: Python list of lines (str)
+    """
+    if isinstance(input_file, _streams.InputStream):
+        return input_file.head_lines(n_lines)
+    with open(input_file) as f:
+        return list(islice(f, n_lines))
+
+
 # Check if the file has header or not
 def file_sniffer(input_file=None):
     """
@@ -104,26 +137,25 @@ def file_sniffer(input_file=None):
         print('Can not import python csv library!', log_type='error')
         sys.exit(1)
 
-    # Open the file and take a sniff
-    with open(input_file) as f:
-        first_five_lines = list(islice(f, 5))
-        file_head = ''.join(map(str, first_five_lines))
-        try:
-            dialect = csv.Sniffer().sniff(file_head)
-            _headers = csv.Sniffer().has_header(file_head)
-            delimiter = dialect.delimiter
-        except Exception as e:
-            print('Can not detect delimiter or headers! ERROR: {}'.format(e), log_type='error')
-            print('Please check input file!!', log_type='error')
-        # Sniff into the file and see if there is a header or not
-        if _headers:
-            headers = file_head.split('\n')[0].split(delimiter)
-            n_cols = len(headers)
-            skip_rows = 1
-        else:
-            headers = None
-            n_cols = len(file_head.split('\n')[0].split(delimiter))
-            skip_rows = 0
+    # Take a sniff at the first lines (ncprep's own sorted marker is not part of the data)
+    first_five_lines = [line for line in read_head_lines(input_file, 6) if not line.startswith(SORTED_MARKER)][:5]
+    file_head = ''.join(map(str, first_five_lines))
+    try:
+        dialect = csv.Sniffer().sniff(file_head)
+        _headers = csv.Sniffer().has_header(file_head)
+        delimiter = dialect.delimiter
+    except Exception as e:
+        print('Can not detect delimiter or headers! ERROR: {}'.format(e), log_type='error')
+        print('Please check input file!!', log_type='error')
+    # Sniff into the file and see if there is a header or not
+    if _headers:
+        headers = file_head.split('\n')[0].split(delimiter)
+        n_cols = len(headers)
+        skip_rows = 1
+    else:
+        headers = None
+        n_cols = len(file_head.split('\n')[0].split(delimiter))
+        skip_rows = 0
 
     # Return
     return delimiter, headers, n_cols, skip_rows
@@ -138,7 +170,10 @@ def check_input_file_permissions(input_file):
     """
     # Check input file's status (is a file?, has right permissions?)
     print('Checking input file status.....', log_type='info')
-    if os.access(input_file, os.F_OK):
+    if isinstance(input_file, _streams.InputStream):
+        print('Reading input stream: {}'.format(input_file.source_name), log_type='info')
+        permission_status = 1
+    elif os.access(input_file, os.F_OK):
         print('Input file found!', log_type='info')
         if os.access(input_file, os.R_OK):
             print('Input file has read permission!', log_type='info')
@@ -238,7 +273,10 @@ def check_output_file_permissions(output_file):
     """
     # Check output file
     print('Checking output file.....', log_type='info')
-    if os.access(output_file, os.F_OK):
+    if output_file == _streams.STREAM_NAME:
+        print('Output is written to standard output!', log_type='info')
+        output_file_status = 1
+    elif os.access(output_file, os.F_OK):
         try:
             print("Output file already exists! Removing old file.....", log_type='warn', color='orange')
             os.remove(output_file)
@@ -409,3 +447,213 @@ def initial_message(script=None, custom_message=None):
     # Print
     line_block = marker * str_length
     print(line_block, print_string, custom_message, help_string, line_block, sep='\n')
+
+
+# Convert memory size into bytes
+def parse_memory_size(max_memory=None):
+    """
+    This function converts a memory size like 512M, 8G or 1073741824 into number of bytes
+    :param max_memory: Memory size as int (bytes) or string with K/M/G/T suffix
+    :return: Number of bytes (int)
+    """
+    if isinstance(max_memory, numbers.Number):
+        return int(max_memory)
+    try:
+        size = str(max_memory).strip().upper().rstrip('B')
+        if size[-1] in MEMORY_UNITS:
+            return int(float(size[:-1]) * MEMORY_UNITS[size[-1]])
+        return int(float(size))
+    except Exception as e:
+        print('Can not understand memory size "{}"! ERROR: {}'.format(max_memory, e), log_type='error')
+        print('Try: 512M, 8G or number of bytes', log_type='hint')
+        sys.exit(1)
+
+
+# Get number of worker processes
+def get_n_jobs(n_jobs=None):
+    """
+    This function decides how many worker processes to use
+    :param n_jobs: Number of requested workers (None or < 1 means all CPUs)
+    :return: Number of workers (int)
+    """
+    if n_jobs is None or int(n_jobs) < 1:
+        try:
+            n_jobs = multiprocessing.cpu_count()
+        except NotImplementedError:
+            n_jobs = 1
+
+    # Return
+    return int(n_jobs)
+
+
+# Split a file into byte ranges that start and end on line boundaries
+def get_byte_ranges(input_file=None, n_parts=None):
+    """
+    This function splits a file into (almost) equal byte ranges aligned on new lines
+    :param input_file: Input file path
+    :param n_parts: Number of ranges
+    :return: Python list of (start, end) byte offsets
+    """
+    file_size = os.path.getsize(input_file)
+    n_parts = max(1, int(n_parts))
+    boundaries = [0]
+    with open(input_file, 'rb') as f:
+        for part in range(1, n_parts):
+            offset = max(boundaries[-1], file_size * part // n_parts)
+            if offset >= file_size:
+                break
+            f.seek(offset)
+            # Move to the start of the next line (offset 0 is always a line start)
+            if offset > 0:
+                f.readline()
+            boundaries.append(min(f.tell(), file_size))
+    boundaries.append(file_size)
+
+    # Return non empty ranges
+    return [(start, end) for start, end in zip(boundaries[:-1], boundaries[1:]) if end > start]
+
+
+# Read lines from a byte range
+def iter_lines_in_range(input_file=None, start=None, end=None):
+    """
+    This function yields raw lines (bytes) of a file in between start and end byte offsets
+    :param input_file: Input file path
+    :param start: Start offset (must be a line start)
+    :param end: End offset (must be a line start or end of file)
+    :return: Generator of lines (bytes)
+    """
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line
+
+
+# Read blocks from a byte range
+def iter_blocks_in_range(input_file=None, start=None, end=None, block_size=None):
+    """
+    This function yields raw blocks (bytes) of about block_size bytes of a file in between start and end byte
+    offsets, every block ends with a complete line
+    :param input_file: Input file path
+    :param start: Start offset (must be a line start)
+    :param end: End offset (must be a line start or end of file)
+    :param block_size: Approximate block size in bytes
+    :return: Generator of blocks (bytes)
+    """
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            block = f.read(min(block_size, end - position))
+            if not block:
+                break
+            if not block.endswith(b'\n'):
+                block += f.readline()
+            position += len(block)
+            yield block
+
+
+# Check if the file was sorted by ncprep
+def is_time_sorted(input_file=None):
+    """
+    This function checks if the first line of the file is ncprep's sorted marker
+    :param input_file: Input file path
+    :return: True/False
+    """
+    try:
+        return read_head_lines(input_file, 1)[0].startswith(SORTED_MARKER)
+    except Exception:
+        return False
+
+
+# Read a file in blocks that end on line boundaries
+def iter_blocks(input_file=None, block_size=None):
+    """
+    This function yields raw blocks (bytes) of about block_size bytes, every block ends with a complete line
+    :param input_file: Input file path or binary stream (streams are not closed)
+    :param block_size: Approximate block size in bytes
+    :return: Generator of blocks (bytes)
+    """
+    f = input_file if _streams.is_stream(input_file) else open(input_file, 'rb')
+    try:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            if not block.endswith(b'\n'):
+                block += f.readline()
+            yield block
+    finally:
+        if f is not input_file:
+            f.close()
+
+
+# Estimate average row width of a file
+def estimate_row_width(input_file=None, n_lines=1000):
+    """
+    This function estimates the average row width (bytes) from the first lines of the file
+    :param input_file: Input file path
+    :param n_lines: Number of lines to sniff
+    :return: Average row width in bytes (int)
+    """
+    widths = [len(line) for line in read_head_lines(input_file, n_lines) if not line.startswith('#')]
+
+    # Return
+    return max(1, sum(widths) // len(widths)) if widths else 1
+
+
+# Get number of rows per chunk within a memory budget
+def get_chunk_rows(input_file=None, max_memory=None, expansion=None):
+    """
+    This function decides how many rows are processed at once so that a chunk uses a fraction of the memory budget,
+    the rest is left for the growing state (e.g. mapping table) and I/O buffers
+    :param input_file: Input file path
+    :param max_memory: Memory budget (e.g. 8G or bytes)
+    :param expansion: Memory used per byte of text once loaded (e.g. pandas object columns)
+    :return: Number of rows per chunk (int)
+    """
+    row_width = estimate_row_width(input_file)
+    chunk_memory = parse_memory_size(max_memory) * CHUNK_MEMORY_FRACTION
+    chunk_rows = max(1000, int(chunk_memory // (row_width * expansion)))
+    print('Memory budget: {}, row width: {} bytes, rows per chunk: {}'.format(max_memory, row_width, chunk_rows),
+          log_type='info')
+
+    # Return
+    return chunk_rows
+
+
+# Get block size within a memory budget
+def get_block_size(max_memory=None, expansion=None):
+    """
+    This function decides how many bytes are parsed at once so that the blocks in flight use a fraction of the
+    memory budget
+    :param max_memory: Memory budget (e.g. 8G or bytes)
+    :param expansion: Memory used per byte of a block while it is parsed (including read-ahead/write-behind copies)
+    :return: Block size in bytes (int)
+    """
+    block_size = max(64 * 1024, int(parse_memory_size(max_memory) * CHUNK_MEMORY_FRACTION // expansion))
+    print('Memory budget: {}, block size: {} bytes'.format(max_memory, block_size), log_type='info')
+
+    # Return
+    return block_size
+
+
+# Remove previous output files
+def remove_output_files(output_files=None):
+    """
+    This function removes previous output files, new outputs are always written to new files
+    (cached results may share the old files, see _cache)
+    :param output_files: Python list of output file paths
+    :return: NULL
+    """
+    for output_file in output_files:
+        if output_file != _streams.STREAM_NAME and os.path.lexists(output_file):
+            try:
+                os.remove(output_file)
+            except Exception as e:
+                print('Can not remove previous file at output location! ERROR: {}'.format(e), log_type='error')
+                sys.exit(1)
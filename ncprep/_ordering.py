@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import numpy as np
+
+# Import file_operations
+import _fixedwidth
+import _sparse
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Supported node id orderings
+ID_ORDERS = ('appearance', 'degree', 'timestamp', 'rcm')
+
+
+# Degree of every node
+def node_degrees(sources=None, targets=None, n_nodes=None):
+    """
+    This function counts the edges of every node (in + out, self loops count twice)
+    :param sources: numpy integer array with source ids
+    :param targets: numpy integer array with target ids
+    :param n_nodes: Number of nodes
+    :return: numpy int64 array
+    """
+    return np.bincount(sources, minlength=n_nodes) + np.bincount(targets, minlength=n_nodes)
+
+
+# Undirected adjacency lists
+def __adjacency(sources, targets, n_nodes):
+    """
+    This function creates the undirected adjacency lists (CSR) of the graph with a counting sort by node, neighbors of
+    a node keep edge order
+    :param sources: numpy integer array with source ids
+    :param targets: numpy integer array with target ids
+    :param n_nodes: Number of nodes
+    :return: indptr, indices (numpy int64 arrays)
+    """
+    rows = np.concatenate([sources, targets])
+    columns = np.concatenate([targets, sources])
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n_nodes), out=indptr[1:])
+
+    # Return
+    return indptr, columns[_sparse.counting_sort_order(rows, n_nodes)]
+
+
+# Connected components
+def __components(sources, targets, n_nodes):
+    """
+    This function labels the connected components with hooking and pointer jumping (no python loop per node), the
+    label of a component is its smallest node id
+    :param sources: numpy integer array with source ids
+    :param targets: numpy integer array with target ids
+    :param n_nodes: Number of nodes
+    :return: numpy int64 array with the component label of every node
+    """
+    labels = np.arange(n_nodes, dtype=np.int64)
+    while True:
+        # Hook the larger root of every edge to the smaller one
+        source_labels, target_labels = labels[sources], labels[targets]
+        crossing = source_labels != target_labels
+        if not crossing.any():
+            break
+        high = np.maximum(source_labels[crossing], target_labels[crossing])
+        low = np.minimum(source_labels[crossing], target_labels[crossing])
+        np.minimum.at(labels, high, low)
+        # Point every node to its root
+        while True:
+            parents = labels[labels]
+            if np.array_equal(parents, labels):
+                break
+            labels = parents
+
+    # Return
+    return labels
+
+
+# Reverse Cuthill-McKee order
+def __rcm_order(sources, targets, n_nodes):
+    """
+    This function finds a bandwidth reducing (reverse Cuthill-McKee) order. Every component starts at its node with
+    the smallest degree and nodes are visited breadth first, neighbors in order of increasing degree. All components
+    are traversed at the same time, one level per step.
+    :param sources: numpy integer array with source ids
+    :param targets: numpy integer array with target ids
+    :param n_nodes: Number of nodes
+    :return: numpy int64 array with node ids in visiting order
+    """
+    degrees = node_degrees(sources, targets, n_nodes)
+    indptr, indices = __adjacency(sources, targets, n_nodes)
+    labels = __components(sources, targets, n_nodes)
+
+    # Start node of every component (smallest degree, then smallest id)
+    by_component = np.lexsort((np.arange(n_nodes), degrees, labels))
+    is_first = np.ones(n_nodes, dtype=bool)
+    is_first[1:] = labels[by_component][1:] != labels[by_component][:-1]
+    frontier = by_component[is_first]
+
+    visited = np.zeros(n_nodes, dtype=bool)
+    visited[frontier] = True
+    levels = [frontier]
+    while len(frontier):
+        starts = indptr[frontier]
+        lengths = indptr[frontier + 1] - starts
+        neighbors = _fixedwidth.gather_segments(indices, starts, lengths)
+        parents = np.repeat(np.arange(len(frontier)), lengths)
+        unvisited = ~visited[neighbors]
+        neighbors, parents = neighbors[unvisited], parents[unvisited]
+        # Children in order of parent position, then degree, keep the first visit of every node
+        order = np.lexsort((neighbors, degrees[neighbors], parents))
+        neighbors = neighbors[order]
+        _, first_index = np.unique(neighbors, return_index=True)
+        frontier = neighbors[np.sort(first_index)]
+        visited[frontier] = True
+        levels.append(frontier)
+
+    # Components one after the other (stable, keeps the visiting order inside a component)
+    visiting_order = np.concatenate(levels)
+    visiting_order = visiting_order[np.argsort(labels[visiting_order], kind='mergesort')]
+
+    # Return
+    return visiting_order[::-1]
+
+
+# Find new node ids
+def node_order(sources=None, targets=None, n_nodes=None, id_order='appearance', timestamps=None):
+    """
+    This function computes new ids for nodes numbered in order of first appearance
+    appearance: unchanged, degree: highest degree first, timestamp: earliest edge first,
+    rcm: reverse Cuthill-McKee (neighbors get close ids). Ties keep the order of first appearance.
+    :param sources: numpy integer array with source ids
+    :param targets: numpy integer array with target ids
+    :param n_nodes: Number of nodes
+    :param id_order: appearance, degree, timestamp or rcm
+    :param timestamps: numpy integer array with edge timestamps (timestamp order)
+    :return: numpy int64 array, new id of every node (position = old id)
+    """
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    if id_order == 'degree':
+        order = np.argsort(-node_degrees(sources, targets, n_nodes), kind='mergesort')
+    elif id_order == 'timestamp':
+        first_timestamps = np.full(n_nodes, np.iinfo(np.int64).max, dtype=np.int64)
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        np.minimum.at(first_timestamps, sources, timestamps)
+        np.minimum.at(first_timestamps, targets, timestamps)
+        order = np.argsort(first_timestamps, kind='mergesort')
+    elif id_order == 'rcm':
+        order = __rcm_order(sources, targets, n_nodes)
+    else:
+        order = np.arange(n_nodes, dtype=np.int64)
+    new_ids = np.empty(n_nodes, dtype=np.int64)
+    new_ids[order] = np.arange(n_nodes, dtype=np.int64)
+
+    # Return
+    return new_ids
+
+
+# Distance of edge endpoints in the id space
+def edge_span(sources=None, targets=None):
+    """
+    This function measures how far apart the ids of connected nodes are (smaller is better for memory locality)
+    :param sources: numpy integer array with source ids
+    :param targets: numpy integer array with target ids
+    :return: mean and maximum (bandwidth) of |source - target|
+    """
+    if not len(sources):
+        return 0.0, 0
+    spans = np.abs(np.asarray(sources, dtype=np.int64) - np.asarray(targets, dtype=np.int64))
+
+    # Return
+    return float(spans.mean()), int(spans.max())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import math
+import numpy as np
+
+# Import file_operations
+import _fixedwidth
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# 64 bit finalizer (MurmurHash3 fmix64) constants, spread every input bit of a hash over all output bits
+MIX_SHIFT = np.uint64(33)
+MIX_MULTIPLIERS = (np.uint64(0xff51afd7ed558ccd), np.uint64(0xc4ceb9fe1a85ec53))
+
+
+# Create an empty HyperLogLog sketch
+def hll_create(precision=14):
+    """
+    This function creates the registers of a HyperLogLog distinct counter
+    Standard error is about 1.04 / sqrt(2 ^ precision) (precision 14 -> 0.8%, 16 KB of memory)
+    :param precision: Number of bits used for register index (4 - 18)
+    :return: Python bytearray with 2 ^ precision registers
+    """
+    if not 4 <= int(precision) <= 18:
+        raise ValueError('HyperLogLog precision must be in between 4 and 18')
+
+    # Return
+    return bytearray(1 << int(precision))
+
+
+# Add a value into HyperLogLog sketch
+def hll_add(registers, value):
+    """
+    This function adds a value into the HyperLogLog registers
+    :param registers: HyperLogLog registers (bytearray)
+    :param value: Value to count (bytes)
+    :return: NULL
+    """
+    buffer = np.frombuffer(value, dtype=np.uint8)
+    hll_add_hashes(registers, _fixedwidth.hash_fields(buffer, np.zeros(1, dtype=np.int64),
+                                                      np.full(1, len(buffer), dtype=np.int64)))
+
+
+# Add hashed values into HyperLogLog sketch
+def hll_add_hashes(registers, hashes):
+    """
+    This function adds many values into the HyperLogLog registers at once, values are given by their 64 bit FNV-1a
+    hashes (_fixedwidth.hash_fields) so that no python object is created per value
+    :param registers: HyperLogLog registers (bytearray), updated in place
+    :param hashes: numpy uint64 array
+    :return: NULL
+    """
+    precision = len(registers).bit_length() - 1
+    with np.errstate(over='ignore'):
+        for multiplier in MIX_MULTIPLIERS:
+            hashes = (hashes ^ (hashes >> MIX_SHIFT)) * multiplier
+        hashes = hashes ^ (hashes >> MIX_SHIFT)
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    remaining = hashes & np.uint64((1 << (64 - precision)) - 1)
+
+    # Rank is the position of the first 1 bit in the remaining bits (bit length by binary search)
+    bit_length = np.zeros(len(remaining), dtype=np.uint8)
+    for shift in (32, 16, 8, 4, 2, 1):
+        is_longer = (remaining >> np.uint64(shift)) > 0
+        bit_length[is_longer] += shift
+        remaining = np.where(is_longer, remaining >> np.uint64(shift), remaining)
+    bit_length += (remaining > 0).astype(np.uint8)
+    ranks = (64 - precision + 1) - bit_length
+    np.maximum.at(np.frombuffer(registers, dtype=np.uint8), index, ranks)
+
+
+# Merge two HyperLogLog sketches
+def hll_merge(registers, other):
+    """
+    This function merges other registers into registers (union of both sets)
+    :param registers: HyperLogLog registers (bytearray), updated in place
+    :param other: HyperLogLog registers (bytearray) with same precision
+    :return: Merged registers
+    """
+    if len(registers) != len(other):
+        raise ValueError('Can not merge HyperLogLog sketches with different precision')
+    for index, rank in enumerate(other):
+        if rank > registers[index]:
+            registers[index] = rank
+
+    # Return
+    return registers
+
+
+# Estimate number of distinct values
+def hll_count(registers):
+    """
+    This function estimates the number of distinct values added into the registers
+    :param registers: HyperLogLog registers (bytearray)
+    :return: Estimated number of distinct values (int)
+    """
+    n_registers = len(registers)
+    if n_registers >= 128:
+        alpha = 0.7213 / (1 + 1.079 / n_registers)
+    else:
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}[n_registers]
+    estimate = alpha * n_registers * n_registers / sum(2.0 ** -rank for rank in registers)
+
+    # Small range correction (linear counting) [bytearray.count(0) fails on Python 2]
+    n_zeros = sum(1 for rank in registers if rank == 0)
+    if estimate <= 2.5 * n_registers and n_zeros:
+        estimate = n_registers * math.log(float(n_registers) / n_zeros)
+
+    # Return
+    return int(round(estimate))
+
+
+# Create an empty quantile sketch
+def quantile_create(relative_accuracy=0.01):
+    """
+    This function creates a log bucketed quantile sketch for non negative values
+    Every quantile is within relative_accuracy of the exact value, memory grows with log(max / min) only
+    :param relative_accuracy: Relative accuracy of the quantiles (0 - 1)
+    :return: Python dictionary with the sketch
+    """
+    if not 0 < relative_accuracy < 1:
+        raise ValueError('Relative accuracy must be in between 0 and 1')
+
+    # Return
+    return {'gamma': (1 + relative_accuracy) / (1 - relative_accuracy), 'count': 0, 'zeros': 0,
+            'min': None, 'max': None, 'bins': {}}
+
+
+# Add a value into quantile sketch
+def quantile_add(sketch, value):
+    """
+    This function adds a non negative value into the quantile sketch
+    :param sketch: Quantile sketch (dictionary)
+    :param value: Value (int/float)
+    :return: NULL
+    """
+    if value < 0:
+        raise ValueError('Quantile sketch only supports non negative values')
+    if value == 0:
+        sketch['zeros'] += 1
+    else:
+        key = int(math.ceil(math.log(value) / math.log(sketch['gamma'])))
+        sketch['bins'][key] = sketch['bins'].get(key, 0) + 1
+    sketch['count'] += 1
+    sketch['min'] = value if sketch['min'] is None else min(sketch['min'], value)
+    sketch['max'] = value if sketch['max'] is None else max(sketch['max'], value)
+
+
+# Add values into quantile sketch
+def quantile_add_values(sketch, values):
+    """
+    This function adds many non negative values into the quantile sketch at once
+    :param sketch: Quantile sketch (dictionary)
+    :param values: numpy float64 array
+    :return: NULL
+    """
+    if not len(values):
+        return
+    if (values < 0).any():
+        raise ValueError('Quantile sketch only supports non negative values')
+    positive = values[values > 0]
+    keys = np.ceil(np.log(positive) / math.log(sketch['gamma'])).astype(np.int64)
+    unique_keys, counts = np.unique(keys, return_counts=True)
+    for key, count in zip(unique_keys.tolist(), counts.tolist()):
+        sketch['bins'][key] = sketch['bins'].get(key, 0) + count
+    sketch['zeros'] += len(values) - len(positive)
+    sketch['count'] += len(values)
+    low, high = float(values.min()), float(values.max())
+    sketch['min'] = low if sketch['min'] is None else min(sketch['min'], low)
+    sketch['max'] = high if sketch['max'] is None else max(sketch['max'], high)
+
+
+# Merge two quantile sketches
+def quantile_merge(sketch, other):
+    """
+    This function merges other sketch into sketch
+    :param sketch: Quantile sketch (dictionary), updated in place
+    :param other: Quantile sketch (dictionary) with same accuracy
+    :return: Merged sketch
+    """
+    if sketch['gamma'] != other['gamma']:
+        raise ValueError('Can not merge quantile sketches with different accuracy')
+    for key, count in other['bins'].items():
+        sketch['bins'][key] = sketch['bins'].get(key, 0) + count
+    sketch['zeros'] += other['zeros']
+    sketch['count'] += other['count']
+    for bound, pick in (('min', min), ('max', max)):
+        if other[bound] is not None:
+            sketch[bound] = other[bound] if sketch[bound] is None else pick(sketch[bound], other[bound])
+
+    # Return
+    return sketch
+
+
+# Get a quantile from the sketch
+def quantile_value(sketch, quantile):
+    """
+    This function estimates the value at the given quantile
+    :param sketch: Quantile sketch (dictionary)
+    :param quantile: Quantile (0 - 1)
+    :return: Estimated value (float) or None for an empty sketch
+    """
+    if not sketch['count']:
+        return None
+    if quantile <= 0:
+        return sketch['min']
+    if quantile >= 1:
+        return sketch['max']
+
+    rank = quantile * (sketch['count'] - 1)
+    seen = sketch['zeros']
+    if rank < seen:
+        return 0.0
+    gamma = sketch['gamma']
+    for key in sorted(sketch['bins']):
+        seen += sketch['bins'][key]
+        if rank < seen:
+            # Middle of the bucket (gamma ^ (key - 1), gamma ^ key]
+            value = 2 * gamma ** key / (gamma + 1)
+            return min(max(value, sketch['min']), sketch['max'])
+
+    # Return
+    return sketch['max']
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import numpy as np
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Supported export formats
+EXPORT_FORMATS = ('csr', 'coo', 'raw')
+
+
+# Get smallest index type for number of nodes
+def index_dtype(n_nodes=None):
+    """
+    This function picks int32 indexes (same as scipy) unless there are too many nodes
+    :param n_nodes: Number of nodes
+    :return: numpy dtype
+    """
+    return np.int32 if n_nodes < np.iinfo(np.int32).max else np.int64
+
+
+# Get edge arrays of a directed or undirected graph
+def edge_arrays(sources=None, targets=None, weights=None, symmetric=False):
+    """
+    This function returns the edge arrays, for undirected graphs every edge is added in both directions
+    (self loops only once)
+    :param sources: numpy integer array with source ids
+    :param targets: numpy integer array with target ids
+    :param weights: numpy float array with edge weights or None (all weights 1)
+    :param symmetric: True for undirected graph
+    :return: rows, columns, data (numpy arrays)
+    """
+    if weights is None:
+        weights = np.ones(len(sources), dtype=np.float64)
+    if symmetric:
+        reverse = sources != targets
+        return (np.concatenate([sources, targets[reverse]]), np.concatenate([targets, sources[reverse]]),
+                np.concatenate([weights, weights[reverse]]))
+
+    # Return
+    return sources, targets, weights
+
+
+# Get stable order of integer keys
+def counting_sort_order(keys=None, n_keys=None):
+    """
+    This function finds the stable sorting order of non negative integer keys in O(n) time with counting sorts on 16
+    bit digits (least significant digit first). Stable sorts of 16 bit keys are counting (radix) sorts in numpy, every
+    pass counts the digits and places the keys at their offsets, so no comparison sort is needed.
+    :param keys: numpy integer array with values in [0, n_keys)
+    :param n_keys: Number of possible key values
+    :return: numpy int64 array
+    """
+    keys = np.asarray(keys)
+    order, shift = None, 0
+    while order is None or (max(n_keys, 1) - 1) >> shift:
+        digits = (((keys if order is None else keys[order]) >> shift) & 0xFFFF).astype(np.uint16)
+        digit_order = np.argsort(digits, kind='mergesort')
+        order = digit_order if order is None else order[digit_order]
+        shift += 16
+
+    # Return
+    return order
+
+
+# Build compressed sparse row arrays
+def build_csr(rows=None, columns=None, data=None, n_nodes=None):
+    """
+    This function builds CSR arrays with a counting sort by row: row sizes are counted to create indptr and edges are
+    placed with counting sort passes (O(edges)), so edges of a row keep their order in the input
+    :param rows: numpy integer array with row (source) ids
+    :param columns: numpy integer array with column (target) ids
+    :param data: numpy float array with edge weights
+    :param n_nodes: Number of nodes
+    :return: indptr, indices, data (numpy arrays)
+    """
+    dtype = index_dtype(max(n_nodes, len(rows)))
+    indptr = np.zeros(n_nodes + 1, dtype=dtype)
+    np.cumsum(np.bincount(rows, minlength=n_nodes), out=indptr[1:])
+    order = counting_sort_order(rows, n_nodes)
+
+    # Return
+    return indptr, columns[order].astype(dtype), data[order]
+
+
+# Get file names of a graph export
+def graph_files(file_prefix=None, export_format=None):
+    """
+    This function creates the file names of a graph export
+    :param file_prefix: Output file path without extension
+    :param export_format: csr, coo or raw
+    :return: Python list of file paths
+    """
+    if export_format == 'raw':
+        return [file_prefix + '_' + name + '.npy' for name in ('indptr', 'indices', 'data')]
+
+    # Return
+    return [file_prefix + '.npz']
+
+
+# Save graph in scipy compatible or raw format
+def save_graph(file_prefix=None, rows=None, columns=None, data=None, n_nodes=None, export_format=None):
+    """
+    This function saves the graph as scipy.sparse.load_npz compatible .npz (csr/coo) or as raw .npy arrays that can
+    be memory mapped with numpy.load(mmap_mode='r') (indptr/indices/data)
+    :param file_prefix: Output file path without extension
+    :param rows: numpy integer array with row (source) ids
+    :param columns: numpy integer array with column (target) ids
+    :param data: numpy float array with edge weights
+    :param n_nodes: Number of nodes
+    :param export_format: csr, coo or raw
+    :return: Python list of created files
+    """
+    shape = np.array([n_nodes, n_nodes], dtype=np.int64)
+    output_files = graph_files(file_prefix, export_format)
+    if export_format == 'coo':
+        dtype = index_dtype(n_nodes)
+        np.savez(output_files[0], row=rows.astype(dtype), col=columns.astype(dtype), data=data, shape=shape,
+                 format=b'coo')
+        return output_files
+
+    indptr, indices, data = build_csr(rows, columns, data, n_nodes)
+    if export_format == 'csr':
+        np.savez(output_files[0], indptr=indptr, indices=indices, data=data, shape=shape, format=b'csr')
+    else:
+        for output_file, array in zip(output_files, (indptr, indices, data)):
+            np.save(output_file, array)
+
+    # Return
+    return output_files
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import io
+import sys
+import inspect
+import functools
+import contextlib
+
+# String types [Python 2 paths can be str or unicode]
+if sys.version_info[0] == 2:
+    string_types = (basestring,)
+else:
+    string_types = (str,)
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Name of standard input/output in place of a file path
+STREAM_NAME = '-'
+
+# Number of bytes read ahead from an input stream to detect delimiter, headers and row width
+PEEK_SIZE = 64 * 1024
+
+# Standard output of the data while logs are written to standard error (see redirect_logs)
+_data_output = None
+
+
+# Check if an input/output is a stream
+def is_stream(path_or_buffer=None):
+    """
+    This function checks if an input/output is standard input/output ('-') or a file object instead of a file path
+    :param path_or_buffer: File path, '-' or file object
+    :return: True/False
+    """
+    return hasattr(path_or_buffer, 'read') or (isinstance(path_or_buffer, string_types) and
+                                               path_or_buffer == STREAM_NAME)
+
+
+# Replays the peeked head of a stream before the rest of it
+class _ReplayReader(io.RawIOBase):
+    """
+    Raw binary reader that returns the already read head first and then reads from the source stream
+    """
+    def __init__(self, head=None, source=None):
+        """
+        :param head: Bytes already read from the source
+        :param source: Source stream (binary or text)
+        """
+        self.head = head
+        self.source = source
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        """
+        This function fills the buffer from the head, then from the source stream
+        :param buffer: Writable buffer
+        :return: Number of bytes read (0 at the end of the stream)
+        """
+        if self.head:
+            data, self.head = self.head[:len(buffer)], self.head[len(buffer):]
+        else:
+            data = self.source.read(len(buffer))
+            if not isinstance(data, bytes):
+                data = data.encode('utf-8')
+        buffer[:len(data)] = data
+
+        # Return
+        return len(data)
+
+
+# Buffered input stream with a peeked head
+class InputStream(io.BufferedReader):
+    """
+    Binary input stream (standard input or a file object) that can be sniffed before it is read. The head of the
+    stream is read once and replayed, nothing is read twice and no temporary file is created.
+    """
+    def __init__(self, source=None, peek_size=PEEK_SIZE):
+        """
+        :param source: '-' for standard input or a file object (binary or text)
+        :param peek_size: Number of bytes to read ahead (extended to the end of the line)
+        """
+        if source == STREAM_NAME:
+            source = getattr(sys.stdin, 'buffer', sys.stdin)
+        elif not isinstance(source, io.BufferedIOBase) and hasattr(source, 'buffer'):
+            source = source.buffer
+        head = source.read(peek_size)
+        if not isinstance(head, bytes):
+            head = head.encode('utf-8')
+        if head and not head.endswith(b'\n'):
+            rest = source.readline()
+            head += rest if isinstance(rest, bytes) else rest.encode('utf-8')
+        self.head = head
+        self.source_name = getattr(source, 'name', '<stdin>')
+        super(InputStream, self).__init__(_ReplayReader(head, source))
+
+    def head_lines(self, n_lines=None):
+        """
+        This function returns the first complete lines of the stream without consuming them
+        :param n_lines: Number of lines (None for all lines of the head)
+        :return: Python list of lines (str)
+        """
+        lines = self.head.decode('utf-8', 'replace').splitlines(True)
+
+        # Return
+        return lines if n_lines is None else lines[:n_lines]
+
+
+# Open an input stream
+def open_input(input_file=None):
+    """
+    This function wraps standard input ('-') or a file object into a sniffable input stream, file paths are returned
+    as they are
+    :param input_file: File path, '-' or file object
+    :return: File path or InputStream
+    """
+    if is_stream(input_file) and not isinstance(input_file, InputStream):
+        return InputStream(input_file)
+
+    # Return
+    return input_file
+
+
+# Check if the output is written to standard output
+def writes_stdout(input_file=None, output_file=None):
+    """
+    This function decides if the output goes to standard output: output file is '-', or no output file is given
+    for a streamed input
+    :param input_file: File path, '-' or file object
+    :param output_file: File path, '-' or None
+    :return: True/False
+    """
+    return output_file == STREAM_NAME or (output_file is None and is_stream(input_file))
+
+
+# Get standard output for the data
+def get_stdout(binary=False):
+    """
+    This function returns the standard output of the data (also while logs are redirected to standard error)
+    :param binary: True for a binary stream (text written so far is flushed first)
+    :return: file object
+    """
+    output = _data_output if _data_output is not None else sys.stdout
+    if binary:
+        output.flush()
+        return getattr(output, 'buffer', output)
+
+    # Return
+    return output
+
+
+# Open an output file or standard output
+@contextlib.contextmanager
+def open_output(output_file=None, mode='w'):
+    """
+    This function opens the output file, standard output ('-') is flushed instead of closed
+    :param output_file: File path or '-'
+    :param mode: File mode (w, wb, a, ab)
+    :return: file object
+    """
+    if output_file == STREAM_NAME:
+        output = get_stdout(binary='b' in mode)
+        yield output
+        output.flush()
+    else:
+        with open(output_file, mode) as output:
+            yield output
+
+
+# Write logs to standard error
+@contextlib.contextmanager
+def redirect_logs(active=True):
+    """
+    This function sends the logs (print) to standard error while the data is written to standard output
+    :param active: False to keep logs on standard output
+    :return: NULL
+    """
+    global _data_output
+    if not active or _data_output is not None:
+        yield
+        return
+    _data_output = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        yield
+    finally:
+        sys.stdout = _data_output
+        _data_output = None
+        sys.stdout.flush()
+
+
+# Decorator for operations that can write to standard output
+def pipe_friendly(function):
+    """
+    This function wraps an operation with input_file/output_file parameters, logs go to standard error if the data
+    is written to standard output
+    :param function: Operation
+    :return: Wrapped operation
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        call_args = inspect.getcallargs(function, *args, **kwargs)
+        with redirect_logs(writes_stdout(call_args.get('input_file'), call_args.get('output_file'))):
+            return function(*args, **kwargs)
+
+    # Return
+    return wrapper
@@ -5,11 +5,16 @@ from __future__ import print_function
 
 # Import python libraries
 import sys
+import numpy as np
 import pandas as pd
 from pyrainbowterm import *
 
 # Import file_operations
 import _operations
+import _fixedwidth
+import _buffered_io
+import _cache
+import _streams
 
 
 # Source code meta data
@@ -17,6 +22,11 @@ __author__ = 'Dalwar Hossain'
 __email__ = 'dalwar.hossain@protonmail.com'
 
 
+# Approximate memory used per byte of text (pandas data frame with object columns / fixed width parser)
+DATA_FRAME_EXPANSION = 6
+FIXED_WIDTH_EXPANSION = 8
+
+
 # Clip data frame
 def __clip_data_frame(data_frame=None, start_date=None, periods=None):
     """
@@ -72,8 +82,8 @@ def __load_file(input_file=None, delimiter=None):
     # As the input file is being clipped, by default it should have 4 headers
     headers = ['source', 'target', 'weight', 'timestamp']
     try:
-        data_frame = pd.read_csv(input_file, delimiter=delimiter, names=headers, skipinitialspace=True,
-                                 comment='#')
+        with _buffered_io.open_read_ahead(input_file) as f:
+            data_frame = pd.read_csv(f, delimiter=delimiter, names=headers, skipinitialspace=True, comment='#')
         print('Input dataset loading complete!', log_type='info')
     except Exception as e:
         print('Can not load input dataset. ERROR: {}'.format(e), color='red', log_type='error')
@@ -83,14 +93,207 @@ def __load_file(input_file=None, delimiter=None):
     return data_frame
 
 
+# Get clipping range as unix timestamps
+def __clipping_range(start_date=None, periods=None):
+    """
+    This function converts start date and interval into a [start, end) unix timestamp range
+    :param start_date: start date of clipping
+    :param periods: how many day's data to clip
+    :return: start timestamp, end timestamp
+    """
+    # Clipping keeps whole days, so the range ends at the beginning of the day after the last date
+    date_range = pd.date_range(start_date, periods=int(periods), freq='D')
+    start_timestamp = (date_range[0] - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    end_timestamp = (date_range[-1] + pd.Timedelta(days=1) - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+
+    # Return
+    return start_timestamp, end_timestamp
+
+
+# Clip input file with fixed width arrays
+def __clip_fixed_width(input_file=None, delimiter=None, start_date=None, periods=None, block_size=None,
+                       output_file=None, time_sorted=False):
+    """
+    This function clips the input file block by block without creating python objects per row. Timestamps are parsed
+    into numpy arrays and the selected lines are copied as raw bytes into the output file.
+    :param input_file: Input file path
+    :param delimiter: column separator
+    :param start_date: start date of clipping
+    :param periods: how many day's data to clip
+    :param block_size: Number of bytes to parse at once
+    :param output_file: Output file path
+    :param time_sorted: True if the input file is sorted by timestamp (stops reading after the clipping range)
+    :return: NULL
+    """
+    start_timestamp, end_timestamp = __clipping_range(start_date=start_date, periods=periods)
+
+    print('Clipping desired data with fixed width arrays.....', log_type='info')
+    n_rows = 0
+    try:
+        with _buffered_io.WriteBehind(output_file) as f:
+            for block in _buffered_io.read_ahead(input_file, block_size):
+                buffer, starts, ends, line_starts, line_ends = _fixedwidth.parse_block(block, delimiter, 4)
+                timestamps, valid = _fixedwidth.parse_integers(buffer, starts[:, 3], ends[:, 3])
+                keep = np.flatnonzero(valid & (timestamps >= start_timestamp) & (timestamps < end_timestamp))
+
+                # Copy selected lines with their new line (neighbouring lines are copied together)
+                output = _fixedwidth.gather_segments(buffer, line_starts[keep], line_ends[keep] - line_starts[keep] + 1)
+                if delimiter is not None:
+                    output[output == ord(delimiter)] = _fixedwidth.SPACE
+                f.write(output.tobytes())
+                n_rows += len(keep)
+
+                last_timestamps = timestamps[valid][-1:]
+                if time_sorted and len(last_timestamps) and last_timestamps[0] >= end_timestamp:
+                    print('Clipping range passed, stopped reading early!', log_type='info')
+                    break
+        print('Desired data clipping complete!', log_type='info')
+    except Exception as e:
+        print('Can not write output file. ERROR: {}'.format(e), log_type='error')
+        sys.exit(1)
+    print('Total clipped rows: ', log_type='info', end='')
+    print('{}'.format(n_rows), color='cyan', text_format='bold')
+
+
+# Read and clip the input file chunk by chunk
+def __iter_clipped_chunks(input_file=None, delimiter=None, start_date=None, periods=None, chunk_rows=None,
+                          time_sorted=False):
+    """
+    This function reads the input file in chunks and yields the rows of every chunk inside the clipping range.
+    Time sorted input files are read only until the clipping range is passed.
+    :param input_file: Input file path
+    :param delimiter: column separator
+    :param start_date: start date of clipping
+    :param periods: how many day's data to clip
+    :param chunk_rows: Number of rows per chunk
+    :param time_sorted: True if the input file is sorted by timestamp (sorted by ncp.sort_by_time)
+    :return: Generator of python pandas data frames
+    """
+    # Check delimiter
+    if delimiter is None:
+        delimiter = ' '
+    else:
+        delimiter = delimiter
+
+    start_timestamp, end_timestamp = __clipping_range(start_date=start_date, periods=periods)
+
+    # As the input file is being clipped, by default it should have 4 headers
+    headers = ['source', 'target', 'weight', 'timestamp']
+    try:
+        # The next blocks are read in the background while pandas parses a chunk
+        with _buffered_io.open_read_ahead(input_file) as f:
+            reader = pd.read_csv(f, delimiter=delimiter, names=headers, skipinitialspace=True, comment='#',
+                                 chunksize=chunk_rows)
+            for chunk in reader:
+                if chunk.empty or (time_sorted and chunk['timestamp'].iloc[-1] < start_timestamp):
+                    continue
+                yield chunk[(chunk['timestamp'] >= start_timestamp) & (chunk['timestamp'] < end_timestamp)]
+                if time_sorted and chunk['timestamp'].iloc[-1] >= end_timestamp:
+                    print('Clipping range passed, stopped reading early!', log_type='info')
+                    break
+    except Exception as e:
+        print('Can not load input dataset. ERROR: {}'.format(e), color='red', log_type='error')
+        sys.exit(1)
+
+
+# Load only the needed part of a time sorted input file
+def __load_sorted_file(input_file=None, delimiter=None, start_date=None, periods=None, chunk_rows=1000000):
+    """
+    This function reads a time sorted input file in chunks and stops as soon as the clipping range is passed
+    :param input_file: Input file path (sorted by ncp.sort_by_time)
+    :param delimiter: column separator
+    :param start_date: start date of clipping
+    :param periods: how many day's data to clip
+    :param chunk_rows: Number of rows per chunk
+    :return: Python pandas data frame
+    """
+    # Load input file
+    print('Loading time sorted input dataset.....', log_type='info')
+    chunks = list(__iter_clipped_chunks(input_file=input_file, delimiter=delimiter, start_date=start_date,
+                                        periods=periods, chunk_rows=chunk_rows, time_sorted=True))
+    print('Input dataset loading complete!', log_type='info')
+
+    # Return
+    if chunks:
+        return pd.concat(chunks, ignore_index=True)
+    return pd.DataFrame(columns=['source', 'target', 'weight', 'timestamp'])
+
+
+# Clip input file chunk by chunk within a memory budget
+def __clip_in_chunks(input_file=None, delimiter=None, start_date=None, periods=None, chunk_rows=None,
+                     output_file=None, time_sorted=False):
+    """
+    This function clips the input file chunk by chunk and appends every clipped chunk to the output file, only one
+    chunk is in memory at a time
+    :param input_file: Input file path
+    :param delimiter: column separator
+    :param start_date: start date of clipping
+    :param periods: how many day's data to clip
+    :param chunk_rows: Number of rows per chunk
+    :param output_file: Output file path
+    :param time_sorted: True if the input file is sorted by timestamp
+    :return: NULL
+    """
+    print('Clipping desired data chunk by chunk.....', log_type='info')
+    n_rows = 0
+    with _buffered_io.WriteBehind(output_file) as f:
+        for chunk in __iter_clipped_chunks(input_file=input_file, delimiter=delimiter, start_date=start_date,
+                                           periods=periods, chunk_rows=chunk_rows, time_sorted=time_sorted):
+            try:
+                _buffered_io.write_data_frame(f, chunk)
+            except Exception as e:
+                print('Can not write output file. ERROR: {}'.format(e), log_type='error')
+                sys.exit(1)
+            n_rows += len(chunk.index)
+    print('Desired data clipping complete!', log_type='info')
+    print('Total clipped rows: ', log_type='info', end='')
+    print('{}'.format(n_rows), color='cyan', text_format='bold')
+
+
+# Clip the entire data in memory
+def __clip_in_memory(input_file=None, delimiter=None, start_date=None, periods=None, output_file=None,
+                     time_sorted=False):
+    """
+    This function loads the input file into a pandas data frame and clips it
+    :param input_file: Input file path
+    :param delimiter: Column separator
+    :param start_date: start date of clipping
+    :param periods: how many day's data to clip
+    :param output_file: Output file path
+    :param time_sorted: True if the input file is sorted by timestamp
+    :return: NULL
+    """
+    # Load input file, files sorted by ncprep can stop reading after the clipping range
+    if time_sorted:
+        print('Time sorted input file detected!', log_type='info')
+        data_frame = __load_sorted_file(input_file=input_file, delimiter=delimiter, start_date=start_date,
+                                        periods=periods)
+    else:
+        data_frame = __load_file(input_file=input_file, delimiter=delimiter)
+
+    # Clip data frame
+    clipped_text = __clip_data_frame(data_frame=data_frame, start_date=start_date, periods=periods)
+
+    # Create output file of the clipped data
+    _operations.create_output_file(data_frame=clipped_text, output_file_name=output_file)
+
+
 # Create text clipper function
-def clip_text(input_file=None, delimiter=None, start_date=None, interval=None):
+@_streams.pipe_friendly
+def clip_text(input_file=None, delimiter=None, start_date=None, interval=None, fixed_width=False, block_size='8M',
+              max_memory=None, cache=False, output_file=None):
     """
     This function controls the other functions
-    :param input_file: Input file to clip
+    :param input_file: Input file to clip, '-' (standard input) or a file object
     :param delimiter: Column separator for input file
     :param start_date: Start date of clipping (dd-mm-YYYY)
     :param interval: for how many days (int)
+    :param fixed_width: Clip with numpy arrays and raw lines instead of a pandas data frame (True/False)
+    :param block_size: Number of bytes to parse at once in fixed width mode (e.g. 8M)
+    :param max_memory: Memory budget (e.g. 8G), chunk/block sizes are chosen from it
+    :param cache: Reuse results of previous runs with the same input file and parameters (True: identify the input
+                  file by path, size and modification time, 'content': by content hash)
+    :param output_file: Output file path or '-' (standard output, default for streams), default: next to input file
     :return: clipped text, rest of the text
     """
     # Check inputs to avoid exceptions
@@ -102,6 +305,11 @@ def clip_text(input_file=None, delimiter=None, start_date=None, interval=None):
         else:
             delimiter = delimiter
 
+        # Streams are sniffed on a peeked head and written to standard output
+        input_file = _streams.open_input(input_file)
+        if output_file is None and _streams.is_stream(input_file):
+            output_file = _streams.STREAM_NAME
+
         # Check sanity of the input file
         sanity_status = _operations.sanity_check(input_file=input_file, delimiter=delimiter)
 
@@ -111,16 +319,42 @@ def clip_text(input_file=None, delimiter=None, start_date=None, interval=None):
 
     # If sanity check is passed, read and clip the text
     if sanity_status == 1:
-        # Load input file
-        data_frame = __load_file(input_file=input_file, delimiter=delimiter)
+        # Create output file name
+        if output_file is None:
+            file_name, ext = input_file.rsplit('.', 1)
+            output_file = file_name + '_clipped.' + ext
+
+        # Reuse cached result
+        if cache and _cache.is_cacheable(input_file, [output_file]):
+            start_timestamp, end_timestamp = __clipping_range(start_date=start_date, periods=interval)
+            parameters = {'delimiter': delimiter, 'start': int(start_timestamp), 'end': int(end_timestamp),
+                          'fixed_width': bool(fixed_width)}
+            key = _cache.cache_key(input_file, 'clip_text', parameters, content_hash=cache == 'content')
+            if _cache.lookup(key, [output_file]):
+                return
+        _operations.remove_output_files([output_file])
 
-        # Clip data frame
-        clipped_text = __clip_data_frame(data_frame=data_frame, start_date=start_date, periods=interval)
+        # Clip without pandas data frame
+        time_sorted = _operations.is_time_sorted(input_file)
+        if fixed_width:
+            if max_memory:
+                block_size = _operations.get_block_size(max_memory, expansion=FIXED_WIDTH_EXPANSION)
+            __clip_fixed_width(input_file=input_file, delimiter=delimiter, start_date=start_date, periods=interval,
+                               block_size=_operations.parse_memory_size(block_size), output_file=output_file,
+                               time_sorted=time_sorted)
+
+        # Clip chunk by chunk within the memory budget
+        elif max_memory:
+            chunk_rows = _operations.get_chunk_rows(input_file, max_memory, expansion=DATA_FRAME_EXPANSION)
+            __clip_in_chunks(input_file=input_file, delimiter=delimiter, start_date=start_date, periods=interval,
+                             chunk_rows=chunk_rows, output_file=output_file, time_sorted=time_sorted)
+        else:
+            __clip_in_memory(input_file=input_file, delimiter=delimiter, start_date=start_date, periods=interval,
+                             output_file=output_file, time_sorted=time_sorted)
 
-        # Create output file of the clipped data
-        file_name, ext = input_file.rsplit('.', 1)
-        output_file = file_name + '_clipped.' + ext
-        _operations.create_output_file(data_frame=clipped_text, output_file_name=output_file)
+        # Store result in cache
+        if cache and _cache.is_cacheable(input_file, [output_file], warn=False):
+            _cache.store(key, input_file, [output_file])
     else:
         print('Sanity check failed!', log_type='error', color='red')
         sys.exit(1)
@@ -5,11 +5,17 @@ from __future__ import print_function
 
 # Import python libraries
 import sys
+import operator
+import threading
 import subprocess
+import numpy as np
 from pyrainbowterm import *
 
 # Import file_operations
 import _operations
+import _fixedwidth
+import _buffered_io
+import _streams
 
 
 # Source code meta data
@@ -17,14 +23,21 @@ __author__ = 'Dalwar Hossain'
 __email__ = 'dalwar.hossain@protonmail.com'
 
 
+# Approximate memory used per byte of a block (awk stream with read-ahead/write-behind queues / numpy parser)
+STREAM_EXPANSION = 8
+FIXED_WIDTH_EXPANSION = 8
+
+# Operators of the row conditions
+OPERATORS = {'>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt, '==': operator.eq,
+             '=': operator.eq, '!=': operator.ne}
+
+
 # Create awk command
-def __create_command(input_file, columns_to_use, column_separator, output_file):
+def __create_command(columns_to_use, column_separator):
     """
-    This function creates the linux command to filter the columns and creating the output file
-    :param input_file: A valid file path to raw data file
+    This function creates the linux command to filter the columns of the text from standard input
     :param columns_to_use: Indexes of the columns that needs to be filtered out (index starts from 1)
     :param column_separator: Column separator in input/output file (default is ',' [comma])
-    :param output_file: A valid file path where the output will be stored
     :return: A linux shell command
     """
     print('Creating text filter command.....', log_type='info')
@@ -44,7 +57,8 @@ def __create_command(input_file, columns_to_use, column_separator, output_file):
         delimiter = ''
     else:
         delimiter = ' -F "' + column_separator + '"'
-    command = "awk" + delimiter + " '{print " + command_segment + "}' " + input_file + " > " + output_file
+    # Commented lines (e.g. the sorted marker of ncp.sort_by_time) are written unchanged
+    command = "awk" + delimiter + " '$1 ~ /^#/ {print; next} {print " + command_segment + "}'"
 
     print('Command creation complete!', log_type='info')
 
@@ -52,31 +66,244 @@ def __create_command(input_file, columns_to_use, column_separator, output_file):
     return command
 
 
+# Feed input blocks into the filter command
+def __feed_command(process, input_file, block_size, errors):
+    """
+    This function (background thread) writes read-ahead blocks of the input file into the standard input of the command
+    :param process: subprocess.Popen object
+    :param input_file: A valid file path to raw data file
+    :param block_size: Number of bytes to read at once
+    :param errors: Python list, the exception of the thread is appended here
+    :return: NULL
+    """
+    try:
+        for block in _buffered_io.read_ahead(input_file, block_size):
+            process.stdin.write(block)
+    except Exception as e:
+        errors.append(e)
+    finally:
+        process.stdin.close()
+
+
 # Create output file with filtered data from input file
-def __create_output_file(command):
+def __create_output_file(command, input_file, output_file, block_size):
     """
-    This function uses python subprocess module to read input file, filter with AWK and store data in a output file
+    This function uses python subprocess module to filter the input file with AWK. Input blocks are read ahead and
+    output blocks are written behind in background threads, so reading, filtering and writing overlap.
     :param command: A linux AWK command
+    :param input_file: A valid file path to raw data file
+    :param output_file: A valid file path where the output will be stored
+    :param block_size: Number of bytes to read/write at once
     :return: Data stored in output file
     """
     print('Reading input file.....', log_type='info')
     try:
         print('Creating output file.....', log_type='info')
-        subprocess.check_output(command, shell=True, universal_newlines=True).strip()
+        process = subprocess.Popen(command, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        errors = []
+        feeder = threading.Thread(target=__feed_command, args=(process, input_file, block_size, errors))
+        feeder.daemon = True
+        feeder.start()
+        with _buffered_io.WriteBehind(output_file) as output:
+            while True:
+                block = process.stdout.read(block_size)
+                if not block:
+                    break
+                output.write(block)
+        feeder.join()
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+        if errors:
+            raise errors[0]
+        print('Output file creation complete!', log_type='info')
+    except Exception as e:
+        print('Output file creation error. ERROR: {}'.format(e), color='red', log_type='error')
+        sys.exit(1)
+
+
+# Parse column indexes
+def __parse_column_indexes(column_indexes, parameter):
+    """
+    This function converts comma separated column indexes like "1,2" into python list
+    :param column_indexes: Comma separated column indexes (index starts from 1)
+    :param parameter: Name of the parameter (for the error message)
+    :return: Python list of column indexes
+    """
+    try:
+        columns = [int(column) for column in column_indexes.split(',')]
+        if min(columns) < 1:
+            raise ValueError('column index starts from 1')
+    except Exception as e:
+        print('{} "{}" does not match input criteria! ERROR: {}'.format(parameter, column_indexes, e),
+              log_type='error')
+        print('Try: "1,4,6,3" [Index starts from 1, separated by comma (,)]', log_type='hint')
+        sys.exit(1)
+
+    # Return
+    return columns
+
+
+# Parse row conditions
+def __parse_conditions(conditions):
+    """
+    This function converts row conditions like "3>=0.5,4<1510000000" into python list
+    :param conditions: Comma separated conditions [column index (starts from 1), operator, number]
+    :return: Python list of (column index, operator, value)
+    """
+    print('Checking row conditions.....', log_type='info')
+    parsed_conditions = []
+    for condition in conditions.split(','):
+        # Two character operators are checked first
+        for symbol in ('>=', '<=', '!=', '==', '>', '<', '='):
+            if symbol in condition:
+                column, value = condition.split(symbol, 1)
+                break
+        else:
+            column, value, symbol = None, None, None
+        try:
+            if int(column) < 1:
+                raise ValueError('column index starts from 1')
+            parsed_conditions.append((int(column), OPERATORS[symbol], float(value)))
+        except Exception as e:
+            print('Row condition "{}" does not match input criteria! ERROR: {}'.format(condition, e),
+                  log_type='error')
+            print('Try: "3>=0.5,4<1510000000" [Index starts from 1, operators: >=, <=, >, <, ==, !=]',
+                  log_type='hint')
+            sys.exit(1)
+
+    # Return
+    return parsed_conditions
+
+
+# Load an address list into a compact hash set
+def __load_address_set(list_file, block_size):
+    """
+    This function loads an address list (first column of every line) into a sorted array of 64 bit hashes.
+    Every address takes 8 bytes and no python object is created per address.
+    :param list_file: A file path to the address list
+    :param block_size: Number of bytes to read at once
+    :return: Sorted numpy uint64 array
+    """
+    print('Loading address list: {}.....'.format(list_file), log_type='info')
+    list_file, permission_status = _operations.check_input_file_permissions(list_file)
+    if permission_status != 1:
+        sys.exit(1)
+    hashes = []
+    for block in _buffered_io.read_ahead(list_file, block_size):
+        buffer, starts, ends, _, _ = _fixedwidth.parse_block(block, None, 1)
+        hashes.append(_fixedwidth.hash_fields(buffer, starts[:, 0], ends[:, 0]))
+    address_set = np.unique(np.concatenate(hashes)) if hashes else np.zeros(0, dtype=np.uint64)
+    print('Total addresses in the list: ', log_type='info', end='')
+    print('{}'.format(len(address_set)), color='cyan', text_format='bold')
+
+    # Return
+    return address_set
+
+
+# Check membership of hashes in a hash set
+def __is_member(hashes, address_set):
+    """
+    This function checks which hashes are in the sorted hash set
+    :param hashes: numpy uint64 array
+    :param address_set: Sorted numpy uint64 array
+    :return: numpy bool array
+    """
+    if not len(address_set):
+        return np.zeros(len(hashes), dtype=bool)
+    positions = np.minimum(np.searchsorted(address_set, hashes), len(address_set) - 1)
+
+    # Return
+    return address_set[positions] == hashes
+
+
+# Filter rows and columns with numpy
+def __filter_rows(input_file, output_file, columns_to_use, column_separator, conditions, list_columns, deny_set,
+                  allow_set, block_size):
+    """
+    This function evaluates row conditions and address lists block by block and writes the selected columns of the
+    selected rows (separated by whitespace, same as the awk filter) in the same pass. Commented lines are written
+    unchanged (same as the awk filter), lines with less fields than needed are dropped.
+    :param input_file: A valid file path to raw data file
+    :param output_file: A valid file path where the output will be stored
+    :param columns_to_use: Python list of column indexes (starts from 1)
+    :param column_separator: Column separator of input file (None for whitespace)
+    :param conditions: Python list of (column index, operator, value)
+    :param list_columns: Python list of column indexes (starts from 1) checked against the address lists
+    :param deny_set: Sorted numpy uint64 array (rows with any listed column in the set are dropped) or None
+    :param allow_set: Sorted numpy uint64 array (rows with all listed columns in the set are kept) or None
+    :param block_size: Number of bytes to read/write at once
+    :return: NULL
+    """
+    n_fields = max(columns_to_use + [column for column, _, _ in conditions] + list_columns)
+    n_rows, n_selected = 0, 0
+    print('Filtering rows and columns.....', log_type='info')
+    try:
+        with _buffered_io.WriteBehind(output_file) as output:
+            for block in _buffered_io.read_ahead(input_file, block_size):
+                buffer, starts, ends, line_starts, _ = _fixedwidth.parse_block(block, column_separator, n_fields,
+                                                                               skip_initial_space=False)
+                keep = np.ones(len(starts), dtype=bool)
+                for column, compare, value in conditions:
+                    numbers, valid = _fixedwidth.parse_numbers(buffer, starts[:, column - 1], ends[:, column - 1])
+                    keep &= valid & compare(numbers, value)
+                for column in list_columns:
+                    hashes = _fixedwidth.hash_fields(buffer, starts[:, column - 1], ends[:, column - 1])
+                    if deny_set is not None:
+                        keep &= ~__is_member(hashes, deny_set)
+                    if allow_set is not None:
+                        keep &= __is_member(hashes, allow_set)
+                rows = np.flatnonzero(keep)
+
+                # Selected fields, each followed by a whitespace (new line after the last one)
+                extended = np.concatenate([buffer, np.array([_fixedwidth.SPACE, _fixedwidth.NEW_LINE],
+                                                            dtype=np.uint8)])
+                columns = np.array(columns_to_use) - 1
+                separators = np.full(len(columns), len(buffer), dtype=np.int64)
+                separators[-1] += 1
+                field_starts = starts[rows][:, columns]
+                segment_starts = np.dstack([field_starts, np.broadcast_to(separators, field_starts.shape)]).ravel()
+                segment_lengths = np.dstack([ends[rows][:, columns] - field_starts,
+                                             np.ones_like(field_starts)]).ravel()
+
+                # Commented lines with their new line, in input order between the selected rows
+                comment_starts, comment_ends = _fixedwidth.comment_lines(buffer, column_separator,
+                                                                         skip_initial_space=False)
+                if len(comment_starts):
+                    segment_lines = np.concatenate([np.repeat(line_starts[rows], 2 * len(columns)),
+                                                    np.repeat(comment_starts, 2)])
+                    segment_starts = np.concatenate([segment_starts, np.dstack(
+                        [comment_starts, np.full(len(comment_starts), len(buffer) + 1)]).ravel()])
+                    segment_lengths = np.concatenate([segment_lengths, np.dstack(
+                        [comment_ends - comment_starts, np.ones_like(comment_starts)]).ravel()])
+                    order = np.argsort(segment_lines, kind='mergesort')
+                    segment_starts, segment_lengths = segment_starts[order], segment_lengths[order]
+                output.write(_fixedwidth.gather_segments(extended, segment_starts, segment_lengths).tobytes())
+                n_rows += len(starts)
+                n_selected += len(rows)
         print('Output file creation complete!', log_type='info')
     except Exception as e:
         print('Output file creation error. ERROR: {}'.format(e), color='red', log_type='error')
         sys.exit(1)
+    print('Selected rows: ', log_type='info', end='')
+    print('{} / {}'.format(n_selected, n_rows), color='cyan', text_format='bold')
 
 
 # Create filter columns
-def filter_columns(input_file=None, column_indexes=None, delimiter=None, output_file=None):
+@_streams.pipe_friendly
+def filter_columns(input_file=None, column_indexes=None, delimiter=None, output_file=None, block_size='8M',
+                   conditions=None, deny_file=None, allow_file=None, list_columns='1,2', max_memory=None):
     """
     This function filters text input depending on columns and delimiter
-    :param input_file: A file path to raw data file
+    :param input_file: A file path to raw data file, '-' (standard input) or a file object
     :param column_indexes: Indexes of the columns that needs to be filtered out (index starts from 1)
     :param delimiter: Column separator in input/output file (default is ' ' [whitespace])
-    :param output_file: A file path where the output will be stored
+    :param output_file: A file path where the output will be stored or '-' (standard output, default for streams)
+    :param block_size: Number of bytes to read/write at once (e.g. 8M)
+    :param conditions: Numeric row conditions, e.g. "3>=0.5,4<1510000000" (index starts from 1)
+    :param deny_file: A file path to an address list, rows with any of these addresses are dropped
+    :param allow_file: A file path to an address list, only rows with all addresses in this list are kept
+    :param list_columns: Indexes of the columns checked against the address lists (default "1,2")
+    :param max_memory: Memory budget (e.g. 8G), block size is chosen from it
     :return: File object
     """
     # Check inputs to avoid Exceptions
@@ -88,6 +315,11 @@ def filter_columns(input_file=None, column_indexes=None, delimiter=None, output_
         else:
             delimiter = delimiter
 
+        # Streams are sniffed on a peeked head and written to standard output
+        input_file = _streams.open_input(input_file)
+        if output_file is None and _streams.is_stream(input_file):
+            output_file = _streams.STREAM_NAME
+
         # Check the output file parameter
         if output_file is None:
             print('No output file provided! Using same directory as input file.....', log_type='warn', color='orange')
@@ -105,14 +337,36 @@ def filter_columns(input_file=None, column_indexes=None, delimiter=None, output_
 
     # Check if sanity check is Okay
     if sanity_status == 1:
+        columns_to_use = __parse_column_indexes(column_indexes, 'Column indexes')
+
+        # Rows are filtered with numpy in the same pass as the columns
+        if conditions or deny_file or allow_file:
+            if max_memory:
+                block_size = _operations.get_block_size(max_memory, expansion=FIXED_WIDTH_EXPANSION)
+            block_size = _operations.parse_memory_size(block_size)
+            parsed_conditions = __parse_conditions(conditions) if conditions else []
+            deny_set = __load_address_set(deny_file, block_size) if deny_file else None
+            allow_set = __load_address_set(allow_file, block_size) if allow_file else None
+            list_columns = __parse_column_indexes(list_columns, 'List columns') if deny_file or allow_file else []
+            address_set_memory = sum(address_set.nbytes for address_set in (deny_set, allow_set)
+                                     if address_set is not None)
+            if max_memory and address_set_memory > _operations.parse_memory_size(max_memory):
+                print('Address lists (~{} bytes) are larger than memory budget!'.format(address_set_memory),
+                      log_type='warn', color='orange')
+            __filter_rows(input_file, output_file, columns_to_use, delimiter, parsed_conditions, list_columns,
+                          deny_set, allow_set, block_size)
+            return
+
         # Double checking the delimiter
         if delimiter is None:
             command_delimiter = ' '  # Using default delimiter
         else:
             command_delimiter = delimiter
-        command = __create_command(input_file, column_indexes, command_delimiter, output_file)
+        if max_memory:
+            block_size = _operations.get_block_size(max_memory, expansion=STREAM_EXPANSION)
+        command = __create_command(column_indexes, command_delimiter)
         if command:
-            __create_output_file(command)
+            __create_output_file(command, input_file, output_file, _operations.parse_memory_size(block_size))
         else:
             print('There was an error in command creation!', log_type='error')
             sys.exit(1)
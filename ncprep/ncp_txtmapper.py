@@ -4,14 +4,33 @@
 from __future__ import print_function
 
 # Import python libraries
+import io
+import os
 import sys
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
 import pandas as pd
 import math
+import json
 import datetime
 from pyrainbowterm import *
 
+# Import pickle [Python 2 uses cPickle]
+if sys.version_info[0] == 2:
+    import cPickle as pickle
+else:
+    import pickle
+
 # Import file_operations
 import _operations
+import _fixedwidth
+import _buffered_io
+import _sparse
+import _cache
+import _ordering
+import _streams
 
 
 # Source code meta data
@@ -19,6 +38,17 @@ __author__ = 'Dalwar Hossain'
 __email__ = 'dalwar.hossain@protonmail.com'
 
 
+# Approximate memory used per byte of text (pandas data frame with object columns / fixed width parser)
+DATA_FRAME_EXPANSION = 6
+FIXED_WIDTH_EXPANSION = 8
+
+# Approximate memory used by a mapping dictionary entry besides the label (id, hash table slot)
+MAPPING_ENTRY_OVERHEAD = 100
+
+# Mapping dictionary of the shard encoder processes (see __init_shard_encoder)
+_shard_mapping_dict = None
+
+
 # Numeric mapping of the entire data
 def __numeric_mapping(data_frame, mapping_dict):
     """
@@ -36,19 +66,23 @@ def __numeric_mapping(data_frame, mapping_dict):
     return data_frame
 
 
-# Extract unique nodes/values for mapping
-def __extract_nodes(data_frame):
+# Find unique nodes/values in order of first appearance
+def __unique_labels(data_frame):
     """
-    This function extracts unique values from a python pandas data frame given that first two columns have headers
-    'source' and 'target'
+    This function finds unique values of 'source' and 'target' columns, all sources come before the targets
     :param data_frame: Python pandas data frame
-    :return: Python dictionary with unique values mapped to an integer
+    :return: numpy array with unique values in order of first appearance
     """
-    # Find unique values to create a look up table
-    # Returns a numpy array
-    print('Extracting unique values/nodes.....', log_type='info')
-    unique_values = pd.unique(data_frame[['source', 'target']].values.ravel('K'))
+    return pd.unique(np.concatenate([data_frame['source'].values, data_frame['target'].values]))
+
 
+# Create mapping dictionary from unique values
+def __create_mapping_dict(unique_values):
+    """
+    This function maps every unique value to its position
+    :param unique_values: numpy array with unique values
+    :return: Python dictionary with unique values mapped to an integer
+    """
     # Create a PANDAS data frame out of numpy array with unique nodes
     print('Converting values into pandas data frame.....', log_type='info')
     lookup_data = pd.DataFrame(unique_values, columns=['label'])
@@ -64,6 +98,23 @@ def __extract_nodes(data_frame):
     return mapping_dict
 
 
+# Extract unique nodes/values for mapping
+def __extract_nodes(data_frame):
+    """
+    This function extracts unique values from a python pandas data frame given that first two columns have headers
+    'source' and 'target'
+    :param data_frame: Python pandas data frame
+    :return: Python dictionary with unique values mapped to an integer
+    """
+    # Find unique values to create a look up table
+    # Returns a numpy array
+    print('Extracting unique values/nodes.....', log_type='info')
+    unique_values = __unique_labels(data_frame)
+
+    # Return mapping dictionary
+    return __create_mapping_dict(unique_values)
+
+
 # Clean and convert weights into normalized form (rounded up to 6 decimal point)
 def __clean_convert_weight(x):
     """
@@ -78,13 +129,14 @@ def __clean_convert_weight(x):
     return log_x
 
 
-# Load input file in to pandas data frame
-def __load_file(input_dataset, column_separator, headers):
+# Read input text in to pandas data frame
+def __read_file(input_dataset, column_separator, headers, chunk_rows=None):
     """
-    This function reads a text file and loads it into python pandas data frame
-    :param input_dataset: A file path that contains row x column wise text data
+    This function reads a text file (or buffer) into python pandas data frame without any cleanup
+    :param input_dataset: A file path or buffer that contains row x column wise text data
     :param column_separator: A value that separates the columns in the input dataset
     :param headers: Names of the columns from input dataset
+    :param chunk_rows: Number of rows per chunk (returns an iterator of data frames) or None for the whole file
     :return: Python pandas data frame
     """
     # Check headers
@@ -101,43 +153,617 @@ def __load_file(input_dataset, column_separator, headers):
     else:
         delimiter = column_separator
 
+    # Return pandas data frame
+    return pd.read_csv(input_dataset, delimiter=delimiter, names=headers, skipinitialspace=True,
+                       converters=convert_dict, comment='#', usecols=columns_to_use, chunksize=chunk_rows)
+
+
+# Clean pandas data frame
+def __clean_data_frame(data_frame):
+    """
+    This function drops empty rows and rows with invalid source/target values
+    :param data_frame: Python pandas data frame
+    :return: Python pandas data frame
+    """
+    # Drop rows that contains NaN/Blank column values
+    data_frame = data_frame.dropna()
+
+    # Filter out source and target column for values with valid length
+    short = data_frame[['source', 'target']].applymap(lambda x: len(str(x)) < _fixedwidth.MIN_ADDRESS_LENGTH)
+    data_frame = data_frame[~short.any(axis=1)]
+
+    # Timestamps become float if the column had empty values, convert them back
+    if data_frame['timestamp'].dtype.kind == 'f':
+        data_frame['timestamp'] = data_frame['timestamp'].astype(np.int64)
+
+    # Reset index of the data frame
+    data_frame = data_frame.reset_index(drop=True)
+
+    # Return pandas data frame
+    return data_frame
+
+
+# Load input file in to pandas data frame
+def __load_file(input_dataset, column_separator, headers):
+    """
+    This function reads a text file and loads it into python pandas data frame
+    :param input_dataset: A file path that contains row x column wise text data
+    :param column_separator: A value that separates the columns in the input dataset
+    :param headers: Names of the columns from input dataset
+    :return: Python pandas data frame
+    """
     # Load input file
     print('Loading input dataset.....', log_type='info')
     try:
-        data_frame = pd.read_csv(input_dataset, delimiter=delimiter, names=headers, skipinitialspace=True,
-                                 converters=convert_dict, comment='#', usecols=columns_to_use)
+        with _buffered_io.open_read_ahead(input_dataset) as f:
+            data_frame = __read_file(f, column_separator, headers)
         print('Input dataset loading complete!', log_type='info')
     except Exception as e:
         print('Can not load input dataset. ERROR: {}'.format(e), color='red', log_type='error')
         sys.exit(1)
 
-    # Drop rows that contains NaN/Blank column values
+    # Drop empty rows, filter out invalid source/target values and reset index
     print('Removing empty target/destination(s).....', log_type='info')
-    data_frame = data_frame.dropna()
-
-    # Filter out source and target column for values with valid length
     print('Cleaning data.....', log_type='info')
-    data_frame = data_frame[~data_frame[['source', 'target']].applymap(lambda x: len(str(x)) < 34).any(axis=1)]
-
-    # Reset index of the data frame
-    print('Resetting data frame index.....', log_type='info')
-    data_frame = data_frame.reset_index(drop=True)
+    data_frame = __clean_data_frame(data_frame)
 
     # Return pandas data frame
     return data_frame
 
 
+# Load and clean a byte range (shard) of the input file
+def __extract_shard_nodes(task):
+    """
+    This function cleans one shard of the input file, stores it in a temporary file and finds its unique values
+    :param task: (input_file, start, end, delimiter, headers, temporary shard file)
+    :return: unique sources, unique targets (numpy arrays in order of first appearance)
+    """
+    input_file, start, end, delimiter, headers, shard_file = task
+    with open(input_file, 'rb') as f:
+        f.seek(start)
+        shard = f.read(end - start)
+    try:
+        data_frame = __read_file(io.BytesIO(shard), delimiter, headers)
+    except pd.errors.EmptyDataError:
+        # Shard with comments only
+        data_frame = pd.DataFrame(columns=headers)
+    data_frame = __clean_data_frame(data_frame)
+    data_frame.to_pickle(shard_file)
+
+    # Return
+    return pd.unique(data_frame['source'].values), pd.unique(data_frame['target'].values)
+
+
+# Share the mapping dictionary with the encoder processes
+def __init_shard_encoder(mapping_dict):
+    """
+    This function stores the global mapping dictionary in a worker process
+    :param mapping_dict: Python dictionary with str -> number(int/long) mapping
+    :return: NULL
+    """
+    global _shard_mapping_dict
+    _shard_mapping_dict = mapping_dict
+
+
+# Encode a cleaned shard
+def __encode_shard(task):
+    """
+    This function maps a cleaned shard with the global mapping dictionary and writes a partial output file
+    :param task: (temporary shard file, partial output file, True/False to return edge arrays)
+    :return: partial output file, edge arrays (or None)
+    """
+    shard_file, part_file, keep_arrays = task
+    data_frame = __numeric_mapping(pd.read_pickle(shard_file), _shard_mapping_dict)
+    data_frame.to_csv(part_file, index=False, header=False, sep=' ')
+
+    # Return
+    return part_file, __edge_arrays(data_frame) if keep_arrays else None
+
+
+# Sharded (map-reduce) numeric mapping
+def __sharded_mapping(input_file, delimiter, headers, n_jobs, output_file_name, mapping_file_name, info_file_name,
+                      max_memory=None, export=None, symmetric=False):
+    """
+    This function maps the strings to numeric values with multiple processes. Every worker cleans a byte range of
+    the input file and finds its unique values, ids are assigned in shard order (sources before targets) so the
+    result is the same as single process mapping for any number of workers. Shards are encoded in parallel.
+    :param input_file: Input file path
+    :param delimiter: Column separator
+    :param headers: Names of the columns from input dataset
+    :param n_jobs: Number of worker processes
+    :param output_file_name: Numeric output file path
+    :param mapping_file_name: Mapping (.pkl) file path
+    :param info_file_name: Mapping information (.json) file path
+    :param max_memory: Memory budget (e.g. 8G), the input file is split into more shards than workers to fit
+    :param export: Sparse graph export format (csr, coo, raw) or None
+    :param symmetric: True for undirected sparse graph export
+    :return: NULL
+    """
+    work_dir = tempfile.mkdtemp(prefix='ncprep_map_')
+    try:
+        n_shards = n_jobs
+        if max_memory:
+            shard_memory = _operations.parse_memory_size(max_memory) * _operations.CHUNK_MEMORY_FRACTION / n_jobs
+            n_shards = max(n_jobs, int(os.path.getsize(input_file) * DATA_FRAME_EXPANSION // shard_memory) + 1)
+        byte_ranges = _operations.get_byte_ranges(input_file, n_shards)
+        tasks = [(input_file, start, end, delimiter, headers,
+                  os.path.join(work_dir, 'shard_{:05d}.pkl'.format(index)))
+                 for index, (start, end) in enumerate(byte_ranges)]
+
+        # Map: clean shards and find their unique values
+        print('Loading and cleaning {} shard(s) with {} worker(s).....'.format(len(tasks), n_jobs), log_type='info')
+        pool = multiprocessing.Pool(processes=n_jobs)
+        try:
+            shard_nodes = pool.map(__extract_shard_nodes, tasks)
+        except Exception as e:
+            print('Can not load input dataset. ERROR: {}'.format(e), color='red', log_type='error')
+            sys.exit(1)
+        finally:
+            pool.close()
+            pool.join()
+        print('Data cleanup complete!', log_type='info')
+
+        # Reduce: assign global ids deterministically
+        print('Merging unique values/nodes of all shards.....', log_type='info')
+        unique_values = pd.unique(np.concatenate([sources for sources, _ in shard_nodes] +
+                                                 [targets for _, targets in shard_nodes]))
+        mapping_dict = __create_mapping_dict(unique_values)
+        if max_memory:
+            # Unique values of all shards are gathered in the main process, only the shards are sized to the budget
+            mapping_memory = sum(__mapping_entry_size(label) for label in unique_values)
+            if mapping_memory > _operations.parse_memory_size(max_memory):
+                print('Mapping table (~{} bytes) is larger than memory budget!'.format(mapping_memory),
+                      log_type='warn', color='orange')
+        print('Numeric mapping reference creation complete!', log_type='info')
+        _operations.create_mapping_file(output_file_name=mapping_file_name, data=mapping_dict)
+
+        # Encode shards in parallel
+        start_time = datetime.datetime.now()
+        print('Numeric mapping started at: {}'.format(start_time.strftime("%H:%M:%S")), log_type='info')
+        encode_tasks = [(shard_file, shard_file.rsplit('.', 1)[0] + '.txt', export is not None)
+                        for _, _, _, _, _, shard_file in tasks]
+        pool = multiprocessing.Pool(processes=n_jobs, initializer=__init_shard_encoder, initargs=(mapping_dict,))
+        try:
+            encoded_shards = pool.map(__encode_shard, encode_tasks)
+        finally:
+            pool.close()
+            pool.join()
+        mapping_end_time = datetime.datetime.now() - start_time
+        print('Elapsed time for mapping: ', log_type='info', end='')
+        print('{}'.format(mapping_end_time), color='cyan', text_format='bold')
+        print('Numeric mapping complete!', log_type='info')
+
+        # Concatenate partial output files in shard order
+        print('Creating output file.....', log_type='info')
+        try:
+            with _buffered_io.WriteBehind(output_file_name) as output_file:
+                for part_file, _ in encoded_shards:
+                    with open(part_file, 'rb') as part:
+                        shutil.copyfileobj(part, output_file, _buffered_io.READ_AHEAD_BLOCK_SIZE)
+            print('Output file creation complete!', log_type='info')
+        except Exception as e:
+            print('Can not write output file. ERROR: {}'.format(e), log_type='error')
+            sys.exit(1)
+
+        __create_info_file(info_file_name, 'appearance', len(mapping_dict))
+        if export:
+            edges = [arrays for _, arrays in encoded_shards]
+            weights = np.concatenate([w for _, _, w in edges]) if edges and edges[0][2] is not None else None
+            __export_graph(input_file, np.concatenate([s for s, _, _ in edges]),
+                           np.concatenate([t for _, t, _ in edges]), weights, len(mapping_dict), export, symmetric,
+                           max_memory=max_memory)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# Load input file into fixed width arrays
+def __load_fixed_width(input_file, column_separator, headers, block_size):
+    """
+    This function reads the input file block by block into contiguous numpy arrays. Source and target values are kept
+    in fixed width byte string (S) arrays, no python object is created per address.
+    :param input_file: Input file path
+    :param column_separator: Column separator
+    :param headers: Names of the columns from input dataset
+    :param block_size: Number of bytes to parse at once
+    :return: labels (numpy S array, all sources followed by all targets), weights (numpy float64 array or None),
+             timestamps (numpy int64 array)
+    """
+    print('Loading input dataset into fixed width arrays.....', log_type='info')
+    sources, targets, weights, timestamps = [], [], [], []
+    for block in _buffered_io.read_ahead(input_file, block_size):
+        # Same columns and cleanup as the pandas loader, timestamp is always the 4th column
+        try:
+            block_edges = _fixedwidth.parse_edges(block, column_separator, len(headers) == 4)
+        except ValueError as e:
+            print('Can not load input dataset. ERROR: {}'.format(e), color='red', log_type='error')
+            sys.exit(1)
+        for arrays, values in zip((sources, targets, weights, timestamps), block_edges):
+            if values is not None:
+                arrays.append(values)
+    print('Input dataset loading complete!', log_type='info')
+
+    # Return
+    if not timestamps:
+        print('Input dataset is empty!', color='red', log_type='error')
+        sys.exit(1)
+    weights = np.concatenate(weights) if weights else None
+    # Sources and targets are copied once into one array, it is encoded at once
+    return np.concatenate(sources + targets), weights, np.concatenate(timestamps)
+
+
+# Fixed width numeric mapping
+def __fixed_width_mapping(input_file, delimiter, headers, block_size, output_file_name, mapping_file_name,
+                          info_file_name, id_order='appearance', export=None, symmetric=False):
+    """
+    This function maps the strings to numeric values with fixed width byte string arrays from parsing to encoding.
+    The mapping file is a numpy (.npy) array of the unique labels, the position of a label is its id.
+    :param input_file: Input file path
+    :param delimiter: Column separator
+    :param headers: Names of the columns from input dataset
+    :param block_size: Number of bytes to parse at once
+    :param output_file_name: Numeric output file path
+    :param mapping_file_name: Mapping (.npy) file path
+    :param info_file_name: Mapping information (.json) file path
+    :param id_order: Node id ordering (appearance, degree, timestamp or rcm)
+    :param export: Sparse graph export format (csr, coo, raw) or None
+    :param symmetric: True for undirected sparse graph export
+    :return: NULL
+    """
+    labels, weights, timestamps = __load_fixed_width(input_file, delimiter, headers, block_size)
+    n_edges = len(timestamps)
+    print('Data cleanup complete!', log_type='info')
+
+    # Unique values in order of first appearance, all sources come before the targets
+    start_time = datetime.datetime.now()
+    print('Numeric mapping started at: {}'.format(start_time.strftime("%H:%M:%S")), log_type='info')
+    codes, labels = _fixedwidth.encode_labels(labels)
+    if id_order != 'appearance':
+        print('Ordering node ids by {}.....'.format(id_order), log_type='info')
+        new_ids = _ordering.node_order(codes[:n_edges], codes[n_edges:], len(labels), id_order,
+                                       timestamps=timestamps)
+        codes = new_ids[codes]
+        ordered_labels = np.empty_like(labels)
+        ordered_labels[new_ids] = labels
+        labels = ordered_labels
+    print('Total detected nodes/values: ', log_type='info', end='')
+    print('{}'.format(len(labels)), color='cyan', text_format='bold')
+    mapping_end_time = datetime.datetime.now() - start_time
+    print('Elapsed time for mapping: ', log_type='info', end='')
+    print('{}'.format(mapping_end_time), color='cyan', text_format='bold')
+    print('Numeric mapping complete!', log_type='info')
+
+    print('Storing fixed width labels in a .npy file.....', log_type='info')
+    np.save(mapping_file_name, labels)
+    print('Mapping file creation complete!', log_type='info')
+
+    columns = {'source': codes[:n_edges], 'target': codes[n_edges:], 'timestamp': timestamps}
+    if weights is not None:
+        columns['weight'] = weights
+    _operations.create_output_file(pd.DataFrame(columns, columns=headers), output_file_name)
+
+    __create_info_file(info_file_name, id_order, len(labels), columns['source'], columns['target'])
+    if export:
+        __export_graph(input_file, columns['source'], columns['target'], weights, len(labels), export, symmetric)
+
+
+# Estimate memory used by a mapping table entry
+def __mapping_entry_size(label):
+    """
+    This function estimates the memory used by one entry of the mapping dictionary
+    :param label: Label (string)
+    :return: Number of bytes
+    """
+    return sys.getsizeof(label) + MAPPING_ENTRY_OVERHEAD
+
+
+# Spill unique label runs into a temporary file
+def __spill_label_runs(label_runs, run_file):
+    """
+    This function appends unique label runs (in order) to a temporary file
+    :param label_runs: Python list of numpy arrays with unique labels
+    :param run_file: Temporary file path
+    :return: NULL
+    """
+    with open(run_file, 'ab') as f:
+        for labels in label_runs:
+            pickle.dump(labels, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+# Read unique label runs from a temporary file
+def __read_label_runs(run_file):
+    """
+    This function yields unique label runs from a temporary file in the order they were spilled
+    :param run_file: Temporary file path
+    :return: Generator of numpy arrays with unique labels
+    """
+    if not os.path.exists(run_file):
+        return
+    with open(run_file, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                break
+
+
+# Add new labels into the mapping dictionary
+def __add_labels(mapping_dict, labels):
+    """
+    This function gives the next ids to the labels that are not in the mapping dictionary yet
+    :param mapping_dict: Python dictionary with str -> number(int/long) mapping
+    :param labels: numpy array with unique labels in order of first appearance
+    :return: Memory (bytes) added to the mapping dictionary
+    """
+    added_memory = 0
+    for label in labels:
+        if label not in mapping_dict:
+            mapping_dict[label] = len(mapping_dict)
+            added_memory += __mapping_entry_size(label)
+
+    # Return
+    return added_memory
+
+
+# Numeric mapping chunk by chunk within a memory budget
+def __chunked_mapping(input_file, delimiter, headers, max_memory, output_file_name, mapping_file_name, info_file_name,
+                      export=None, symmetric=False):
+    """
+    This function maps the strings to numeric values reading the input file chunk by chunk. Cleaned chunks are
+    spilled to temporary files and sources get their ids while reading. Unique targets of every chunk (unique label
+    runs) are kept until all sources are known and spilled to a temporary file when the memory budget is near.
+    Ids are the same as in-memory mapping (sources before targets, in order of first appearance).
+    :param input_file: Input file path
+    :param delimiter: Column separator
+    :param headers: Names of the columns from input dataset
+    :param max_memory: Memory budget (e.g. 8G)
+    :param output_file_name: Numeric output file path
+    :param mapping_file_name: Mapping (.pkl) file path
+    :param info_file_name: Mapping information (.json) file path
+    :param export: Sparse graph export format (csr, coo, raw) or None
+    :param symmetric: True for undirected sparse graph export
+    :return: NULL
+    """
+    budget = _operations.parse_memory_size(max_memory)
+    chunk_rows = _operations.get_chunk_rows(input_file, max_memory, expansion=DATA_FRAME_EXPANSION)
+    work_dir = tempfile.mkdtemp(prefix='ncprep_map_')
+    run_file = os.path.join(work_dir, 'target_runs.pkl')
+    try:
+        # Clean chunks, give ids to sources and collect unique target runs
+        print('Loading and cleaning input dataset chunk by chunk.....', log_type='info')
+        mapping_dict, mapping_memory = {}, 0
+        target_runs, target_runs_memory, n_spills = [], 0, 0
+        chunk_files = []
+        try:
+            # The next blocks are read in the background while pandas parses a chunk
+            with _buffered_io.open_read_ahead(input_file) as f:
+                for index, chunk in enumerate(__read_file(f, delimiter, headers, chunk_rows=chunk_rows)):
+                    chunk = __clean_data_frame(chunk)
+                    chunk_file = os.path.join(work_dir, 'chunk_{:05d}.pkl'.format(index))
+                    chunk.to_pickle(chunk_file)
+                    chunk_files.append(chunk_file)
+                    mapping_memory += __add_labels(mapping_dict, pd.unique(chunk['source'].values))
+                    targets = pd.unique(chunk['target'].values)
+                    target_runs.append(targets)
+                    target_runs_memory += sum(sys.getsizeof(label) for label in targets)
+                    if mapping_memory + target_runs_memory > budget * (1 - _operations.CHUNK_MEMORY_FRACTION):
+                        __spill_label_runs(target_runs, run_file)
+                        target_runs, target_runs_memory = [], 0
+                        n_spills += 1
+        except Exception as e:
+            print('Can not load input dataset. ERROR: {}'.format(e), color='red', log_type='error')
+            sys.exit(1)
+        if n_spills:
+            print('Unique target runs spilled to disk {} time(s)!'.format(n_spills), log_type='info')
+        print('Data cleanup complete!', log_type='info')
+
+        # Give ids to targets, spilled runs come before the runs still in memory
+        print('Merging unique values/nodes of all chunks.....', log_type='info')
+        for targets in __read_label_runs(run_file):
+            mapping_memory += __add_labels(mapping_dict, targets)
+        for targets in target_runs:
+            mapping_memory += __add_labels(mapping_dict, targets)
+        target_runs = None
+        print('Total detected nodes/values: ', log_type='info', end='')
+        print('{}'.format(len(mapping_dict)), color='cyan', text_format='bold')
+        if mapping_memory > budget:
+            print('Mapping table (~{} bytes) is larger than memory budget!'.format(mapping_memory), log_type='warn',
+                  color='orange')
+        print('Numeric mapping reference creation complete!', log_type='info')
+        _operations.create_mapping_file(output_file_name=mapping_file_name, data=mapping_dict)
+
+        # Map spilled chunks and append them to the output file
+        start_time = datetime.datetime.now()
+        print('Numeric mapping started at: {}'.format(start_time.strftime("%H:%M:%S")), log_type='info')
+        print('Creating output file.....', log_type='info')
+        edges = []
+        try:
+            with _buffered_io.WriteBehind(output_file_name) as f:
+                for chunk_file in chunk_files:
+                    chunk = pd.read_pickle(chunk_file)
+                    chunk['source'] = chunk['source'].map(mapping_dict)
+                    chunk['target'] = chunk['target'].map(mapping_dict)
+                    _buffered_io.write_data_frame(f, chunk)
+                    os.remove(chunk_file)
+                    if export:
+                        edges.append(__edge_arrays(chunk))
+        except Exception as e:
+            print('Can not write output file. ERROR: {}'.format(e), log_type='error')
+            sys.exit(1)
+        mapping_end_time = datetime.datetime.now() - start_time
+        print('Elapsed time for mapping: ', log_type='info', end='')
+        print('{}'.format(mapping_end_time), color='cyan', text_format='bold')
+        print('Numeric mapping complete!', log_type='info')
+        print('Output file creation complete!', log_type='info')
+
+        __create_info_file(info_file_name, 'appearance', len(mapping_dict))
+        if export:
+            weights = np.concatenate([w for _, _, w in edges]) if edges and edges[0][2] is not None else None
+            __export_graph(input_file, np.concatenate([s for s, _, _ in edges]),
+                           np.concatenate([t for _, t, _ in edges]), weights, len(mapping_dict), export, symmetric,
+                           max_memory=max_memory)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# Edge arrays of a mapped data frame
+def __edge_arrays(data_frame):
+    """
+    This function returns numeric source, target and weight columns of a mapped data frame as numpy arrays
+    :param data_frame: Python pandas data frame with mapped source and target columns
+    :return: sources, targets, weights (numpy arrays, weights is None for unweighted data)
+    """
+    weights = data_frame['weight'].values if 'weight' in data_frame.columns else None
+
+    # Return
+    return data_frame['source'].values.astype(np.int64), data_frame['target'].values.astype(np.int64), weights
+
+
+# Export mapped edges as sparse matrix
+def __export_graph(input_file, sources, targets, weights, n_nodes, export, symmetric, max_memory=None):
+    """
+    This function writes the mapped edges as scipy compatible sparse matrix (.npz) or raw numpy arrays (.npy)
+    :param input_file: Input file path (output files are created next to it)
+    :param sources: numpy integer array with source ids
+    :param targets: numpy integer array with target ids
+    :param weights: numpy float array with edge weights or None
+    :param n_nodes: Number of nodes
+    :param export: csr, coo or raw
+    :param symmetric: True for undirected graph (every edge in both directions)
+    :param max_memory: Memory budget (e.g. 8G), a warning is shown if the edge arrays are larger
+    :return: NULL
+    """
+    print('Creating {} sparse graph export.....'.format(export), log_type='info')
+    file_prefix = _operations.get_output_file(input_file=input_file, suffix='_graph', ext='')
+    rows, columns, data = _sparse.edge_arrays(sources, targets, weights, symmetric=symmetric)
+    edge_memory = sum(array.nbytes for array in (rows, columns, data) if array is not None)
+    if max_memory and edge_memory > _operations.parse_memory_size(max_memory):
+        print('Sparse graph export keeps all edges in memory (~{} bytes), larger than memory budget!'.format(
+            edge_memory), log_type='warn', color='orange')
+    try:
+        output_files = _sparse.save_graph(file_prefix, rows, columns, data, n_nodes, export)
+    except Exception as e:
+        print('Can not write sparse graph file. ERROR: {}'.format(e), log_type='error')
+        sys.exit(1)
+    print('Sparse graph export complete! [{}]'.format(', '.join(output_files)), log_type='info')
+
+
+# Renumber nodes of a mapped data frame
+def __reorder_nodes(data_frame, mapping_dict, id_order):
+    """
+    This function gives new ids to the nodes of a mapped data frame and its mapping dictionary
+    :param data_frame: Python pandas data frame with mapped source and target columns
+    :param mapping_dict: Python dictionary with str -> number(int/long) mapping (ids in order of first appearance)
+    :param id_order: degree, timestamp or rcm
+    :return: Python pandas data frame, Python dictionary with str -> number(int/long) mapping
+    """
+    print('Ordering node ids by {}.....'.format(id_order), log_type='info')
+    sources, targets, _ = __edge_arrays(data_frame)
+    new_ids = _ordering.node_order(sources, targets, len(mapping_dict), id_order,
+                                   timestamps=data_frame['timestamp'].values)
+    data_frame['source'] = new_ids[sources]
+    data_frame['target'] = new_ids[targets]
+    old_ids = np.fromiter(mapping_dict.values(), dtype=np.int64, count=len(mapping_dict))
+    mapping_dict = dict(zip(mapping_dict.keys(), new_ids[old_ids].tolist()))
+
+    # Return
+    return data_frame, mapping_dict
+
+
+# Create mapping information file
+def __create_info_file(info_file_name, id_order, n_nodes, sources=None, targets=None):
+    """
+    This function stores how the node ids were assigned in a .json file next to the mapping file
+    :param info_file_name: Information (.json) file path
+    :param id_order: Node id ordering that was used
+    :param n_nodes: Number of nodes
+    :param sources: numpy integer array with source ids (optional, to record the id span of the edges)
+    :param targets: numpy integer array with target ids
+    :return: NULL
+    """
+    info = {'id_order': id_order, 'nodes': int(n_nodes), 'mean_edge_span': None, 'bandwidth': None}
+    if sources is not None:
+        info['mean_edge_span'], info['bandwidth'] = _ordering.edge_span(sources, targets)
+        print('Mean edge span (|source - target|): ', log_type='info', end='')
+        print('{:.1f}'.format(info['mean_edge_span']), color='cyan', text_format='bold')
+    try:
+        with open(info_file_name, 'w') as f:
+            json.dump(info, f, indent=2, sort_keys=True)
+    except Exception as e:
+        print('Can not write mapping information file. ERROR: {}'.format(e), log_type='error')
+        sys.exit(1)
+
+
+# Numeric mapping of the entire data in memory
+def __in_memory_mapping(input_file, delimiter, headers, output_file_name, mapping_file_name, info_file_name,
+                        id_order='appearance', export=None, symmetric=False):
+    """
+    This function loads the entire input file into a pandas data frame and maps the strings to numeric values
+    :param input_file: Input file path
+    :param delimiter: Column separator
+    :param headers: Names of the columns from input dataset
+    :param output_file_name: Numeric output file path
+    :param mapping_file_name: Mapping (.pkl) file path
+    :param info_file_name: Mapping information (.json) file path
+    :param id_order: Node id ordering (appearance, degree, timestamp or rcm)
+    :param export: Sparse graph export format (csr, coo, raw) or None
+    :param symmetric: True for undirected sparse graph export
+    :return: NULL
+    """
+    data_frame = __load_file(input_file, delimiter, headers)
+    print('Data cleanup complete!', log_type='info')
+    mapping_dict = __extract_nodes(data_frame)
+    print('Numeric mapping reference creation complete!', log_type='info')
+
+    start_time = datetime.datetime.now()
+    print('Numeric mapping started at: {}'.format(start_time.strftime("%H:%M:%S")), log_type='info')
+    numeric_data_frame = __numeric_mapping(data_frame, mapping_dict)
+    if id_order != 'appearance':
+        numeric_data_frame, mapping_dict = __reorder_nodes(numeric_data_frame, mapping_dict, id_order)
+    mapping_end_time = datetime.datetime.now() - start_time
+    print('Elapsed time for mapping: ', log_type='info', end='')
+    print('{}'.format(mapping_end_time), color='cyan', text_format='bold')
+    print('Numeric mapping complete!', log_type='info')
+
+    _operations.create_mapping_file(output_file_name=mapping_file_name, data=mapping_dict)
+    _operations.create_output_file(numeric_data_frame, output_file_name)
+
+    sources, targets, weights = __edge_arrays(numeric_data_frame)
+    __create_info_file(info_file_name, id_order, len(mapping_dict), sources, targets)
+    if export:
+        __export_graph(input_file, sources, targets, weights, len(mapping_dict), export, symmetric)
+
+
 # Create numeric mapping
-def numeric_mapper(input_file=None, delimiter=None, weighted=None):
+@_streams.pipe_friendly
+def numeric_mapper(input_file=None, delimiter=None, weighted=None, n_jobs=1, fixed_width=False, block_size='8M',
+                   max_memory=None, export=None, symmetric=False, cache=False, id_order='appearance',
+                   output_file=None):
     """
     This function maps the strings to numeric values
-    :param input_file: Input file path
+    :param input_file: Input file path, '-' (standard input) or a file object
     :param delimiter: Column separator
     :param weighted: yes/no if the file contains weights of the edges or not
+    :param n_jobs: Number of worker processes (1: single process, None or < 1: number of CPUs)
+    :param fixed_width: Keep addresses in fixed width byte string arrays instead of python objects (True/False)
+    :param block_size: Number of bytes to parse at once in fixed width mode (e.g. 8M)
+    :param max_memory: Memory budget (e.g. 8G), chunk/block/shard sizes are chosen from it
+    :param export: Also export the mapped graph as sparse matrix: csr/coo (scipy .npz) or raw (indptr/indices/data .npy)
+    :param symmetric: Export an undirected graph, every edge is added in both directions (True/False)
+    :param cache: Reuse results of previous runs with the same input file and parameters (True: identify the input
+                  file by path, size and modification time, 'content': by content hash)
+    :param id_order: Node id ordering: appearance (order of first appearance), degree (highest degree first),
+                     timestamp (earliest edge first) or rcm (reverse Cuthill-McKee, neighbors get close ids)
+    :param output_file: Numeric output file path or '-' (standard output, default for streams), mapping files are
+                        created next to the input file (streams: stdin_map.pkl etc. in the current directory)
     :return: file object
     """
     # Check the weighted arguments are provided
-    if input_file and weighted:
+    if input_file and weighted and (export is None or export in _sparse.EXPORT_FORMATS) and \
+            id_order in _ordering.ID_ORDERS:
+        # Streams are sniffed on a peeked head and written to standard output
+        input_file = _streams.open_input(input_file)
+        if output_file is None and _streams.is_stream(input_file):
+            output_file = _streams.STREAM_NAME
         sanity_status = _operations.sanity_check(input_file=input_file)
     else:
         print('Invalid parameters! Check input!!', log_type='error', color='red')
@@ -146,24 +772,60 @@ def numeric_mapper(input_file=None, delimiter=None, weighted=None):
     # If sanity check passed start string to numeric mapping
     if sanity_status == 1:
         headers = _operations.generate_headers(weighted)
-        output_file_name = _operations.get_output_file(input_file=input_file, suffix='_numeric', ext='.txt')
-        data_frame = __load_file(input_file, delimiter, headers)
-        print('Data cleanup complete!', log_type='info')
-        mapping_dict = __extract_nodes(data_frame)
-        print('Numeric mapping reference creation complete!', log_type='info')
-
+        output_file_name = output_file
+        if output_file_name is None:
+            output_file_name = _operations.get_output_file(input_file=input_file, suffix='_numeric', ext='.txt')
         mapping_file_name = _operations.get_output_file(input_file=input_file, suffix='_map', ext='.pkl')
-        _operations.create_mapping_file(output_file_name=mapping_file_name, data=mapping_dict)
+        if fixed_width:
+            mapping_file_name = _operations.get_output_file(input_file=input_file, suffix='_map', ext='.npy')
+        info_file_name = _operations.get_output_file(input_file=input_file, suffix='_map_info', ext='.json')
+        output_files = [output_file_name, mapping_file_name, info_file_name]
+        if export:
+            graph_prefix = _operations.get_output_file(input_file=input_file, suffix='_graph', ext='')
+            output_files += _sparse.graph_files(graph_prefix, export)
 
-        start_time = datetime.datetime.now()
-        print('Numeric mapping started at: {}'.format(start_time.strftime("%H:%M:%S")), log_type='info')
-        numeric_data_frame = __numeric_mapping(data_frame, mapping_dict)
-        mapping_end_time = datetime.datetime.now() - start_time
-        print('Elapsed time for mapping: ', log_type='info', end='')
-        print('{}'.format(mapping_end_time), color='cyan', text_format='bold')
-        print('Numeric mapping complete!', log_type='info')
+        # Node ids are ordered with all edges in memory
+        n_jobs = _operations.get_n_jobs(n_jobs)
+        if n_jobs > 1 and _streams.is_stream(input_file):
+            print('Input stream is mapped in a single process!', log_type='warn', color='orange')
+            n_jobs = 1
+        if id_order != 'appearance' and not fixed_width and (n_jobs > 1 or max_memory):
+            print('Node id ordering [{}] needs in-memory or fixed width mapping! Using order of first '
+                  'appearance.....'.format(id_order), log_type='warn', color='orange')
+            id_order = 'appearance'
+
+        # Reuse cached result
+        if cache and _cache.is_cacheable(input_file, output_files):
+            parameters = {'delimiter': delimiter, 'headers': headers, 'fixed_width': bool(fixed_width),
+                          'export': export, 'symmetric': bool(symmetric) if export else None, 'id_order': id_order}
+            key = _cache.cache_key(input_file, 'numeric_mapper', parameters, content_hash=cache == 'content')
+            if _cache.lookup(key, output_files):
+                return
+        _operations.remove_output_files(output_files)
+
+        if fixed_width:
+            if n_jobs > 1:
+                print('Fixed width mapping runs in a single process!', log_type='warn', color='orange')
+            if max_memory:
+                print('Fixed width mapping keeps all edges in memory, max_memory only sets the block size!',
+                      log_type='warn', color='orange')
+                block_size = _operations.get_block_size(max_memory, expansion=FIXED_WIDTH_EXPANSION)
+            __fixed_width_mapping(input_file, delimiter, headers, _operations.parse_memory_size(block_size),
+                                  output_file_name, mapping_file_name, info_file_name, id_order=id_order,
+                                  export=export, symmetric=symmetric)
+        elif n_jobs > 1:
+            __sharded_mapping(input_file, delimiter, headers, n_jobs, output_file_name, mapping_file_name,
+                              info_file_name, max_memory=max_memory, export=export, symmetric=symmetric)
+        elif max_memory:
+            __chunked_mapping(input_file, delimiter, headers, max_memory, output_file_name, mapping_file_name,
+                              info_file_name, export=export, symmetric=symmetric)
+        else:
+            __in_memory_mapping(input_file, delimiter, headers, output_file_name, mapping_file_name, info_file_name,
+                                id_order=id_order, export=export, symmetric=symmetric)
 
-        _operations.create_output_file(numeric_data_frame, output_file_name)
+        # Store result in cache
+        if cache and _cache.is_cacheable(input_file, output_files, warn=False):
+            _cache.store(key, input_file, output_files)
     else:
         print('Sanity check failed!', log_type='error', color='red')
         sys.exit(1)
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import sys
+import datetime
+import re
+import multiprocessing
+import numpy as np
+from collections import OrderedDict
+from pyrainbowterm import *
+
+# Import file_operations
+import _operations
+import _sketches
+import _fixedwidth
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Quantiles reported for the weight column
+WEIGHT_QUANTILES = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+# Number of bytes profiled at once
+PROFILE_BLOCK_SIZE = 16 * 1024 ** 2
+
+# Lines that are not counted as skipped rows: blank lines and commented (#) lines
+# [matched after the new line before them, a literal first character is much faster to search than ^]
+BLANK_LINE = re.compile(br'\n[ \t\r]*(?=\n)')
+COMMENT_LINE = re.compile(br'\n[ \t]*#')
+
+
+# Count edges per day
+def __count_days(days):
+    """
+    This function counts the edges of every day
+    :param days: numpy int64 array (days since epoch)
+    :return: Python list of (day, count)
+    """
+    first_day = int(days.min())
+    if int(days.max()) - first_day > len(days):
+        # Sparse days (e.g. broken timestamps), avoid a histogram over the whole range
+        unique_days, counts = np.unique(days, return_counts=True)
+        return list(zip(unique_days.tolist(), counts.tolist()))
+    counts = np.bincount(days - first_day)
+    present = np.flatnonzero(counts)
+
+    # Return
+    return list(zip((present + first_day).tolist(), counts[present].tolist()))
+
+
+# Profile a byte range of the input file
+def __profile_range(task):
+    """
+    This function streams a byte range of the input file once in blocks and fills the sketches, blocks are parsed
+    and hashed with numpy (no python object per line)
+    :param task: (input_file, start, end, delimiter, n_cols, precision, relative accuracy)
+    :return: Python dictionary with partial profile of the byte range
+    """
+    input_file, start, end, delimiter, n_cols, precision, relative_accuracy = task
+    sources = _sketches.hll_create(precision)
+    targets = _sketches.hll_create(precision)
+    weights = _sketches.quantile_create(relative_accuracy)
+    edges_per_day = {}
+    n_rows, skipped = 0, 0
+    for block in _operations.iter_blocks_in_range(input_file, start, end, PROFILE_BLOCK_SIZE):
+        if not block.endswith(b'\n'):
+            block += b'\n'
+
+        # Timestamp is always the 4th column, the weight column is only read for weighted files
+        buffer, starts, ends, _, _ = _fixedwidth.parse_block(block, delimiter, 4)
+        timestamps, valid = _fixedwidth.parse_numbers(buffer, starts[:, 3], ends[:, 3])
+        valid &= (ends[:, 0] > starts[:, 0]) & (ends[:, 1] > starts[:, 1])
+        if n_cols == 4:
+            block_weights, valid_weights = _fixedwidth.parse_numbers(buffer, starts[:, 2], ends[:, 2])
+            valid &= valid_weights
+
+        # Lines with content that are not comments and can not be parsed are skipped
+        n_valid = int(valid.sum())
+        n_rows += n_valid
+        lines = b'\n' + block
+        skipped += block.count(b'\n') - len(BLANK_LINE.findall(lines)) - len(COMMENT_LINE.findall(lines)) - n_valid
+        if not n_valid:
+            continue
+
+        _sketches.hll_add_hashes(sources, _fixedwidth.hash_fields(buffer, starts[valid, 0], ends[valid, 0]))
+        _sketches.hll_add_hashes(targets, _fixedwidth.hash_fields(buffer, starts[valid, 1], ends[valid, 1]))
+        if n_cols == 4:
+            block_weights = block_weights[valid]
+            _sketches.quantile_add_values(weights, block_weights[block_weights >= 0])
+        for day, count in __count_days(timestamps[valid].astype(np.int64) // 86400):
+            edges_per_day[day] = edges_per_day.get(day, 0) + count
+
+    # Return
+    return {'rows': n_rows, 'skipped': skipped, 'sources': sources, 'targets': targets, 'weights': weights,
+            'edges_per_day': edges_per_day}
+
+
+# Merge partial profiles
+def __merge_profiles(profiles):
+    """
+    This function merges the partial profiles of all byte ranges
+    :param profiles: Python list of partial profiles
+    :return: Python dictionary with merged partial profile
+    """
+    merged = profiles[0]
+    for profile in profiles[1:]:
+        merged['rows'] += profile['rows']
+        merged['skipped'] += profile['skipped']
+        _sketches.hll_merge(merged['sources'], profile['sources'])
+        _sketches.hll_merge(merged['targets'], profile['targets'])
+        _sketches.quantile_merge(merged['weights'], profile['weights'])
+        for day, count in profile['edges_per_day'].items():
+            merged['edges_per_day'][day] = merged['edges_per_day'].get(day, 0) + count
+
+    # Return
+    return merged
+
+
+# Print profile summary
+def __print_profile(profile):
+    """
+    This function prints the profile summary
+    :param profile: Python dictionary with the profile
+    :return: NULL
+    """
+    print('--------------- Profile -------------------')
+    for label, key in (('Rows', 'rows'), ('Skipped rows', 'skipped'), ('Unique sources [~]', 'unique_sources'),
+                       ('Unique targets [~]', 'unique_targets'), ('Unique nodes [~]', 'unique_nodes')):
+        print('{}: '.format(label), log_type='info', end='')
+        print('{}'.format(profile[key]), color='cyan', text_format='bold')
+    if profile['edges_per_day']:
+        days = list(profile['edges_per_day'])
+        print('Date range: {} - {} ({} days with edges)'.format(days[0], days[-1], len(days)), log_type='info')
+        print('Edges per day (min/max): {}/{}'.format(min(profile['edges_per_day'].values()),
+                                                      max(profile['edges_per_day'].values())), log_type='info')
+    if profile['weight_quantiles']:
+        for quantile, value in sorted(profile['weight_quantiles'].items()):
+            print('Weight quantile {:.2f} [~]: {}'.format(quantile, value), log_type='info')
+    print('-------------------------------------------')
+
+
+# Create profiler function
+def profile(input_file=None, delimiter=None, weighted='yes', n_jobs=None, precision=14, relative_accuracy=0.01):
+    """
+    This function creates an approximate profile of a (source target weight timestamp) file in one streaming pass
+    :param input_file: Input file path
+    :param delimiter: Column separator
+    :param weighted: yes/no if the file contains weights of the edges or not
+    :param n_jobs: Number of worker processes (default: number of CPUs)
+    :param precision: HyperLogLog precision for distinct counts (memory: 2 ^ precision bytes per counter)
+    :param relative_accuracy: Relative accuracy of the weight quantiles
+    :return: Python dictionary with the profile
+    """
+    # Check inputs to avoid exceptions
+    if input_file and weighted:
+        sanity_status = _operations.sanity_check(input_file=input_file, delimiter=delimiter)
+    else:
+        print('Invalid parameters! Check input!!', log_type='error', color='red')
+        sys.exit(1)
+
+    # If sanity check is passed, profile the text
+    if sanity_status == 1:
+        n_cols = len(_operations.generate_headers(weighted))
+        n_jobs = _operations.get_n_jobs(n_jobs)
+        tasks = [(input_file, start, end, delimiter, n_cols, precision, relative_accuracy)
+                 for start, end in _operations.get_byte_ranges(input_file, n_jobs)]
+        if not tasks:
+            print('Input file is empty!', log_type='error', color='red')
+            sys.exit(1)
+
+        start_time = datetime.datetime.now()
+        print('Profiling input dataset with {} worker(s).....'.format(n_jobs), log_type='info')
+        if n_jobs > 1 and len(tasks) > 1:
+            pool = multiprocessing.Pool(processes=min(n_jobs, len(tasks)))
+            try:
+                partial_profiles = pool.map(__profile_range, tasks)
+            finally:
+                pool.close()
+                pool.join()
+        else:
+            partial_profiles = [__profile_range(task) for task in tasks]
+        merged = __merge_profiles(partial_profiles)
+
+        # Create the profile out of merged sketches
+        nodes = _sketches.hll_merge(bytearray(merged['sources']), merged['targets'])
+        edges_per_day = [(datetime.datetime.utcfromtimestamp(day * 86400).strftime('%Y-%m-%d'), count)
+                         for day, count in sorted(merged['edges_per_day'].items())]
+        weight_quantiles = {}
+        if n_cols == 4:
+            weight_quantiles = dict((quantile, _sketches.quantile_value(merged['weights'], quantile))
+                                    for quantile in WEIGHT_QUANTILES)
+        result = {'rows': merged['rows'], 'skipped': merged['skipped'],
+                  'unique_sources': _sketches.hll_count(merged['sources']),
+                  'unique_targets': _sketches.hll_count(merged['targets']),
+                  'unique_nodes': _sketches.hll_count(nodes),
+                  'edges_per_day': OrderedDict(edges_per_day),
+                  'weight_quantiles': weight_quantiles}
+        print('Profiling complete!', log_type='info')
+        print('Elapsed time for profiling: ', log_type='info', end='')
+        print('{}'.format(datetime.datetime.now() - start_time), color='cyan', text_format='bold')
+        __print_profile(result)
+    else:
+        print('Sanity check failed!', log_type='error', color='red')
+        sys.exit(1)
+
+    # Return
+    return result
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import os
+import sys
+import heapq
+import shutil
+import tempfile
+import multiprocessing
+from pyrainbowterm import *
+
+# Import file_operations
+import _operations
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Approximate python memory overhead of one buffered line (bytes object, key, tuple and list slot)
+LINE_OVERHEAD = 128
+
+# Maximum number of run files merged at once (every run is an open file, the limit of open files is often 1024)
+MERGE_FAN_IN = 256
+
+
+# Get timestamp of a line
+def __timestamp_key(line, delimiter):
+    """
+    This function extracts the timestamp (last column) of a raw line
+    :param line: Raw line (bytes)
+    :param delimiter: Column separator (bytes) or None for whitespace
+    :return: timestamp (int/float) or None if the line has no valid timestamp
+    """
+    fields = line.split(delimiter)
+    if not fields:
+        return None
+    value = fields[-1].strip()
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+
+# Write a sorted run into a temporary file
+def __spill_run(run, temp_dir, range_index, run_index):
+    """
+    This function sorts the buffered lines by timestamp and writes them into a run file
+    :param run: Python list of (timestamp, line) tuples
+    :param temp_dir: Directory for run files
+    :param range_index: Index of the byte range
+    :param run_index: Index of the run inside the byte range
+    :return: Run file path
+    """
+    # list.sort is stable, lines with equal timestamps keep their order in the input file
+    run.sort(key=lambda item: item[0])
+    run_file = os.path.join(temp_dir, 'run_{:05d}_{:05d}.txt'.format(range_index, run_index))
+    with open(run_file, 'wb') as f:
+        f.writelines(item[1] for item in run)
+
+    # Return
+    return run_file
+
+
+# Create sorted runs from a byte range of the input file
+def __sort_range(task):
+    """
+    This function reads a byte range of the input file and spills sorted runs within the memory budget
+    :param task: (input_file, start, end, delimiter, memory budget in bytes, temp dir, range index)
+    :return: Python list of run files, number of skipped lines
+    """
+    input_file, start, end, delimiter, budget, temp_dir, range_index = task
+    run_files = []
+    run, run_size, skipped = [], 0, 0
+    for line in _operations.iter_lines_in_range(input_file, start, end):
+        if line.startswith(b'#') or not line.strip():
+            continue
+        timestamp = __timestamp_key(line, delimiter)
+        if timestamp is None:
+            skipped += 1
+            continue
+        if not line.endswith(b'\n'):
+            line += b'\n'
+        run.append((timestamp, line))
+        run_size += len(line) + LINE_OVERHEAD
+        if run_size >= budget:
+            run_files.append(__spill_run(run, temp_dir, range_index, len(run_files)))
+            run, run_size = [], 0
+    if run:
+        run_files.append(__spill_run(run, temp_dir, range_index, len(run_files)))
+
+    # Return
+    return run_files, skipped
+
+
+# Read a run file with merge keys
+def __iter_run(run_file, run_index, delimiter):
+    """
+    This function yields decorated lines of a sorted run for the k-way merge
+    :param run_file: Run file path
+    :param run_index: Position of the run, keeps the merge stable
+    :param delimiter: Column separator (bytes) or None for whitespace
+    :return: Generator of (timestamp, run index, line)
+    """
+    with open(run_file, 'rb') as f:
+        for line in f:
+            yield __timestamp_key(line, delimiter), run_index, line
+
+
+# Merge sorted runs into one file
+def __merge_files(run_files, output_file, delimiter, header=None):
+    """
+    This function does a k-way merge of the sorted runs into one sorted file, every run is an open file
+    :param run_files: Python list of run files (in input file order)
+    :param output_file: Output file path
+    :param delimiter: Column separator (bytes) or None for whitespace
+    :param header: First line of the output file (bytes) or None
+    :return: Number of lines written
+    """
+    n_lines = 0
+    runs = [__iter_run(run_file, run_index, delimiter) for run_index, run_file in enumerate(run_files)]
+    try:
+        with open(output_file, 'wb') as f:
+            if header is not None:
+                f.write(header)
+            for _, _, line in heapq.merge(*runs):
+                f.write(line)
+                n_lines += 1
+    except Exception as e:
+        print('Can not write output file. ERROR: {}'.format(e), log_type='error')
+        sys.exit(1)
+
+    # Return
+    return n_lines
+
+
+# Merge sorted runs into the output file
+def __merge_runs(run_files, output_file, delimiter, temp_dir):
+    """
+    This function merges the sorted runs and writes the sorted output file. At most MERGE_FAN_IN runs are open at
+    once, more runs are merged in passes through intermediate run files (neighbouring runs are merged together, so
+    lines with equal timestamps keep their input order).
+    :param run_files: Python list of run files (in input file order)
+    :param output_file: Output file path
+    :param delimiter: Column separator (bytes) or None for whitespace
+    :param temp_dir: Directory for intermediate run files
+    :return: Number of lines written
+    """
+    print('Merging {} sorted runs.....'.format(len(run_files)), log_type='info')
+    n_passes = 0
+    while len(run_files) > MERGE_FAN_IN:
+        n_passes += 1
+        merged_files = []
+        for first in range(0, len(run_files), MERGE_FAN_IN):
+            group = run_files[first:first + MERGE_FAN_IN]
+            if len(group) == 1:
+                merged_files.append(group[0])
+                continue
+            merged_file = os.path.join(temp_dir, 'merge_{:03d}_{:05d}.txt'.format(n_passes, len(merged_files)))
+            __merge_files(group, merged_file, delimiter)
+            for run_file in group:
+                os.remove(run_file)
+            merged_files.append(merged_file)
+        print('Merge pass {}: {} runs merged into {}'.format(n_passes, len(run_files), len(merged_files)),
+              log_type='info')
+        run_files = merged_files
+    n_lines = __merge_files(run_files, output_file, delimiter,
+                            header=(_operations.SORTED_MARKER + '\n').encode('ascii'))
+    print('Merging complete!', log_type='info')
+
+    # Return
+    return n_lines
+
+
+# Create time sorter function
+def sort_by_time(input_file=None, delimiter=None, max_memory='512M', n_jobs=None, output_file=None, temp_dir=None):
+    """
+    This function sorts a (source target weight timestamp) file by timestamp with an external merge sort
+    :param input_file: Input file to sort
+    :param delimiter: Column separator for input file
+    :param max_memory: Memory budget for all workers together (e.g. 512M, 8G or bytes)
+    :param n_jobs: Number of worker processes (default: number of CPUs)
+    :param output_file: A file path where the output will be stored
+    :param temp_dir: Directory for temporary sorted runs (default: system temp directory)
+    :return: Output file path
+    """
+    # Check inputs to avoid exceptions
+    if input_file:
+        # Check delimiter
+        if delimiter is None:
+            print('No delimiter provided! Using default [whitespace].....', log_type='info')
+            delimiter = None  # No delimiter provided
+        else:
+            delimiter = delimiter
+
+        # Check the output file parameter
+        if output_file is None:
+            output_file = _operations.get_output_file(input_file=input_file, suffix='_sorted', ext='.txt')
+        else:
+            output_file = output_file
+
+        # Check sanity of the input file
+        sanity_status = _operations.sanity_check(input_file=input_file, delimiter=delimiter, output_file=output_file)
+    else:
+        print('Invalid parameters! Check input!!', log_type='error', color='red')
+        sys.exit(1)
+
+    # If sanity check is passed, sort the text
+    if sanity_status == 1:
+        n_jobs = _operations.get_n_jobs(n_jobs)
+        budget = max(1, _operations.parse_memory_size(max_memory) // n_jobs)
+        byte_delimiter = None if delimiter is None else delimiter.encode('ascii')
+        byte_ranges = _operations.get_byte_ranges(input_file, n_jobs)
+        work_dir = tempfile.mkdtemp(prefix='ncprep_sort_', dir=temp_dir)
+        tasks = [(input_file, start, end, byte_delimiter, budget, work_dir, index)
+                 for index, (start, end) in enumerate(byte_ranges)]
+        try:
+            # Create sorted runs in parallel
+            print('Creating sorted runs with {} worker(s).....'.format(n_jobs), log_type='info')
+            if n_jobs > 1 and len(tasks) > 1:
+                pool = multiprocessing.Pool(processes=min(n_jobs, len(tasks)))
+                try:
+                    results = pool.map(__sort_range, tasks)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                results = [__sort_range(task) for task in tasks]
+            run_files = [run_file for files, _ in results for run_file in files]
+            skipped = sum(n_skipped for _, n_skipped in results)
+            if skipped:
+                print('Skipped {} line(s) without valid timestamp!'.format(skipped), log_type='warn', color='orange')
+
+            # Merge sorted runs
+            n_lines = __merge_runs(run_files, output_file, byte_delimiter, work_dir)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        print('Total sorted lines: ', log_type='info', end='')
+        print('{}'.format(n_lines), color='cyan', text_format='bold')
+    else:
+        print('Sanity check failed!', log_type='error', color='red')
+        sys.exit(1)
+
+    # Return
+    return output_file
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function
+
+# Import python libraries
+import sys
+import collections
+import numpy as np
+import pandas as pd
+from pyrainbowterm import *
+
+# Import pickle [Python 2 uses cPickle]
+if sys.version_info[0] == 2:
+    import cPickle as pickle
+else:
+    import pickle
+
+# Import file_operations
+import _operations
+import _fixedwidth
+import _buffered_io
+import _streams
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Edges of a time window
+# start, end: window range [start, end) as pandas Timestamps (UTC)
+# sources, targets: numpy int64 arrays with node ids (mapped=True) or numpy S arrays with node labels
+# weights: numpy float64 array (normalized like numeric_mapper unless raw_weights, None for unweighted files)
+# timestamps: numpy int64 array
+# n_nodes: number of ids assigned so far, new_labels: numpy S array with the labels of ids assigned since the
+# previous window (ids n_nodes - len(new_labels) ... n_nodes - 1)
+Window = collections.namedtuple('Window', ['start', 'end', 'sources', 'targets', 'weights', 'timestamps', 'n_nodes',
+                                           'new_labels'])
+
+
+# Incremental label encoder
+class _LabelEncoder(object):
+    """
+    Gives ids to labels in order of first appearance while the input is streamed, a label keeps its id in all
+    windows. Known labels are kept in a sorted numpy S array (no python object per label).
+    """
+    def __init__(self, labels=None, ids=None):
+        """
+        :param labels: numpy S array with known labels (e.g. from a numeric_mapper mapping file) or None
+        :param ids: numpy int64 array with the ids of the known labels
+        """
+        if labels is None:
+            labels, ids = np.zeros(0, dtype='S1'), np.zeros(0, dtype=np.int64)
+        order = np.argsort(labels, kind='mergesort')
+        self.sorted_labels = labels[order]
+        self.sorted_ids = np.asarray(ids, dtype=np.int64)[order]
+        self.n_labels = int(self.sorted_ids.max()) + 1 if len(self.sorted_ids) else 0
+        self.new_labels = []
+
+    def encode(self, labels):
+        """
+        This function returns the ids of the labels, new labels get the next ids in order of first appearance
+        :param labels: numpy S array
+        :return: numpy int64 array
+        """
+        unique_labels, first_index, inverse = np.unique(labels, return_index=True, return_inverse=True)
+        if unique_labels.dtype.itemsize > self.sorted_labels.dtype.itemsize:
+            self.sorted_labels = self.sorted_labels.astype(unique_labels.dtype)
+        positions = np.searchsorted(self.sorted_labels, unique_labels)
+        found = positions < len(self.sorted_labels)
+        found[found] = self.sorted_labels[positions[found]] == unique_labels[found]
+        unique_ids = np.empty(len(unique_labels), dtype=np.int64)
+        unique_ids[found] = self.sorted_ids[positions[found]]
+
+        # New labels in order of first appearance
+        new = np.flatnonzero(~found)
+        new = new[np.argsort(first_index[new], kind='mergesort')]
+        unique_ids[new] = self.n_labels + np.arange(len(new))
+        self.n_labels += len(new)
+        if len(new):
+            self.new_labels.append(unique_labels[new])
+            inserted = np.sort(new)
+            self.sorted_labels = np.insert(self.sorted_labels, positions[inserted], unique_labels[inserted])
+            self.sorted_ids = np.insert(self.sorted_ids, positions[inserted], unique_ids[inserted])
+
+        # Return
+        return unique_ids[inverse.ravel()]
+
+    def pop_new_labels(self):
+        """
+        This function returns the labels that got an id since the previous call (in id order)
+        :return: numpy S array
+        """
+        new_labels = np.concatenate(self.new_labels) if self.new_labels else np.zeros(0, dtype='S1')
+        self.new_labels = []
+
+        # Return
+        return new_labels
+
+
+# Load a numeric_mapper mapping file
+def __load_mapping(mapping_file):
+    """
+    This function loads the labels and ids of a mapping file created by numeric_mapper
+    :param mapping_file: Mapping file path (.pkl dictionary or fixed width .npy labels)
+    :return: labels (numpy S array), ids (numpy int64 array)
+    """
+    print('Loading mapping file: {}.....'.format(mapping_file), log_type='info')
+    try:
+        if mapping_file.endswith('.npy'):
+            labels = np.load(mapping_file)
+            ids = np.arange(len(labels), dtype=np.int64)
+        else:
+            with open(mapping_file, 'rb') as f:
+                mapping_dict = pickle.load(f)
+            labels = np.array([label if isinstance(label, bytes) else str(label).encode('utf-8')
+                               for label in mapping_dict], dtype=np.bytes_)
+            ids = np.fromiter(mapping_dict.values(), dtype=np.int64, count=len(mapping_dict))
+    except Exception as e:
+        print('Can not load mapping file. ERROR: {}'.format(e), color='red', log_type='error')
+        sys.exit(1)
+
+    # Return
+    return labels, ids
+
+
+# Convert a date or time difference into seconds
+def __to_seconds(value, delta=False):
+    """
+    This function converts a date (e.g. 2017-07-01) or a time difference (e.g. 1D, 6H) into unix seconds
+    :param value: Date or time difference
+    :param delta: True for time difference
+    :return: Number of seconds (int)
+    """
+    if delta:
+        return int(pd.Timedelta(value) // pd.Timedelta(seconds=1))
+
+    # Return
+    return int((pd.Timestamp(value) - pd.Timestamp(0)) // pd.Timedelta(seconds=1))
+
+
+# Create a window from the pending edges
+def __window(pending, window_start, window_length, weighted, encoder):
+    """
+    This function selects the pending edges of a window
+    :param pending: Python list of edge arrays [sources, targets, timestamps, weights]
+    :param window_start: Start of the window (unix seconds)
+    :param window_length: Length of the window (seconds)
+    :param weighted: True if weights are available
+    :param encoder: Label encoder (mapped windows) or None
+    :return: Window
+    """
+    sources, targets, timestamps, weights = pending
+    end = np.searchsorted(timestamps, window_start + window_length, side='left')
+    start_time = pd.Timestamp(window_start, unit='s')
+
+    # Return
+    return Window(start=start_time, end=start_time + pd.Timedelta(seconds=window_length), sources=sources[:end],
+                  targets=targets[:end], weights=weights[:end] if weighted else None, timestamps=timestamps[:end],
+                  n_nodes=encoder.n_labels if encoder else None,
+                  new_labels=encoder.pop_new_labels() if encoder else None)
+
+
+# Drop edges before a window
+def __drop_edges(pending, window_start):
+    """
+    This function removes the pending edges that are older than the start of the next window
+    :param pending: Python list of edge arrays [sources, targets, timestamps, weights]
+    :param window_start: Start of the next window (unix seconds)
+    :return: Python list of edge arrays
+    """
+    keep = pending[2] >= window_start
+
+    # Return
+    return [column[keep] if column is not None else None for column in pending]
+
+
+# Iterate over time windows
+def iter_windows(input_file=None, delimiter=None, weighted='yes', window='1D', stride='1D', start_date=None,
+                 mapped=True, mapping_file=None, block_size='8M', lookahead=2, raw_weights=False):
+    """
+    This function streams a time sorted (source target weight timestamp) file and yields the edges of every time
+    window as numpy arrays. Windows are [start, start + window) in unix seconds (UTC) like clip_text, the first one
+    starts at start_date (default: midnight before the first edge) and every next one stride later. Only the edges of
+    the current window and lookahead blocks are in memory. Rows are cleaned like numeric_mapper does (short
+    addresses and invalid timestamps are dropped, weights are normalized to round(log(1 + weight), 2)).
+    :param input_file: Input file path (sorted by timestamp, e.g. with ncp.sort_by_time), '-' or a file object
+    :param delimiter: Column separator
+    :param weighted: yes/no if the file contains weights of the edges or not
+    :param window: Length of a window (e.g. 1D, 7D, 6H)
+    :param stride: Time between the starts of two windows (e.g. 1D), windows overlap if stride < window
+    :param start_date: Start of the first window (e.g. 2017-07-01), earlier edges are skipped
+    :param mapped: True to map the labels to numeric ids (same id in every window), False for raw labels
+    :param mapping_file: Mapping file of numeric_mapper (.pkl or .npy), its ids are used for known labels
+    :param block_size: Number of bytes to parse at once (e.g. 8M)
+    :param lookahead: Number of blocks read ahead while a window is processed
+    :param raw_weights: True to keep the weights as they are in the file (decimal numbers, no normalization)
+    :return: Generator of Window(start, end, sources, targets, weights, timestamps, n_nodes, new_labels)
+    """
+    # Check inputs to avoid exceptions
+    if input_file and weighted and window and stride:
+        input_file = _streams.open_input(input_file)
+        sanity_status = _operations.sanity_check(input_file=input_file, delimiter=delimiter)
+    else:
+        print('Invalid parameters! Check input!!', log_type='error', color='red')
+        sys.exit(1)
+    if sanity_status != 1:
+        print('Sanity check failed!', log_type='error', color='red')
+        sys.exit(1)
+
+    weighted = len(_operations.generate_headers(weighted)) == 4
+    window_length, stride_length = __to_seconds(window, delta=True), __to_seconds(stride, delta=True)
+    if window_length <= 0 or stride_length <= 0:
+        print('Window and stride must be positive! Try: "1D", "6H"', log_type='error', color='red')
+        sys.exit(1)
+    window_start = None if start_date is None else __to_seconds(start_date)
+    encoder = _LabelEncoder(*__load_mapping(mapping_file)) if mapped and mapping_file else _LabelEncoder()
+
+    # Edges that can still be in a window (timestamp >= start of the current window)
+    pending = None
+    last_timestamp = None
+    blocks = _buffered_io.read_ahead(input_file, _operations.parse_memory_size(block_size), depth=lookahead)
+    try:
+        for block in blocks:
+            try:
+                sources, targets, weights, timestamps = _fixedwidth.parse_edges(block, delimiter, weighted,
+                                                                                raw_weights)
+            except ValueError as e:
+                print('Can not load input dataset. ERROR: {}'.format(e), color='red', log_type='error')
+                sys.exit(1)
+            if not len(timestamps):
+                continue
+            if (last_timestamp is not None and timestamps[0] < last_timestamp) or \
+                    (len(timestamps) > 1 and (np.diff(timestamps) < 0).any()):
+                print('Input file is not sorted by timestamp! Sort it with ncp.sort_by_time', log_type='error',
+                      color='red')
+                sys.exit(1)
+            last_timestamp = timestamps[-1]
+            if window_start is None:
+                window_start = int(timestamps[0]) // 86400 * 86400
+
+            # Skip edges before the first window
+            keep = timestamps >= window_start
+            if mapped:
+                sources = encoder.encode(sources[keep])
+                targets = encoder.encode(targets[keep])
+            else:
+                sources, targets = sources[keep], targets[keep]
+            edges = [sources, targets, timestamps[keep], weights[keep] if weighted else None]
+            if pending is None:
+                pending = edges
+            else:
+                pending = [np.concatenate([old, new]) if old is not None else None
+                           for old, new in zip(pending, edges)]
+
+            # Yield every window that ends before the newest edge
+            while window_start + window_length <= last_timestamp:
+                yield __window(pending, window_start, window_length, weighted, encoder if mapped else None)
+                window_start += stride_length
+                pending = __drop_edges(pending, window_start)
+
+        # Windows until the last edge
+        while pending is not None and window_start <= last_timestamp:
+            yield __window(pending, window_start, window_length, weighted, encoder if mapped else None)
+            window_start += stride_length
+            pending = __drop_edges(pending, window_start)
+    finally:
+        blocks.close()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests of ncprep. The modules of the package use implicit relative imports, so the package directory is added to the
+module search path and the modules are imported by name (e.g. import ncp_txtclipper).
+
+To run: python setup.py test
+"""
+
+# Import python libraries
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Make the package modules importable
+PACKAGE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ncprep')
+if PACKAGE_DIR not in sys.path:
+    sys.path.insert(0, PACKAGE_DIR)
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# First timestamp of the generated edges (2017-07-14 00:00:00 UTC)
+START_TIMESTAMP = 1499990400
+
+
+# Create a node label
+def node_label(node=None):
+    """
+    This function creates an address like label (34 characters, numeric_mapper drops shorter labels)
+    :param node: Node number
+    :return: Label (str)
+    """
+    return '1{:033d}'.format(node)
+
+
+# Create an edge list
+def make_edges(n_edges=2000, n_nodes=300, n_days=8, sort=True, seed=0):
+    """
+    This function creates random edges (source, target, weight, timestamp) over a number of days
+    :param n_edges: Number of edges
+    :param n_nodes: Number of nodes
+    :param n_days: Number of days between the first and the last timestamp
+    :param sort: True to sort the edges by timestamp
+    :param seed: Seed of the random generator
+    :return: Python list of (source, target, weight, timestamp) tuples
+    """
+    import random
+    generator = random.Random(seed)
+    edges = [(node_label(generator.randrange(n_nodes)), node_label(generator.randrange(n_nodes)),
+              generator.randrange(1, 10 ** 8), START_TIMESTAMP + generator.randrange(n_days * 86400))
+             for _ in range(n_edges)]
+    if sort:
+        edges.sort(key=lambda edge: edge[3])
+
+    # Return
+    return edges
+
+
+# Write an edge list
+def write_edges(file_path=None, edges=None, delimiter=' ', header_lines=()):
+    """
+    This function writes edges as text (source target weight timestamp)
+    :param file_path: Output file path
+    :param edges: Python list of (source, target, weight, timestamp) tuples
+    :param delimiter: Column separator
+    :param header_lines: Lines written before the edges (e.g. the sorted marker)
+    :return: Output file path
+    """
+    with open(file_path, 'w') as output:
+        for line in header_lines:
+            output.write(line + '\n')
+        for source, target, weight, timestamp in edges:
+            output.write(delimiter.join([source, target, str(weight), str(timestamp)]) + '\n')
+
+    # Return
+    return file_path
+
+
+# Read a text file
+def read_text(file_path=None):
+    """
+    This function reads a whole text file
+    :param file_path: File path
+    :return: Content (str)
+    """
+    with open(file_path) as f:
+        return f.read()
+
+
+# Test case with a temporary directory
+class TempDirTestCase(unittest.TestCase):
+    """
+    Test case that runs every test in a new temporary directory (also the working directory)
+    """
+    def setUp(self):
+        self.old_dir = os.getcwd()
+        self.temp_dir = tempfile.mkdtemp(prefix='ncprep_test_')
+        os.chdir(self.temp_dir)
+        os.environ['NCPREP_CACHE_DIR'] = os.path.join(self.temp_dir, 'cache')
+
+    def tearDown(self):
+        os.chdir(self.old_dir)
+        os.environ.pop('NCPREP_CACHE_DIR', None)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def path(self, name=None):
+        """
+        This function returns a path inside the temporary directory
+        :param name: File name
+        :return: File path
+        """
+        return os.path.join(self.temp_dir, name)
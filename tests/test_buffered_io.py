@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import io
+import unittest
+import threading
+import pandas as pd
+
+# Import test helpers
+from tests import TempDirTestCase, make_edges, write_edges, read_text
+
+# Import ncprep modules
+import _buffered_io
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Tests of read-ahead and write-behind I/O
+class BufferedIOTest(TempDirTestCase):
+    def setUp(self):
+        super(BufferedIOTest, self).setUp()
+        self.input_file = write_edges(self.path('edges.txt'), make_edges(n_edges=2000))
+        self.text = read_text(self.input_file)
+
+    def test_blocks_end_at_line_boundaries(self):
+        blocks = list(_buffered_io.read_ahead(self.input_file, 1000, depth=2))
+        self.assertGreater(len(blocks), 10)
+        self.assertTrue(all(block.endswith(b'\n') for block in blocks))
+        self.assertEqual(b''.join(blocks).decode('utf-8'), self.text)
+
+    def test_stream_input(self):
+        with open(self.input_file, 'rb') as f:
+            self.assertEqual(b''.join(_buffered_io.read_ahead(f, 4096)).decode('utf-8'), self.text)
+
+    def test_early_close_stops_reader(self):
+        n_threads = threading.active_count()
+        blocks = _buffered_io.read_ahead(self.input_file, 1000, depth=1)
+        next(blocks)
+        blocks.close()
+        self.assertEqual(threading.active_count(), n_threads)
+
+    def test_open_read_ahead(self):
+        with _buffered_io.open_read_ahead(self.input_file, block_size=1000) as f:
+            self.assertEqual(f.readline(), self.text.splitlines(True)[0])
+            self.assertEqual(f.read(), ''.join(self.text.splitlines(True)[1:]))
+        # Closed before the end of the input
+        n_threads = threading.active_count()
+        with _buffered_io.open_read_ahead(self.input_file, block_size=1000) as f:
+            f.readline()
+        self.assertEqual(threading.active_count(), n_threads)
+
+    def test_write_behind(self):
+        with _buffered_io.WriteBehind(self.path('output.txt'), depth=1) as f:
+            for block in _buffered_io.read_ahead(self.input_file, 1000):
+                f.write(block)
+        self.assertEqual(read_text(self.path('output.txt')), self.text)
+        output = io.BytesIO()
+        with _buffered_io.WriteBehind(output) as f:
+            f.write(b'abc')
+        self.assertEqual(output.getvalue(), b'abc')
+
+    def test_write_data_frame(self):
+        data_frame = pd.read_csv(self.input_file, sep=' ', header=None)
+        data_frame.iloc[:, 2] = data_frame.iloc[:, 2] / 3.0
+        output = io.BytesIO()
+        with _buffered_io.WriteBehind(output, depth=1) as f:
+            _buffered_io.write_data_frame(f, data_frame, chunk_rows=300)
+        self.assertEqual(output.getvalue().decode('utf-8'), data_frame.to_csv(index=False, header=False, sep=' '))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import os
+import shutil
+import unittest
+
+# Import test helpers
+from tests import TempDirTestCase, make_edges, write_edges, read_text
+
+# Import ncprep modules
+import _cache
+import ncp_txtclipper
+import ncp_txtmapper
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Tests of the result cache
+class CacheTest(TempDirTestCase):
+    def setUp(self):
+        super(CacheTest, self).setUp()
+        self.input_file = write_edges(self.path('edges.txt'), make_edges(n_edges=1000))
+
+    def entries(self):
+        cache_dir = _cache.get_cache_dir()
+        return sorted(name for name in os.listdir(cache_dir) if not name.startswith('.')) \
+            if os.path.isdir(cache_dir) else []
+
+    def clip(self, interval=2, cache=True, input_file=None):
+        output_file = self.path('clipped.txt')
+        ncp_txtclipper.clip_text(input_file=input_file or self.input_file, start_date='2017-07-16', interval=interval,
+                                 cache=cache, output_file=output_file)
+        return output_file
+
+    def mark_cached_output(self):
+        # Cached outputs are hard links (or copies), a marker in the cache entry shows that the next run is a hit
+        for entry in self.entries():
+            with open(os.path.join(_cache.get_cache_dir(), entry, '0'), 'a') as f:
+                f.write('cached\n')
+
+    def test_hit(self):
+        expected = read_text(self.clip())
+        self.assertEqual(len(self.entries()), 1)
+        self.mark_cached_output()
+        self.assertEqual(read_text(self.clip()), expected + 'cached\n')
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_miss_on_parameters_and_input(self):
+        self.clip()
+        self.mark_cached_output()
+        self.assertNotIn('cached', read_text(self.clip(interval=3)))
+        self.assertEqual(len(self.entries()), 2)
+        # A changed input file is not found by path, size and modification time
+        with open(self.input_file, 'a') as f:
+            f.write('{} {} 1 1500700000\n'.format('1' * 34, '2' * 34))
+        self.assertNotIn('cached', read_text(self.clip()))
+        self.assertEqual(len(self.entries()), 3)
+
+    def test_content_hash(self):
+        self.clip(cache='content')
+        self.mark_cached_output()
+        copy = self.path('copy.txt')
+        shutil.copyfile(self.input_file, copy)
+        self.assertIn('cached', read_text(self.clip(cache='content', input_file=copy)))
+        self.assertNotIn('cached', read_text(self.clip(cache=True, input_file=copy)))
+
+    def test_key_has_format_and_parameters(self):
+        key = _cache.cache_key(self.input_file, 'clip_text', {'start': 1, 'end': 2})
+        self.assertEqual(key, _cache.cache_key(self.input_file, 'clip_text', {'end': 2, 'start': 1}))
+        self.assertNotEqual(key, _cache.cache_key(self.input_file, 'clip_text', {'start': 1, 'end': 3}))
+        self.assertNotEqual(key, _cache.cache_key(self.input_file, 'numeric_mapper', {'start': 1, 'end': 2}))
+        cache_format = _cache.CACHE_FORMAT
+        try:
+            _cache.CACHE_FORMAT = cache_format + 1
+            self.assertNotEqual(key, _cache.cache_key(self.input_file, 'clip_text', {'start': 1, 'end': 2}))
+        finally:
+            _cache.CACHE_FORMAT = cache_format
+
+    def test_mapper_outputs(self):
+        ncp_txtmapper.numeric_mapper(input_file=self.input_file, weighted='yes', export='csr', cache=True)
+        outputs = ['edges_numeric.txt', 'edges_map.pkl', 'edges_map_info.json', 'edges_graph.npz']
+        contents = [open(self.path(name), 'rb').read() for name in outputs]
+        for name in outputs:
+            os.remove(self.path(name))
+        ncp_txtmapper.numeric_mapper(input_file=self.input_file, weighted='yes', export='csr', cache=True)
+        self.assertEqual([open(self.path(name), 'rb').read() for name in outputs], contents)
+        self.assertEqual(len(self.entries()), 1)
+
+    def test_eviction(self):
+        for index, size in enumerate((3000, 3000, 3000)):
+            output_file = self.path('output_{}.txt'.format(index))
+            with open(output_file, 'w') as f:
+                f.write('x' * size)
+            _cache.store('key_{}'.format(index), self.input_file, [output_file])
+            # Entries used in order key_0, key_1, key_2
+            entry_dir = os.path.join(_cache.get_cache_dir(), 'key_{}'.format(index))
+            os.utime(entry_dir, (1000000 + index, 1000000 + index))
+        self.assertEqual(self.entries(), ['key_0', 'key_1', 'key_2'])
+        # A hit marks the entry as recently used
+        self.assertTrue(_cache.lookup('key_0', [self.path('restored.txt')]))
+        self.assertFalse(_cache.lookup('key_3', [self.path('restored.txt')]))
+        self.assertEqual(_cache.evict('7000'), 1)
+        self.assertEqual(self.entries(), ['key_0', 'key_2'])
+        self.assertEqual(_cache.evict('0'), 2)
+        self.assertEqual(self.entries(), [])
+
+    def test_clear_cache(self):
+        self.clip()
+        other_file = write_edges(self.path('other.txt'), make_edges(n_edges=100))
+        self.clip(input_file=other_file)
+        self.assertEqual(_cache.clear_cache(self.input_file), 1)
+        self.assertEqual(len(self.entries()), 1)
+        self.assertEqual(_cache.clear_cache(), 1)
+        self.assertEqual(self.entries(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import unittest
+
+# Import test helpers
+from tests import TempDirTestCase, START_TIMESTAMP, make_edges, write_edges, read_text
+
+# Import ncprep modules
+import _operations
+import ncp_txtclipper
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Tests of clip_text
+class ClipTextTest(TempDirTestCase):
+    # Clip 2017-07-16 and 2017-07-17
+    START_DATE, INTERVAL = '2017-07-16', 2
+
+    def expected_lines(self, edges):
+        start = START_TIMESTAMP + 2 * 86400
+        return [edge for edge in edges if start <= edge[3] < start + self.INTERVAL * 86400]
+
+    def clip(self, input_file, name, **kwargs):
+        output_file = self.path(name)
+        ncp_txtclipper.clip_text(input_file=input_file, start_date=self.START_DATE, interval=self.INTERVAL,
+                                 output_file=output_file, **kwargs)
+        return read_text(output_file)
+
+    def assert_modes_agree(self, edges, header_lines=(), data_frame=True):
+        input_file = write_edges(self.path('edges.txt'), edges, header_lines=header_lines)
+        expected = read_text(write_edges(self.path('expected.txt'), self.expected_lines(edges)))
+        if data_frame:
+            self.assertEqual(self.clip(input_file, 'pandas.txt'), expected)
+        self.assertEqual(self.clip(input_file, 'fixed_width.txt', fixed_width=True), expected)
+        self.assertEqual(self.clip(input_file, 'fixed_width_blocks.txt', fixed_width=True, block_size='4K'), expected)
+        self.assertEqual(self.clip(input_file, 'chunked.txt', max_memory='64K'), expected)
+        self.assertEqual(self.clip(input_file, 'fixed_width_budget.txt', fixed_width=True, max_memory='64K'), expected)
+
+    def test_sorted_input(self):
+        self.assert_modes_agree(make_edges(n_edges=3000), header_lines=[_operations.SORTED_MARKER])
+
+    def test_unsorted_input(self):
+        # The in-memory data frame clip slices a date index, it needs time sorted input
+        self.assert_modes_agree(make_edges(n_edges=3000, sort=False), data_frame=False)
+
+    def test_empty_range(self):
+        input_file = write_edges(self.path('edges.txt'), make_edges(n_edges=100, n_days=1))
+        self.assertEqual(self.clip(input_file, 'pandas.txt'), '')
+        self.assertEqual(self.clip(input_file, 'fixed_width.txt', fixed_width=True), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
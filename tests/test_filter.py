@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import unittest
+
+# Import test helpers
+from tests import TempDirTestCase, make_edges, write_edges, read_text
+
+# Import ncprep modules
+import _operations
+import ncp_txtfilter
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Tests of filter_columns
+class FilterColumnsTest(TempDirTestCase):
+    def setUp(self):
+        super(FilterColumnsTest, self).setUp()
+        self.edges = make_edges(n_edges=2000, n_nodes=50)
+        self.input_file = write_edges(self.path('edges.txt'), self.edges, header_lines=[_operations.SORTED_MARKER])
+
+    def filter(self, name, **kwargs):
+        output_file = self.path(name)
+        kwargs.setdefault('column_indexes', '4,1,3')
+        ncp_txtfilter.filter_columns(input_file=self.input_file, output_file=output_file, **kwargs)
+        return read_text(output_file)
+
+    def expected(self, edges, columns=(3, 0, 2)):
+        lines = [' '.join(str(edge[column]) for column in columns) for edge in edges]
+        return '\n'.join([_operations.SORTED_MARKER] + lines) + '\n'
+
+    def test_columns(self):
+        self.assertEqual(self.filter('awk.txt'), self.expected(self.edges))
+        # Row filtering that keeps every row writes the same columns as awk
+        self.assertEqual(self.filter('numpy.txt', conditions='4>=0'), self.expected(self.edges))
+        self.assertEqual(self.filter('numpy_blocks.txt', conditions='4>=0', block_size='4K'),
+                         self.expected(self.edges))
+
+    def test_conditions(self):
+        output = self.filter('conditions.txt', conditions='3>=50000000,4<1500300000')
+        edges = [edge for edge in self.edges if edge[2] >= 50000000 and edge[3] < 1500300000]
+        self.assertTrue(0 < len(edges) < len(self.edges))
+        self.assertEqual(output, self.expected(edges))
+        self.assertEqual(self.filter('not_equal.txt', conditions='3!={}'.format(self.edges[0][2])),
+                         self.expected([edge for edge in self.edges if edge[2] != self.edges[0][2]]))
+
+    def test_address_lists(self):
+        listed = [self.edges[index][0] for index in range(0, 40, 4)]
+        with open(self.path('list.txt'), 'w') as f:
+            f.write('\n'.join(listed) + '\n')
+        self.assertEqual(self.filter('deny.txt', deny_file=self.path('list.txt')),
+                         self.expected([edge for edge in self.edges
+                                        if edge[0] not in listed and edge[1] not in listed]))
+        self.assertEqual(self.filter('allow.txt', allow_file=self.path('list.txt'), list_columns='1'),
+                         self.expected([edge for edge in self.edges if edge[0] in listed]))
+
+    def test_comments_and_short_lines(self):
+        with open(self.input_file, 'a') as f:
+            f.write('  # indented comment\nshort line\n')
+        expected = self.expected(self.edges) + '  # indented comment\n'
+        self.assertEqual(self.filter('numpy.txt', conditions='4>=0'), expected)
+        # awk writes short lines with empty columns
+        self.assertEqual(self.filter('awk.txt'), expected + ' short \n')
+
+    def test_invalid_column_indexes(self):
+        self.assertRaises(SystemExit, self.filter, 'invalid.txt', column_indexes='1,x', conditions='4>=0')
+        self.assertRaises(SystemExit, self.filter, 'invalid.txt', column_indexes='0,1', conditions='4>=0')
+        self.assertRaises(SystemExit, self.filter, 'invalid.txt', deny_file=self.input_file, list_columns='a')
+        self.assertRaises(SystemExit, self.filter, 'invalid.txt', conditions='3~5')
+
+
+if __name__ == '__main__':
+    unittest.main()
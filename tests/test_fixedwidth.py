@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import unittest
+import numpy as np
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+# Import test helpers
+from tests import make_edges
+
+# Import ncprep modules
+import _fixedwidth
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Tests of the fixed width parsing helpers
+class ParseBlockTest(unittest.TestCase):
+    def fields(self, block, delimiter=None, n_fields=4, **kwargs):
+        """
+        This function parses a block and returns the fields of every valid line
+        :param block: Raw text (bytes)
+        :param delimiter: Column separator
+        :param n_fields: Number of fields
+        :return: Python list of lists of fields (bytes)
+        """
+        buffer, starts, ends, line_starts, line_ends = _fixedwidth.parse_block(block, delimiter, n_fields, **kwargs)
+        data = buffer.tobytes()
+        self.assertEqual(len(line_starts), len(starts))
+        return [[data[start:end] for start, end in zip(row_starts, row_ends)]
+                for row_starts, row_ends in zip(starts, ends)]
+
+    def test_whitespace(self):
+        block = b'a b 1 10\n  c\td  2   20  \n'
+        self.assertEqual(self.fields(block), [[b'a', b'b', b'1', b'10'], [b'c', b'd', b'2', b'20']])
+
+    def test_delimiter(self):
+        block = b'a,b,1,10\nc, d,,20\n'
+        self.assertEqual(self.fields(block, ','), [[b'a', b'b', b'1', b'10'], [b'c', b'd', b'', b'20']])
+        self.assertEqual(self.fields(block, ',', skip_initial_space=False)[1][1], b' d')
+
+    def test_short_last_line(self):
+        # Last line without new line is parsed, a last line with less fields is dropped
+        self.assertEqual(self.fields(b'a b 1 10\nc d 2 20'), [[b'a', b'b', b'1', b'10'], [b'c', b'd', b'2', b'20']])
+        self.assertEqual(self.fields(b'a b 1 10\nc d'), [[b'a', b'b', b'1', b'10']])
+        self.assertEqual(self.fields(b'a,b,1,10\nc,d,2', ','), [[b'a', b'b', b'1', b'10']])
+
+    def test_short_and_empty_lines(self):
+        block = b'a b\n\n   \na b 1 10\n'
+        self.assertEqual(self.fields(block), [[b'a', b'b', b'1', b'10']])
+        self.assertEqual(self.fields(block, n_fields=2), [[b'a', b'b'], [b'a', b'b']])
+
+    def test_comments(self):
+        block = b'# ncprep: sorted by timestamp\na b 1 10\n  # indented comment\n#a b 1 10\nc d 2 20\n'
+        self.assertEqual(self.fields(block), [[b'a', b'b', b'1', b'10'], [b'c', b'd', b'2', b'20']])
+        self.assertEqual(self.fields(b'#a,b,1,10\na,b,1,10\n', ','), [[b'a', b'b', b'1', b'10']])
+
+    def test_crlf(self):
+        expected = [[b'a', b'b', b'1', b'10'], [b'c', b'd', b'2', b'20']]
+        self.assertEqual(self.fields(b'a b 1 10\r\nc d 2 20\r\n'), expected)
+        self.assertEqual(self.fields(b'a,b,1,10\r\nc,d,2,20\r\n', ','), expected)
+        self.assertEqual(self.fields(b'a,b,1,10\r\nc,d,2,20', ','), expected)
+
+    def test_comment_lines(self):
+        block = b'# marker\na b 1 10\n  # indented\n\t#tab\nc # d\n'
+        buffer = _fixedwidth.parse_block(block, None, 4)[0]
+        starts, ends = _fixedwidth.comment_lines(buffer, None)
+        self.assertEqual([block[start:end] for start, end in zip(starts, ends)],
+                         [b'# marker', b'  # indented', b'\t#tab'])
+        block = b'#a,b\n #c,d\ne,#f\n'
+        buffer = _fixedwidth.parse_block(block, ',', 2)[0]
+        self.assertEqual(len(_fixedwidth.comment_lines(buffer, ',')[0]), 2)
+        self.assertEqual(len(_fixedwidth.comment_lines(buffer, ',', skip_initial_space=False)[0]), 1)
+
+    def test_line_offsets(self):
+        block = b'# comment\na b 1 10\nc d 2 20\n'
+        _, _, _, line_starts, line_ends = _fixedwidth.parse_block(block, None, 4)
+        self.assertEqual([block[start:end] for start, end in zip(line_starts, line_ends)],
+                         [b'a b 1 10', b'c d 2 20'])
+
+
+# Tests of the field converters
+class ConvertFieldsTest(unittest.TestCase):
+    def parse(self, block, converter):
+        buffer, starts, ends, _, _ = _fixedwidth.parse_block(block, ',', 1)
+        values, valid = converter(buffer, starts[:, 0], ends[:, 0])
+        return values.tolist(), valid.tolist()
+
+    def test_integers(self):
+        values, valid = self.parse(b'12\n-7\n0\n1.5\nx\n,\n', _fixedwidth.parse_integers)
+        self.assertEqual(valid, [True, True, True, False, False, False])
+        self.assertEqual(values[:3], [12, -7, 0])
+
+    def test_numbers(self):
+        values, valid = self.parse(b'12\n-7.25\n.5\n1.5.1\n.\nx\n', _fixedwidth.parse_numbers)
+        self.assertEqual(valid, [True, True, True, False, False, False])
+        self.assertEqual(values[:3], [12.0, -7.25, 0.5])
+
+    def test_gather_strings(self):
+        buffer, starts, ends, _, _ = _fixedwidth.parse_block(b'ab,c\nd,efg\n', ',', 2)
+        self.assertEqual(_fixedwidth.gather_strings(buffer, starts[:, 1], ends[:, 1]).tolist(), [b'c', b'efg'])
+        self.assertEqual(_fixedwidth.gather_strings(buffer, starts[:, 0], ends[:, 0], width=4).dtype, np.dtype('S4'))
+
+    def test_hash_fields(self):
+        buffer, starts, ends, _, _ = _fixedwidth.parse_block(b'abc,x\nabc,y\nabd,x\n', ',', 2)
+        hashes = _fixedwidth.hash_fields(buffer, starts[:, 0], ends[:, 0])
+        self.assertEqual(hashes[0], hashes[1])
+        self.assertNotEqual(hashes[0], hashes[2])
+
+    def test_encode_labels(self):
+        codes, labels = _fixedwidth.encode_labels(np.array([b'c', b'a', b'c', b'b', b'a']))
+        self.assertEqual(codes.tolist(), [0, 1, 0, 2, 1])
+        self.assertEqual(labels.tolist(), [b'c', b'a', b'b'])
+
+    def test_encode_labels_hash_collision(self):
+        # Labels with the same hash are still told apart
+        hash_fields = _fixedwidth.hash_fields
+        try:
+            _fixedwidth.hash_fields = lambda buffer, starts, ends: np.zeros(len(starts), dtype=np.uint64)
+            codes, labels = _fixedwidth.encode_labels(np.array([b'c', b'a', b'c', b'b', b'a']))
+        finally:
+            _fixedwidth.hash_fields = hash_fields
+        self.assertEqual(codes.tolist(), [0, 1, 0, 2, 1])
+        self.assertEqual(labels.tolist(), [b'c', b'a', b'b'])
+
+    def test_gather_segments(self):
+        buffer = np.frombuffer(b'0123456789', dtype=np.uint8)
+        segments = _fixedwidth.gather_segments(buffer, np.array([7, 0, 3]), np.array([2, 1, 0]))
+        self.assertEqual(segments.tobytes(), b'780')
+
+
+# Tests of the fixed width peak memory (numpy reports its buffers to tracemalloc)
+@unittest.skipIf(tracemalloc is None, 'tracemalloc is not available')
+class MemoryTest(unittest.TestCase):
+    def setUp(self):
+        edges = make_edges(n_edges=40000)
+        self.block = ''.join('{} {} {} {}\n'.format(*edge) for edge in edges).encode('utf-8')
+
+    def peak(self, function, *args):
+        """
+        This function measures the traced peak memory of a call
+        :param function: Function to call
+        :param args: Arguments of the function
+        :return: result of the call, peak memory (bytes)
+        """
+        tracemalloc.start()
+        try:
+            result = function(*args)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        # Return
+        return result, peak
+
+    def test_parse_block(self):
+        # Per byte offsets (an int64 cumsum) used about 17 bytes per block byte
+        _, peak = self.peak(_fixedwidth.parse_block, self.block, None, 4)
+        self.assertLess(peak, 6 * len(self.block))
+
+    def test_gather_strings(self):
+        # A 2-D int64 index used about 16 times the output size
+        buffer, starts, ends, _, _ = _fixedwidth.parse_block(self.block, None, 4)
+        strings, peak = self.peak(_fixedwidth.gather_strings, buffer, starts[:, 0], ends[:, 0])
+        self.assertLess(peak, 3 * strings.nbytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
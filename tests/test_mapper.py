@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import os
+import sys
+import shutil
+import unittest
+import numpy as np
+
+# Import pickle [Python 2 uses cPickle]
+if sys.version_info[0] == 2:
+    import cPickle as pickle
+else:
+    import pickle
+
+# Import test helpers
+from tests import TempDirTestCase, make_edges, write_edges, read_text
+
+# Import ncprep modules
+import ncp_txtmapper
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Tests of numeric_mapper
+class NumericMapperTest(TempDirTestCase):
+    def setUp(self):
+        super(NumericMapperTest, self).setUp()
+        self.edges = make_edges(n_edges=3000, n_nodes=400)
+        self.input_file = write_edges(self.path('edges.txt'), self.edges)
+
+    def map_file(self, name=None, **kwargs):
+        """
+        This function maps a copy of the input file in its own directory
+        :param name: Directory name of the run
+        :param kwargs: Parameters of numeric_mapper
+        :return: numeric output (str), mapping (python dictionary label -> id), directory
+        """
+        os.mkdir(self.path(name))
+        input_file = os.path.join(self.path(name), 'edges.txt')
+        shutil.copyfile(self.input_file, input_file)
+        kwargs.setdefault('weighted', 'yes')
+        ncp_txtmapper.numeric_mapper(input_file=input_file, **kwargs)
+        numeric = read_text(os.path.join(self.path(name), 'edges_numeric.txt'))
+        if kwargs.get('fixed_width'):
+            labels = np.load(os.path.join(self.path(name), 'edges_map.npy'))
+            mapping = dict((label.decode('ascii'), node_id) for node_id, label in enumerate(labels))
+        else:
+            with open(os.path.join(self.path(name), 'edges_map.pkl'), 'rb') as f:
+                mapping = dict((str(label), node_id) for label, node_id in pickle.load(f).items())
+
+        # Return
+        return numeric, mapping, self.path(name)
+
+    def test_in_memory(self):
+        numeric, mapping, _ = self.map_file('in_memory')
+        rows = [line.split() for line in numeric.splitlines()]
+        self.assertEqual(len(rows), len(self.edges))
+        labels = dict((node_id, label) for label, node_id in mapping.items())
+        for row, (source, target, weight, timestamp) in zip(rows, self.edges):
+            self.assertEqual(labels[int(row[0])], source)
+            self.assertEqual(labels[int(row[1])], target)
+            self.assertAlmostEqual(float(row[2]), round(np.log1p(weight), 2))
+            self.assertEqual(int(row[3]), timestamp)
+        # Ids in order of first appearance
+        self.assertEqual(sorted(mapping.values()), list(range(len(mapping))))
+        self.assertEqual(mapping[self.edges[0][0]], 0)
+
+    def test_sharded_equals_in_memory(self):
+        expected = self.map_file('in_memory')[:2]
+        for n_jobs in (2, 3):
+            self.assertEqual(self.map_file('sharded_{}'.format(n_jobs), n_jobs=n_jobs)[:2], expected)
+
+    def test_fixed_width_equals_in_memory(self):
+        expected = self.map_file('in_memory')[:2]
+        self.assertEqual(self.map_file('fixed_width', fixed_width=True)[:2], expected)
+        self.assertEqual(self.map_file('fixed_width_blocks', fixed_width=True, block_size='4K')[:2], expected)
+
+    def test_memory_budget_equals_in_memory(self):
+        # A small budget spills chunks and unique target runs to temporary files
+        expected = self.map_file('in_memory')[:2]
+        self.assertEqual(self.map_file('chunked', max_memory='64K')[:2], expected)
+        self.assertEqual(self.map_file('chunked_sharded', max_memory='64K', n_jobs=2)[:2], expected)
+        self.assertEqual(self.map_file('fixed_width_budget', max_memory='64K', fixed_width=True)[:2], expected)
+
+    def test_unweighted(self):
+        numeric, mapping, _ = self.map_file('unweighted', weighted='no')
+        rows = [line.split() for line in numeric.splitlines()]
+        self.assertEqual([len(row) for row in rows[:3]], [3, 3, 3])
+        self.assertEqual([int(row[2]) for row in rows], [edge[3] for edge in self.edges])
+        for name, kwargs in (('unweighted_sharded', {'n_jobs': 2}), ('unweighted_fixed_width', {'fixed_width': True})):
+            self.assertEqual(self.map_file(name, weighted='no', **kwargs)[:2], (numeric, mapping))
+
+    def test_short_labels_are_dropped(self):
+        with open(self.input_file, 'a') as f:
+            f.write('short {} 5 {}\n'.format(self.edges[0][1], self.edges[-1][3]))
+        numeric, mapping, _ = self.map_file('short')
+        self.assertEqual(len(numeric.splitlines()), len(self.edges))
+        self.assertNotIn('short', mapping)
+        self.assertEqual(self.map_file('short_fixed_width', fixed_width=True)[:2], (numeric, mapping))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import os
+import json
+import unittest
+import numpy as np
+
+# Import test helpers
+from tests import TempDirTestCase, make_edges, write_edges
+
+# Import ncprep modules
+import _ordering
+import ncp_txtmapper
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Create a grid graph with shuffled node ids
+def shuffled_grid(size=None, seed=0):
+    """
+    This function creates the edges of a size x size grid, node ids are shuffled
+    :param size: Number of nodes per side
+    :param seed: Seed of the random generator
+    :return: sources, targets (numpy int64 arrays), number of nodes
+    """
+    nodes = np.arange(size * size).reshape(size, size)
+    sources = np.concatenate([nodes[:, :-1].ravel(), nodes[:-1, :].ravel()])
+    targets = np.concatenate([nodes[:, 1:].ravel(), nodes[1:, :].ravel()])
+    shuffle = np.random.RandomState(seed).permutation(size * size)
+
+    # Return
+    return shuffle[sources], shuffle[targets], size * size
+
+
+# Tests of the node id orderings
+class NodeOrderTest(unittest.TestCase):
+    def assert_permutation(self, new_ids, n_nodes):
+        self.assertEqual(sorted(new_ids.tolist()), list(range(n_nodes)))
+
+    def test_orders_are_permutations(self):
+        sources, targets, n_nodes = shuffled_grid(12)
+        timestamps = np.arange(len(sources))
+        for id_order in _ordering.ID_ORDERS:
+            self.assert_permutation(_ordering.node_order(sources, targets, n_nodes, id_order, timestamps), n_nodes)
+        self.assertEqual(_ordering.node_order(sources, targets, n_nodes).tolist(), list(range(n_nodes)))
+
+    def test_degree(self):
+        # Degrees 1, 1, 3, 2, 1: nodes 0, 1 and 4 tie (first appearance first)
+        new_ids = _ordering.node_order(np.array([0, 2, 2, 3]), np.array([2, 1, 3, 4]), 5, 'degree')
+        self.assertEqual(new_ids.tolist(), [2, 3, 0, 1, 4])
+
+    def test_timestamp(self):
+        # First edges at 30, 20, 10, 10: nodes 2 and 3 tie (first appearance first)
+        new_ids = _ordering.node_order(np.array([0, 2, 1]), np.array([1, 3, 3]), 4, 'timestamp',
+                                       timestamps=np.array([30, 10, 20]))
+        self.assertEqual(new_ids.tolist(), [3, 2, 0, 1])
+
+    def test_rcm_reduces_bandwidth(self):
+        sources, targets, n_nodes = shuffled_grid(30)
+        _, shuffled_bandwidth = _ordering.edge_span(sources, targets)
+        new_ids = _ordering.node_order(sources, targets, n_nodes, 'rcm')
+        self.assert_permutation(new_ids, n_nodes)
+        _, bandwidth = _ordering.edge_span(new_ids[sources], new_ids[targets])
+        # Breadth first levels of a grid are diagonals, neighbors are at most about two diagonals apart
+        self.assertLessEqual(bandwidth, 2 * 30 + 1)
+        self.assertLess(bandwidth, shuffled_bandwidth / 5)
+
+    def test_rcm_path(self):
+        n_nodes = 200
+        shuffle = np.random.RandomState(1).permutation(n_nodes)
+        new_ids = _ordering.node_order(shuffle[:-1], shuffle[1:], n_nodes, 'rcm')
+        self.assertEqual(_ordering.edge_span(new_ids[shuffle[:-1]], new_ids[shuffle[1:]]), (1.0, 1))
+
+    def test_rcm_components(self):
+        # Two paths and an isolated node, every component gets contiguous ids
+        sources, targets = np.array([0, 2, 4, 5]), np.array([2, 4, 1, 3])
+        new_ids = _ordering.node_order(sources, targets, 7, 'rcm')
+        self.assert_permutation(new_ids, 7)
+        for component in ([0, 2, 4, 1], [5, 3], [6]):
+            ids = sorted(new_ids[component].tolist())
+            self.assertEqual(ids, list(range(ids[0], ids[0] + len(ids))))
+
+
+# Tests of numeric_mapper id orders
+class MapperIdOrderTest(TempDirTestCase):
+    def test_info_file(self):
+        input_file = write_edges(self.path('edges.txt'), make_edges(n_edges=2000, n_nodes=300))
+        bandwidths = {}
+        for id_order in _ordering.ID_ORDERS:
+            for fixed_width in (False, True):
+                ncp_txtmapper.numeric_mapper(input_file=input_file, weighted='yes', id_order=id_order,
+                                             fixed_width=fixed_width)
+                with open(self.path('edges_map_info.json')) as f:
+                    info = json.load(f)
+                self.assertEqual(info['id_order'], id_order)
+                bandwidths.setdefault(id_order, set()).add(info['bandwidth'])
+                numeric = np.loadtxt(self.path('edges_numeric.txt'))
+                self.assertEqual(_ordering.edge_span(numeric[:, 0].astype(np.int64),
+                                                     numeric[:, 1].astype(np.int64))[1], info['bandwidth'])
+                os.remove(self.path('edges_numeric.txt'))
+        # Pandas and fixed width mapping give the same ids
+        self.assertTrue(all(len(values) == 1 for values in bandwidths.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
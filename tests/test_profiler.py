@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import datetime
+import unittest
+import numpy as np
+
+# Import test helpers
+from tests import TempDirTestCase, make_edges, write_edges
+
+# Import ncprep modules
+import _sketches
+import _fixedwidth
+import ncp_txtprofiler
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Hash values like the profiler does
+def hash_values(values=None):
+    """
+    This function computes the FNV-1a hashes of byte string values with _fixedwidth.hash_fields
+    :param values: Python list of values (bytes)
+    :return: numpy uint64 array
+    """
+    lengths = np.array([len(value) for value in values], dtype=np.int64)
+    ends = np.cumsum(lengths)
+    buffer = np.frombuffer(b''.join(values), dtype=np.uint8)
+
+    # Return
+    return _fixedwidth.hash_fields(buffer, ends - lengths, ends)
+
+
+# Tests of the HyperLogLog distinct counter
+class HyperLogLogTest(unittest.TestCase):
+    def count(self, values, precision):
+        registers = _sketches.hll_create(precision)
+        _sketches.hll_add_hashes(registers, hash_values(values))
+        return _sketches.hll_count(registers)
+
+    def test_add_matches_add_hashes(self):
+        values = [str(value).encode('ascii') for value in range(300)]
+        registers = _sketches.hll_create(10)
+        for value in values:
+            _sketches.hll_add(registers, value)
+        self.assertEqual(registers, self.registers(values, 10))
+        self.assertEqual(_sketches.hll_count(_sketches.hll_create(10)), 0)
+
+    def registers(self, values, precision):
+        registers = _sketches.hll_create(precision)
+        _sketches.hll_add_hashes(registers, hash_values(values))
+        return registers
+
+    def test_error_bound(self):
+        # Standard error 1.04 / sqrt(2 ^ 12) = 1.6%, allow 4 standard errors
+        for n_values in (1000, 20000, 60000):
+            estimate = self.count([str(value).encode('ascii') for value in range(n_values)], precision=12)
+            self.assertLess(abs(estimate - n_values) / float(n_values), 4 * 1.04 / 2 ** 6)
+
+    def test_duplicates_are_not_counted(self):
+        values = [str(value % 500).encode('ascii') for value in range(20000)]
+        self.assertLess(abs(self.count(values, precision=14) - 500), 10)
+
+    def test_merge_is_union(self):
+        values = [str(value).encode('ascii') for value in range(5000)]
+        left = self.registers([value for value in values if int(value) % 3], 10)
+        right = self.registers([value for value in values if not int(value) % 3], 10)
+        self.assertEqual(_sketches.hll_merge(left, right), self.registers(values, 10))
+
+    def test_invalid_precision(self):
+        self.assertRaises(ValueError, _sketches.hll_create, 3)
+        self.assertRaises(ValueError, _sketches.hll_merge, _sketches.hll_create(10), _sketches.hll_create(11))
+
+
+# Tests of the quantile sketch
+class QuantileSketchTest(unittest.TestCase):
+    QUANTILES = [0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0]
+
+    def assert_relative_error(self, values, relative_accuracy):
+        sketch = _sketches.quantile_create(relative_accuracy)
+        for value in values:
+            _sketches.quantile_add(sketch, value)
+        values = sorted(values)
+        for quantile in self.QUANTILES:
+            exact = values[int(quantile * (len(values) - 1))]
+            estimate = _sketches.quantile_value(sketch, quantile)
+            if exact == 0:
+                self.assertEqual(estimate, 0)
+            else:
+                self.assertLessEqual(abs(estimate - exact) / exact, relative_accuracy + 1e-9)
+
+    def test_error_bound(self):
+        import random
+        generator = random.Random(1)
+        values = [generator.lognormvariate(10, 3) for _ in range(20000)]
+        for relative_accuracy in (0.01, 0.05):
+            self.assert_relative_error(values, relative_accuracy)
+
+    def test_zeros_and_integers(self):
+        self.assert_relative_error([0] * 100 + list(range(1, 1000)), 0.01)
+
+    def test_add_values(self):
+        values = [0] * 10 + list(range(1, 3000))
+        sketch, bulk = _sketches.quantile_create(0.01), _sketches.quantile_create(0.01)
+        for value in values:
+            _sketches.quantile_add(sketch, value)
+        _sketches.quantile_add_values(bulk, np.array(values, dtype=np.float64))
+        self.assertEqual(bulk, sketch)
+        self.assertRaises(ValueError, _sketches.quantile_add_values, bulk, np.array([1.0, -1.0]))
+
+    def test_merge(self):
+        merged, other, whole = (_sketches.quantile_create(0.01) for _ in range(3))
+        for value in range(1, 3000):
+            _sketches.quantile_add(merged if value % 2 else other, value)
+            _sketches.quantile_add(whole, value)
+        _sketches.quantile_merge(merged, other)
+        for quantile in self.QUANTILES:
+            self.assertEqual(_sketches.quantile_value(merged, quantile), _sketches.quantile_value(whole, quantile))
+
+    def test_empty_and_invalid(self):
+        sketch = _sketches.quantile_create(0.01)
+        self.assertIsNone(_sketches.quantile_value(sketch, 0.5))
+        self.assertRaises(ValueError, _sketches.quantile_add, sketch, -1)
+        self.assertRaises(ValueError, _sketches.quantile_create, 0)
+
+
+# Tests of profile
+class ProfileTest(TempDirTestCase):
+    def test_profile(self):
+        edges = make_edges(n_edges=2000, n_nodes=300)
+        input_file = write_edges(self.path('edges.txt'), edges)
+        days = sorted(set(datetime.datetime.utcfromtimestamp(edge[3]).strftime('%Y-%m-%d') for edge in edges))
+        for n_jobs in (1, 2):
+            result = ncp_txtprofiler.profile(input_file=input_file, weighted='yes', n_jobs=n_jobs)
+            self.assertEqual(result['rows'], len(edges))
+            self.assertEqual(list(result['edges_per_day']), days)
+            self.assertEqual(sum(result['edges_per_day'].values()), len(edges))
+            n_nodes = len(set(edge[0] for edge in edges) | set(edge[1] for edge in edges))
+            self.assertLess(abs(result['unique_nodes'] - n_nodes), 0.05 * n_nodes)
+            self.assertLessEqual(result['weight_quantiles'][1.0], max(edge[2] for edge in edges))
+
+    def test_unweighted_reads_timestamp_column(self):
+        # The weight column of a 4 column file is not taken for the timestamp
+        edges = make_edges(n_edges=500)
+        input_file = write_edges(self.path('edges.txt'), edges)
+        result = ncp_txtprofiler.profile(input_file=input_file, weighted='no', n_jobs=1)
+        self.assertEqual(result['rows'], len(edges))
+        self.assertEqual(result['skipped'], 0)
+        self.assertEqual(sum(result['edges_per_day'].values()), len(edges))
+        self.assertEqual(list(result['edges_per_day'])[0], '2017-07-14')
+        self.assertEqual(result['weight_quantiles'], {})
+
+    def test_skipped_rows(self):
+        edges = make_edges(n_edges=500)
+        input_file = write_edges(self.path('edges.txt'), edges[:250])
+        # Blank and commented lines are not rows, a short line and an invalid weight are skipped
+        with open(input_file, 'a') as f:
+            f.write('\n  \n# comment\n  # indented comment\nshort line\n{} {} x {}\n'.format(
+                *edges[0][:2] + edges[0][3:]))
+        write_edges(self.path('rest.txt'), edges[250:])
+        with open(input_file, 'a') as f, open(self.path('rest.txt')) as rest:
+            f.write(rest.read())
+        for n_jobs in (1, 3):
+            result = ncp_txtprofiler.profile(input_file=input_file, weighted='yes', n_jobs=n_jobs)
+            self.assertEqual((result['rows'], result['skipped']), (len(edges), 2))
+            self.assertEqual(sum(result['edges_per_day'].values()), len(edges))
+
+
+if __name__ == '__main__':
+    unittest.main()
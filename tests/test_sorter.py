@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import unittest
+
+# Import test helpers
+from tests import TempDirTestCase, make_edges, write_edges, read_text
+
+# Import ncprep modules
+import _operations
+import ncp_txtsorter
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Tests of sort_by_time
+class SortByTimeTest(TempDirTestCase):
+    def sort_and_compare(self, max_memory=None, n_jobs=None):
+        """
+        This function sorts a shuffled file and compares it with a stable in-memory sort
+        :param max_memory: Memory budget
+        :param n_jobs: Number of worker processes
+        :return: NULL
+        """
+        edges = make_edges(n_edges=3000, sort=False)
+        input_file = write_edges(self.path('edges.txt'), edges)
+        output_file = ncp_txtsorter.sort_by_time(input_file=input_file, max_memory=max_memory, n_jobs=n_jobs,
+                                                 output_file=self.path('sorted.txt'))
+        expected = write_edges(self.path('expected.txt'), sorted(edges, key=lambda edge: edge[3]),
+                               header_lines=[_operations.SORTED_MARKER])
+        self.assertEqual(read_text(output_file), read_text(expected))
+        self.assertTrue(_operations.is_time_sorted(output_file))
+
+    def test_single_run(self):
+        self.sort_and_compare(max_memory='512M', n_jobs=1)
+
+    def test_spilled_runs(self):
+        # A small budget creates many runs that are merged
+        self.sort_and_compare(max_memory='16K', n_jobs=1)
+
+    def test_merge_passes(self):
+        # More runs than the merge fan-in are merged through intermediate runs
+        fan_in = ncp_txtsorter.MERGE_FAN_IN
+        try:
+            ncp_txtsorter.MERGE_FAN_IN = 3
+            self.sort_and_compare(max_memory='16K', n_jobs=2)
+        finally:
+            ncp_txtsorter.MERGE_FAN_IN = fan_in
+
+    def test_parallel_runs(self):
+        self.sort_and_compare(max_memory='32K', n_jobs=2)
+
+    def test_lines_without_timestamp_are_skipped(self):
+        edges = make_edges(n_edges=50, sort=False)
+        input_file = write_edges(self.path('edges.txt'), edges)
+        with open(input_file, 'a') as f:
+            f.write('{} {} 1 not_a_time\n'.format(edges[0][0], edges[0][1]))
+        output_file = ncp_txtsorter.sort_by_time(input_file=input_file, n_jobs=1, output_file=self.path('sorted.txt'))
+        lines = read_text(output_file).splitlines()
+        self.assertEqual(len(lines), len(edges) + 1)
+        self.assertNotIn('not_a_time', read_text(output_file))
+
+
+if __name__ == '__main__':
+    unittest.main()
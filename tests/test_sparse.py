@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import unittest
+import numpy as np
+
+# Import scipy [optional, only used to check the exported files]
+try:
+    import scipy.sparse
+except ImportError:
+    scipy = None
+
+# Import test helpers
+from tests import TempDirTestCase, make_edges, write_edges, read_text
+
+# Import ncprep modules
+import _sparse
+import ncp_txtmapper
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Tests of the sparse graph helpers
+class BuildCSRTest(unittest.TestCase):
+    def setUp(self):
+        generator = np.random.RandomState(0)
+        self.n_nodes = 50
+        self.rows = generator.randint(0, self.n_nodes, 1000)
+        self.columns = generator.randint(0, self.n_nodes, 1000)
+        self.data = generator.rand(1000)
+
+    def test_counting_sort_order_is_stable(self):
+        generator = np.random.RandomState(1)
+        # One digit, two digits and three digits of 16 bits
+        for n_keys in (1, 7, 70000, 2 ** 33):
+            keys = generator.randint(0, n_keys, 5000).astype(np.int64)
+            self.assertTrue(np.array_equal(_sparse.counting_sort_order(keys, n_keys),
+                                           np.argsort(keys, kind='mergesort')))
+        self.assertEqual(len(_sparse.counting_sort_order(np.zeros(0, dtype=np.int64), 0)), 0)
+
+    def test_build_csr(self):
+        indptr, indices, data = _sparse.build_csr(self.rows, self.columns, self.data, self.n_nodes)
+        self.assertEqual(indptr[0], 0)
+        self.assertEqual(indptr[-1], len(self.rows))
+        for row in range(self.n_nodes):
+            # Edges of a row in input order
+            edges = np.flatnonzero(self.rows == row)
+            self.assertTrue(np.array_equal(indices[indptr[row]:indptr[row + 1]], self.columns[edges]))
+            self.assertTrue(np.array_equal(data[indptr[row]:indptr[row + 1]], self.data[edges]))
+        self.assertEqual(indices.dtype, np.int32)
+
+    def test_empty_rows(self):
+        indptr, indices, _ = _sparse.build_csr(np.array([3, 3, 0]), np.array([1, 2, 4]), np.ones(3), 6)
+        self.assertEqual(indptr.tolist(), [0, 1, 1, 1, 3, 3, 3])
+        self.assertEqual(indices.tolist(), [4, 1, 2])
+
+    def test_symmetric_edges(self):
+        rows, columns, data = _sparse.edge_arrays(np.array([0, 1]), np.array([1, 1]), None, symmetric=True)
+        self.assertEqual(sorted(zip(rows.tolist(), columns.tolist())), [(0, 1), (1, 0), (1, 1)])
+        self.assertEqual(data.tolist(), [1.0, 1.0, 1.0])
+
+
+# Tests of the numeric_mapper graph export
+class GraphExportTest(TempDirTestCase):
+    def setUp(self):
+        super(GraphExportTest, self).setUp()
+        self.input_file = write_edges(self.path('edges.txt'), make_edges(n_edges=2000, n_nodes=300))
+
+    def dense_graph(self, symmetric=False):
+        """
+        This function creates the dense adjacency matrix of the numeric output file
+        :param symmetric: True for undirected graph
+        :return: numpy float64 array (nodes x nodes)
+        """
+        rows = np.array([line.split() for line in read_text(self.path('edges_numeric.txt')).splitlines()])
+        sources, targets = rows[:, 0].astype(np.int64), rows[:, 1].astype(np.int64)
+        weights = rows[:, 2].astype(np.float64)
+        n_nodes = max(sources.max(), targets.max()) + 1
+        graph = np.zeros((n_nodes, n_nodes))
+        np.add.at(graph, (sources, targets), weights)
+        if symmetric:
+            loops = sources == targets
+            np.add.at(graph, (targets[~loops], sources[~loops]), weights[~loops])
+        return graph
+
+    def test_raw_export(self):
+        for symmetric in (False, True):
+            ncp_txtmapper.numeric_mapper(input_file=self.input_file, weighted='yes', export='raw',
+                                         symmetric=symmetric)
+            indptr, indices, data = (np.load(self.path('edges_graph_{}.npy'.format(name)))
+                                     for name in ('indptr', 'indices', 'data'))
+            expected = self.dense_graph(symmetric)
+            graph = np.zeros_like(expected)
+            rows = np.repeat(np.arange(len(indptr) - 1), np.diff(indptr))
+            np.add.at(graph, (rows, indices), data)
+            self.assertTrue(np.allclose(graph, expected))
+
+    @unittest.skipIf(scipy is None, 'scipy is not installed')
+    def test_scipy_formats(self):
+        for export in ('csr', 'coo'):
+            for kwargs in ({}, {'max_memory': '64K'}, {'n_jobs': 2}, {'fixed_width': True}):
+                ncp_txtmapper.numeric_mapper(input_file=self.input_file, weighted='yes', export=export, **kwargs)
+                graph = scipy.sparse.load_npz(self.path('edges_graph.npz'))
+                self.assertEqual(graph.format, export)
+                self.assertTrue(np.allclose(graph.toarray(), self.dense_graph()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import io
+import os
+import sys
+import unittest
+import subprocess
+
+# Import test helpers
+from tests import PACKAGE_DIR, TempDirTestCase, make_edges, write_edges, read_text
+
+# Import ncprep modules
+import _operations
+import _streams
+import ncp_txtclipper
+import ncp_txtfilter
+import ncp_txtmapper
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Create a command that runs an operation on standard input
+def operation_command(module=None, function=None, **kwargs):
+    """
+    This function creates a python command that calls an ncprep operation with input_file='-'
+    :param module: Module name (e.g. ncp_txtclipper)
+    :param function: Function name (e.g. clip_text)
+    :param kwargs: Other parameters of the operation
+    :return: Python list (command)
+    """
+    code = 'import sys; sys.path.insert(0, {!r}); import {}; {}.{}(input_file="-", **{!r})'.format(
+        PACKAGE_DIR, module, module, function, kwargs)
+
+    # Return
+    return [sys.executable, '-c', code]
+
+
+# Tests of stream detection
+class IsStreamTest(unittest.TestCase):
+    def test_is_stream(self):
+        self.assertTrue(_streams.is_stream('-'))
+        self.assertTrue(_streams.is_stream(u'-'))
+        self.assertTrue(_streams.is_stream(io.BytesIO(b'')))
+        self.assertFalse(_streams.is_stream(u'edges.txt'))
+        self.assertFalse(_streams.is_stream(None))
+
+    def test_input_stream_replays_head(self):
+        data = b''.join(b'line %d\n' % index for index in range(1000))
+        stream = _streams.InputStream(io.BytesIO(data), peek_size=100)
+        self.assertTrue(stream.head.endswith(b'\n'))
+        self.assertEqual(stream.head_lines(2), ['line 0\n', 'line 1\n'])
+        self.assertEqual(stream.read(), data)
+
+
+# Tests of file object inputs and pipes
+class PipeTest(TempDirTestCase):
+    def setUp(self):
+        super(PipeTest, self).setUp()
+        self.edges = make_edges(n_edges=2000)
+        self.input_file = write_edges(self.path('edges.txt'), self.edges, header_lines=[_operations.SORTED_MARKER])
+
+    def run_pipeline(self, commands):
+        """
+        This function pipes the input file through the commands
+        :param commands: Python list of commands
+        :return: standard output (bytes), standard error of every command (python list of bytes)
+        """
+        processes = []
+        with open(self.input_file, 'rb') as stdin:
+            for command in commands:
+                processes.append(subprocess.Popen(command, stdin=processes[-1].stdout if processes else stdin,
+                                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE))
+                if len(processes) > 1:
+                    processes[-2].stdout.close()
+            output, error = processes[-1].communicate()
+        errors = [process.stderr.read() for process in processes[:-1]] + [error]
+        for process in processes:
+            process.wait()
+            process.stderr.close()
+            self.assertEqual(process.returncode, 0)
+
+        # Return
+        return output, errors
+
+    def test_file_object_inputs(self):
+        ncp_txtclipper.clip_text(input_file=self.input_file, start_date='2017-07-16', interval=2,
+                                 output_file=self.path('expected.txt'))
+        expected = read_text(self.path('expected.txt'))
+        with open(self.input_file, 'rb') as f:
+            ncp_txtclipper.clip_text(input_file=io.BytesIO(f.read()), start_date='2017-07-16', interval=2,
+                                     output_file=self.path('bytes.txt'))
+        self.assertEqual(read_text(self.path('bytes.txt')), expected)
+        with open(self.input_file) as f:
+            ncp_txtclipper.clip_text(input_file=f, start_date='2017-07-16', interval=2, fixed_width=True,
+                                     output_file=self.path('text.txt'))
+        self.assertEqual(read_text(self.path('text.txt')), expected)
+        with open(self.input_file) as f:
+            ncp_txtfilter.filter_columns(input_file=f, column_indexes='1,2', output_file=self.path('columns.txt'))
+        self.assertEqual(read_text(self.path('columns.txt')).splitlines()[1], ' '.join(self.edges[0][:2]))
+
+    def test_filter_clip_pipe(self):
+        ncp_txtclipper.clip_text(input_file=self.input_file, start_date='2017-07-16', interval=2,
+                                 output_file=self.path('expected.txt'))
+        expected = read_text(self.path('expected.txt')).encode('utf-8')
+        clip = operation_command('ncp_txtclipper', 'clip_text', start_date='2017-07-16', interval=2)
+        for filter_kwargs in ({}, {'conditions': '4>=0'}):
+            # awk and numpy filters keep the sorted marker, so the clipper sees time sorted input
+            output, errors = self.run_pipeline([
+                operation_command('ncp_txtfilter', 'filter_columns', column_indexes='1,2,3,4', **filter_kwargs),
+                clip])
+            self.assertEqual(output, expected)
+            self.assertIn(b'Time sorted input file detected', errors[-1])
+
+    def test_mapper_pipe(self):
+        ncp_txtmapper.numeric_mapper(input_file=self.input_file, weighted='yes')
+        expected = read_text(self.path('edges_numeric.txt')).encode('utf-8')
+        for kwargs in ({}, {'fixed_width': True}, {'max_memory': '64K'}):
+            output, _ = self.run_pipeline([operation_command('ncp_txtmapper', 'numeric_mapper', weighted='yes',
+                                                             **kwargs)])
+            self.assertEqual(output, expected)
+        # Mapping files of streams are created in the working directory
+        self.assertTrue(os.path.exists(self.path('stdin_map.pkl')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+# Import python libraries
+import unittest
+import numpy as np
+import pandas as pd
+
+# Import test helpers
+from tests import TempDirTestCase, START_TIMESTAMP, make_edges, write_edges, read_text
+
+# Import ncprep modules
+import ncp_txtclipper
+import ncp_txtmapper
+import ncp_txtwindows
+
+
+# Source code meta data
+__author__ = 'Dalwar Hossain'
+__email__ = 'dalwar.hossain@protonmail.com'
+
+
+# Tests of iter_windows
+class IterWindowsTest(TempDirTestCase):
+    def setUp(self):
+        super(IterWindowsTest, self).setUp()
+        self.edges = make_edges(n_edges=2000)
+        # A row with a short address, the numeric_mapper cleanup drops it
+        self.input_file = write_edges(self.path('edges.txt'), self.edges[:1000] +
+                                      [('short', self.edges[0][1], 5, self.edges[999][3])] + self.edges[1000:])
+
+    def windows(self, **kwargs):
+        return list(ncp_txtwindows.iter_windows(input_file=self.input_file, **kwargs))
+
+    def test_windows_match_clip_text(self):
+        windows = self.windows(window='2D', stride='2D', mapped=False, raw_weights=True, block_size='16K')
+        self.assertEqual(len(windows), 4)
+        for window in windows:
+            self.assertEqual(window.start, pd.Timestamp(START_TIMESTAMP, unit='s') + (window.end - window.start) *
+                             windows.index(window))
+            output_file = self.path('clipped.txt')
+            ncp_txtclipper.clip_text(input_file=self.input_file, start_date=window.start.strftime('%Y-%m-%d'),
+                                     interval=2, fixed_width=True, output_file=output_file)
+            lines = [' '.join([source.decode(), target.decode(), '{:.0f}'.format(weight), str(timestamp)])
+                     for source, target, weight, timestamp in zip(window.sources, window.targets, window.weights,
+                                                                  window.timestamps)]
+            # clip_text keeps the short address row, the cleanup drops it
+            expected = [line for line in read_text(output_file).splitlines() if not line.startswith('short')]
+            self.assertEqual(lines, expected)
+
+    def test_mapped_ids_match_numeric_mapper(self):
+        ncp_txtmapper.numeric_mapper(input_file=self.input_file, weighted='yes')
+        numeric = np.loadtxt(self.path('edges_numeric.txt'))
+        ncp_txtmapper.numeric_mapper(input_file=self.input_file, weighted='yes', fixed_width=True)
+        self.assertTrue(np.array_equal(np.loadtxt(self.path('edges_numeric.txt')), numeric))
+        for mapping_file in (None, self.path('edges_map.pkl'), self.path('edges_map.npy')):
+            windows = self.windows(window='8D', stride='8D', mapping_file=mapping_file)
+            self.assertEqual(len(windows), 1)
+            window = windows[0]
+            self.assertEqual(window.n_nodes, int(numeric[:, :2].max()) + 1)
+            self.assertTrue(np.array_equal(np.column_stack([window.sources, window.targets, window.weights,
+                                                            window.timestamps]), numeric))
+
+    def test_invalid_weight(self):
+        write_edges(self.input_file, self.edges[:10] + [(self.edges[0][0], self.edges[0][1], 'x', self.edges[9][3])])
+        self.assertRaises(SystemExit, self.windows)
+        self.assertRaises(SystemExit, self.windows, raw_weights=True)
+
+
+if __name__ == '__main__':
+    unittest.main()